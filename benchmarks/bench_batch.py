@@ -0,0 +1,70 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Compare converting the doc strings of a module one by one with the batch
+entry point ``DocUtilsStyle.convert_all``.
+
+    python -m benchmarks.bench_batch [--classes N] [--methods N]
+        [--fields N] [--repeat N] [-o OUTPUT]
+
+The defaults create many small doc strings, where the overhead per call
+matters most.
+"""
+
+import argparse
+import sys
+
+from mydocpy.docformats.doc_tools import DocUtilsStyle
+from mydocpy.parse import parse
+
+from benchmarks.corpus import generate_module
+from benchmarks.timing import dump, measure, throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--classes", type=int, default=50)
+    parser.add_argument("--methods", type=int, default=20)
+    parser.add_argument("--fields", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    content = generate_module(args.classes, args.methods, args.fields)
+    docformat = DocUtilsStyle()
+    counts = {"docstrings": len(parse(content))}
+
+    def per_docstring(docstrings):
+        for docstring in docstrings:
+            docformat(docstring)
+
+    results = {"counts": counts, "parameters": vars(args)}
+    for name, func in (("per_docstring", per_docstring),
+                       ("batch", docformat.convert_all)):
+        timing = measure(func, args.repeat, lambda: parse(content))
+        timing.update(throughput(timing, **counts))
+        results[name] = timing
+    results["speedup"] = \
+        results["per_docstring"]["min"] / results["batch"]["min"]
+
+    dump(results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Compare the unified diff of one large generated module with a few changes
+created from the replacements (``replacements.unified_diff``) and by
+``difflib`` from the original and the rewritten text.
+
+    python -m benchmarks.bench_diff [--methods N [N ...]] [--changes N]
+        [--repeat N] [-o OUTPUT]
+
+The module has 10 classes with N methods each. Only the first ``--changes``
+type comments are kept, like for a mostly converted file.
+"""
+
+import argparse
+import difflib
+import sys
+
+from mydocpy import replacements
+from mydocpy.pipeline import FileProcessor, ImportMode, load_formats
+
+from benchmarks.corpus import generate_module
+from benchmarks.timing import dump, measure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--methods", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--changes", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    load_formats()
+    processor = FileProcessor("sphinx", "comment", imports=ImportMode.NONE)
+
+    results = {"parameters": vars(args), "sizes": []}
+    for methods in args.methods:
+        content = generate_module(classes=10, methods=methods, fields=3)
+        source_replacements = processor.get_source_replacements(
+            content)[:args.changes]
+
+        def from_replacements():
+            replacements.unified_diff(content, source_replacements, "m.py")
+
+        def with_difflib():
+            rewritten = replacements.splice(content, source_replacements)
+            "".join(difflib.unified_diff(
+                content.splitlines(True), rewritten.splitlines(True),
+                "a/m.py", "b/m.py"))
+
+        results["sizes"].append({
+            "methods": methods * 10,
+            "chars": len(content),
+            "replacements": len(source_replacements),
+            "unified_diff": measure(from_replacements, args.repeat)["min"],
+            "difflib": measure(with_difflib, args.repeat)["min"],
+        })
+
+    dump(results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
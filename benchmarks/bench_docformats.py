@@ -0,0 +1,85 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Compare the throughput of the doc string formats on equivalent synthetic
+modules in their styles.
+
+    python -m benchmarks.bench_docformats [--classes N] [--methods N]
+        [--fields N] [--repeat N] [-o OUTPUT]
+
+Only the doc string format is timed, the doc strings are parsed beforehand.
+"""
+
+import argparse
+import sys
+
+from mydocpy import docformats
+from mydocpy.parse import parse
+
+from benchmarks.corpus import generate_module
+from benchmarks.timing import dump, measure, throughput
+
+# doc string format per corpus style
+FORMATS = (
+    ("sphinx", "sphinx"),
+    ("google", "google"),
+    ("numpy", "numpy"),
+    ("auto", "sphinx"),
+    ("auto", "google"),
+    ("auto", "numpy"),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--classes", type=int, default=50)
+    parser.add_argument("--methods", type=int, default=20)
+    parser.add_argument("--fields", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    docformats.load_formats()
+    results = {"parameters": vars(args)}
+    for name, style in FORMATS:
+        content = generate_module(
+            args.classes, args.methods, args.fields, style=style)
+        docformat = docformats.get_format(name)
+
+        def convert(docstrings):
+            for docstring in docstrings:
+                docformat(docstring)
+
+        docstrings = parse(content)
+        convert(docstrings)
+        counts = {
+            "docstrings": len(docstrings),
+            "type_info": sum(len(d.type_info) for d in docstrings),
+            "chars": sum(len(d.content) for d in docstrings),
+        }
+        timing = measure(convert, args.repeat, lambda: parse(content))
+        timing.update(throughput(timing, **counts))
+        timing["counts"] = counts
+        results["{}/{}".format(name, style)] = timing
+
+    dump(results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Compare the memory of doc string objects with ``mydocpy.docstore``.
+
+    python -m benchmarks.bench_docstore [--files N] [--classes N]
+        [--methods N] [--fields N] [-o OUTPUT]
+
+The doc strings of ``--files`` synthetic modules are parsed and converted
+with the sphinx format. The memory still allocated afterwards is measured
+with ``tracemalloc`` for a list of the doc string objects and for a
+``DocStringStore`` holding the same doc strings.
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+
+from mydocpy import docformats
+from mydocpy.docstore import DocStringStore
+from mydocpy.parse import iter_parse
+
+from benchmarks.corpus import generate_module
+from benchmarks.timing import dump
+
+
+def _docstrings(content):
+    docformat = docformats.get_format("sphinx")
+    for docstring in iter_parse(content):
+        docformat(docstring)
+        yield docstring
+
+
+def _objects(contents):
+    return [list(_docstrings(content)) for content in contents]
+
+
+def _store(contents):
+    store = DocStringStore()
+    for i, content in enumerate(contents):
+        store.add_file(str(i), _docstrings(content))
+    return store
+
+
+def retained_memory(func, *args):
+    """
+    :return: bytes allocated by ``func`` and still used by its result
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--classes", type=int, default=20)
+    parser.add_argument("--methods", type=int, default=10)
+    parser.add_argument("--fields", type=int, default=3)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    docformats.load_formats()
+    content = generate_module(args.classes, args.methods, args.fields)
+    # distinct strings per file, as in a real project
+    contents = [
+        content.replace("Class", "Class{}_".format(i))
+        for i in range(args.files)]
+
+    docstrings = sum(len(files) for files in _objects(contents))
+    objects = retained_memory(_objects, contents)
+    store = retained_memory(_store, contents)
+    results = {
+        "parameters": vars(args),
+        "docstrings": docstrings,
+        "objects_bytes": objects,
+        "store_bytes": store,
+        "ratio": float(objects) / store,
+    }
+
+    dump(results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Compare the doc string extraction engines (``ast`` and ``tokenize``) on
+large modules, including parsing.
+
+    python -m benchmarks.bench_engines [--classes N] [--methods N]
+        [--statements N] [--repeat N] [-o OUTPUT]
+
+Besides the time, the peak of allocated memory of one run is reported (if
+``tracemalloc`` is available).
+"""
+
+import argparse
+import sys
+
+from mydocpy import parse, tokenparse
+
+from benchmarks.corpus import generate_module
+from benchmarks.timing import dump, measure, throughput
+
+ENGINES = (("ast", parse.parse), ("tokenize", tokenparse.parse))
+
+
+def peak_memory(func):
+    """
+    :return: peak of allocated bytes while calling ``func`` or None
+    """
+    try:
+        import tracemalloc
+    except ImportError:  # Python 2
+        return None
+
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--classes", type=int, default=50)
+    parser.add_argument("--methods", type=int, default=20)
+    parser.add_argument("--statements", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    content = generate_module(
+        args.classes, args.methods, statements=args.statements)
+    counts = {
+        "lines": content.count("\n") + 1,
+        "docstrings": len(parse.parse(content)),
+    }
+
+    results = {"counts": counts, "parameters": vars(args)}
+    for name, func in ENGINES:
+        timing = measure(lambda: func(content), args.repeat)
+        timing.update(throughput(timing, **counts))
+        timing["peak_bytes"] = peak_memory(lambda: func(content))
+        results[name] = timing
+    results["speedup"] = results["ast"]["min"] / results["tokenize"]["min"]
+
+    dump(results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Compare reading each file twice (parse, then rewrite) with the single read
+of ``FileProcessor``.
+
+    python -m benchmarks.bench_io [--files N]
+
+Bytes and read calls are taken from ``/proc/self/io`` (Linux only).
+"""
+
+import argparse
+import codecs
+import io
+import shutil
+import sys
+import tempfile
+
+from mydocpy import replacements
+from mydocpy.parse import parse_file
+from mydocpy.pipeline import FileProcessor, load_formats
+
+from benchmarks.corpus import write_corpus
+from benchmarks.timing import clock, dump
+
+
+def _io_counters():
+    try:
+        with open("/proc/self/io") as f:
+            counters = dict(line.split(": ") for line in f.read().splitlines())
+    except (IOError, OSError):
+        return None
+    return int(counters["rchar"]), int(counters["syscr"])
+
+
+def _read_twice(processor, srcfile):
+    source_replacements = processor.get_replacements(parse_file(srcfile))
+    output = io.StringIO()
+    with codecs.open(srcfile, "r", "utf-8") as src:
+        replacements.apply(src, output, source_replacements)
+    return output.getvalue()
+
+
+def _read_once(processor, srcfile):
+    return processor.process(srcfile).output
+
+
+def _measure(func, processor, srcfiles):
+    before = _io_counters()
+    start = clock()
+    for srcfile in srcfiles:
+        func(processor, srcfile)
+    result = {"seconds": clock() - start}
+    after = _io_counters()
+    if before and after:
+        result["bytes_read"] = after[0] - before[0]
+        result["read_calls"] = after[1] - before[1]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--classes", type=int, default=10)
+    parser.add_argument("--methods", type=int, default=10)
+    args = parser.parse_args()
+
+    load_formats()
+    processor = FileProcessor("sphinx", "comment")
+    directory = tempfile.mkdtemp()
+    try:
+        srcfiles = write_corpus(
+            directory, args.files, classes=args.classes, methods=args.methods)
+        _read_once(processor, srcfiles[0])  # warm up
+
+        results = {
+            "files": args.files,
+            "read_twice": _measure(_read_twice, processor, srcfiles),
+            "read_once": _measure(_read_once, processor, srcfiles),
+        }
+    finally:
+        shutil.rmtree(directory)
+
+    dump(results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Compare offset to location conversion by counting the preceding lines
+(``text[:pos].count``, as done before) with ``mydocpy.source.LineIndex``.
+
+    python -m benchmarks.bench_lineindex [--fields N [N ...]] [--repeat N]
+        [-o OUTPUT]
+
+For every size a doc string with that many type fields is converted with
+the sphinx format. Counting takes quadratic time in the size, the index
+``O(n log n)``.
+"""
+
+import argparse
+import sys
+
+from mydocpy import docformats
+from mydocpy.docstrings import FunctionDocString
+from mydocpy.source import LineIndex, SourceLocation
+
+from benchmarks.timing import dump, measure
+
+
+def count_location(text, pos):
+    """
+    former conversion
+    """
+    last_nl = text.rfind('\n', 0, pos)
+    if last_nl < 0:
+        return SourceLocation(0, pos)
+    return SourceLocation(text[:pos].count('\n'), pos - (last_nl + 1))
+
+
+def docstring(fields):
+    lines = [""]
+    for i in range(fields):
+        lines += [
+            "    :param param{}: parameter number {}".format(i, i),
+            "    :type param{}: Dict[str, int]".format(i),
+        ]
+    return "\n".join(lines) + "\n    "
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--fields", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    docformats.load_formats()
+    docformat = docformats.get_format("sphinx")
+
+    results = {"parameters": vars(args), "sizes": []}
+    for fields in args.fields:
+        content = docstring(fields)
+        positions = [i for i, c in enumerate(content) if c == ":"][::4]
+
+        def counting():
+            for pos in positions:
+                count_location(content, pos)
+
+        def index():
+            line_index = LineIndex(content)
+            for pos in positions:
+                line_index.location(pos)
+
+        def sphinx():
+            docformat(FunctionDocString(content))
+
+        results["sizes"].append({
+            "fields": fields,
+            "chars": len(content),
+            "count": measure(counting, args.repeat)["min"],
+            "line_index": measure(index, args.repeat)["min"],
+            "sphinx": measure(sphinx, args.repeat)["min"],
+        })
+
+    dump(results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Compare applying the replacements of one large generated module with the
+line based streaming applier (``replacements.apply_sorted``) and the offset
+based ``replacements.splice``.
+
+    python -m benchmarks.bench_splice [--methods N [N ...]] [--repeat N]
+        [-o OUTPUT]
+
+The module has 10 classes with N methods each. The ``annotations`` format
+creates several edits per function header.
+"""
+
+import argparse
+import io
+import sys
+
+from mydocpy import replacements
+from mydocpy.pipeline import FileProcessor, ImportMode, load_formats
+
+from benchmarks.corpus import generate_module
+from benchmarks.timing import dump, measure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--methods", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    load_formats()
+
+    results = {"parameters": vars(args), "sizes": []}
+    for methods in args.methods:
+        content = generate_module(classes=10, methods=methods, fields=3)
+        for destformat in ("comment", "annotations"):
+            processor = FileProcessor(
+                "sphinx", destformat, imports=ImportMode.NONE)
+            source_replacements = processor.get_source_replacements(content)
+            source_replacements.sort(key=lambda x: (
+                x.source_range.start.line, x.source_range.start.col))
+
+            def streaming():
+                replacements.apply_sorted(
+                    io.StringIO(content), io.StringIO(), source_replacements)
+
+            def splice():
+                replacements.splice(content, source_replacements)
+
+            results["sizes"].append({
+                "methods": methods * 10,
+                "format": destformat,
+                "chars": len(content),
+                "replacements": len(source_replacements),
+                "streaming": measure(streaming, args.repeat)["min"],
+                "splice": measure(splice, args.repeat)["min"],
+            })
+
+    dump(results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Compare the statement walker of ``mydocpy.parse`` with the former
+``ast.NodeVisitor`` based extractor on large modules.
+
+    python -m benchmarks.bench_walker [--classes N] [--methods N]
+        [--statements N] [--repeat N] [-o OUTPUT]
+
+Only the tree traversal is timed, ``ast.parse`` is done beforehand.
+"""
+
+import argparse
+import ast
+import sys
+
+from mydocpy.docstrings import ClassDocString, FuncType, FunctionDocString
+from mydocpy.parse import _get_arg_name, _get_node_docstring, \
+    iter_docstrings
+
+from benchmarks.corpus import generate_module
+from benchmarks.timing import dump, measure, throughput
+
+
+class NodeVisitorExtractor(ast.NodeVisitor):
+    """
+    former extractor: visits every node of the module
+    """
+
+    def __init__(self):
+        self.doc_strings = []
+        self.in_class = False
+
+    def visit_ClassDef(self, node):
+        docstring = _get_node_docstring(node, ClassDocString)
+        if docstring:
+            self.doc_strings.append(docstring)
+
+        in_class = self.in_class
+        self.in_class = True
+        self.generic_visit(node)
+        self.in_class = in_class
+
+    def visit_FunctionDef(self, node):
+        docstring = _get_node_docstring(node, FunctionDocString)
+        if docstring:
+            docstring.args = [_get_arg_name(arg) for arg in node.args.args]
+            docstring.vaarg = _get_arg_name(node.args.vararg)
+            docstring.kwarg = _get_arg_name(node.args.kwarg)
+            if self.in_class:
+                decorators = [
+                    decorator.id for decorator in node.decorator_list
+                ]
+                if "staticmethod" in decorators:
+                    docstring.func_type = FuncType.STATIC
+                elif "classmethod" in decorators:
+                    docstring.func_type = FuncType.CLASS
+                else:
+                    docstring.func_type = FuncType.INSTANCE
+            else:
+                docstring.func_type = FuncType.FREE
+            self.doc_strings.append(docstring)
+
+        in_class = self.in_class
+        self.in_class = False
+        self.generic_visit(node)
+        self.in_class = in_class
+
+
+def _visitor(tree):
+    extractor = NodeVisitorExtractor()
+    extractor.visit(tree)
+    return extractor.doc_strings
+
+
+def _walker(tree):
+    return list(iter_docstrings(tree))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--classes", type=int, default=50)
+    parser.add_argument("--methods", type=int, default=20)
+    parser.add_argument("--statements", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    content = generate_module(
+        args.classes, args.methods, statements=args.statements)
+    tree = ast.parse(content)
+    counts = {
+        "lines": content.count("\n") + 1,
+        "docstrings": len(_walker(tree)),
+    }
+
+    results = {"counts": counts, "parameters": vars(args)}
+    for name, func in (("node_visitor", _visitor), ("walker", _walker)):
+        timing = measure(lambda: func(tree), args.repeat)
+        timing.update(throughput(timing, **counts))
+        results[name] = timing
+    results["speedup"] = \
+        results["node_visitor"]["min"] / results["walker"]["min"]
+
+    dump(results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
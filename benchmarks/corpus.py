@@ -0,0 +1,161 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Generator for synthetic source files with typed doc strings
+
+    python -m benchmarks.corpus DIRECTORY [--files N] [--classes N]
+        [--methods N] [--fields N] [--statements N] [--style STYLE]
+"""
+
+import argparse
+import os
+import sys
+
+from typing import List, Text
+
+_FIELD_TYPES = ("int", "str", "list of int", "dict(str: float)", "bool")
+
+
+def _class_doc(style):
+    # type: (Text) -> List[Text]
+    if style == "google":
+        return ["Attributes:", "    value (int): some value"]
+    if style == "numpy":
+        return ["Attributes", "----------", "value : int", "    some value"]
+    return [":ivar value: some value", ":type value: int"]
+
+
+def _method_doc(style, params):
+    # type: (Text, List[Text]) -> List[Text]
+    types = [_FIELD_TYPES[f % len(_FIELD_TYPES)] for f in range(len(params))]
+    lines = []  # type: List[Text]
+    if style == "google":
+        lines.append("Args:")
+        for f, (param, type_) in enumerate(zip(params, types)):
+            lines.append("    {} ({}): parameter {}".format(param, type_, f))
+        return lines + ["", "Returns:", "    bool: result"]
+    if style == "numpy":
+        lines += ["Parameters", "----------"]
+        for f, (param, type_) in enumerate(zip(params, types)):
+            lines += [
+                "{} : {}".format(param, type_),
+                "    parameter {}".format(f)]
+        return lines + ["", "Returns", "-------", "bool", "    result"]
+    for f, (param, type_) in enumerate(zip(params, types)):
+        lines += [
+            ":param {}: parameter {}".format(param, f),
+            ":type {}: {}".format(param, type_),
+        ]
+    return lines + [":rtype: bool"]
+
+
+def _indent(lines, indent):
+    # type: (List[Text], Text) -> List[Text]
+    return [indent + line if line else line for line in lines]
+
+
+def generate_module(classes=10, methods=10, fields=3, statements=0,
+                    style="sphinx"):
+    # type: (int, int, int, int, Text) -> Text
+    """
+    :param classes: number of classes in the module
+    :param methods: number of methods per class
+    :param fields: number of typed parameters per method
+    :param statements: number of additional statements (with calls and
+        literals) in every method body
+    :param style: style of the doc strings (``sphinx``, ``google`` or
+        ``numpy``)
+    :return: source of a module with typed doc strings
+    """
+    lines = ["# -*- coding=utf-8 -*-", "", ""]
+    for c in range(classes):
+        lines += [
+            "class Class{}(object):".format(c),
+            '    """',
+            "    Synthetic class number {}".format(c),
+            "",
+        ] + _indent(_class_doc(style), "    ") + [
+            '    """',
+            "",
+        ]
+        for m in range(methods):
+            params = ["param{}".format(f) for f in range(fields)]
+            lines += [
+                "    def method{}(self{}):".format(
+                    m, "".join(", " + p for p in params)),
+                '        """',
+                "        Synthetic method number {}".format(m),
+                "",
+            ]
+            lines += _indent(_method_doc(style, params), "        ")
+            lines.append('        """')
+            lines += [
+                "        value = call({}, [{}, {{'key': ({}, 'x')}}])".format(
+                    s, s + 1, s + 2)
+                for s in range(statements)
+            ]
+            lines += [
+                "        return {} is None".format(
+                    params[0] if params else "self"),
+                "",
+            ]
+        lines.append("")
+    return "\n".join(lines)
+
+
+def write_corpus(directory, files=100, **kwargs):
+    # type: (Text, int, **int) -> List[Text]
+    """
+    write ``files`` synthetic modules (see ``generate_module``) to
+    ``directory``
+
+    :return: paths of the written files
+    """
+    source = generate_module(**kwargs)
+    paths = []
+    for i in range(files):
+        path = os.path.join(directory, "module{}.py".format(i))
+        with open(path, "w") as f:
+            f.write(source)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("directory")
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--classes", type=int, default=10)
+    parser.add_argument("--methods", type=int, default=10)
+    parser.add_argument("--fields", type=int, default=3)
+    parser.add_argument("--statements", type=int, default=0)
+    parser.add_argument(
+        "--style", choices=("sphinx", "google", "numpy"), default="sphinx")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        os.makedirs(args.directory)
+    write_corpus(
+        args.directory, args.files, classes=args.classes,
+        methods=args.methods, fields=args.fields,
+        statements=args.statements, style=args.style)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
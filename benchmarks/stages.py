@@ -0,0 +1,125 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Time every stage of the pipeline (parse, docformat, style, apply) and the
+whole pipeline on a synthetic module.
+
+    python -m benchmarks.stages [--classes N] [--methods N] [--fields N]
+        [--repeat N] [-s SRCFMT] [-f FMT] [-o OUTPUT]
+
+The result is written as JSON. Throughput is based on the fastest run.
+"""
+
+import argparse
+import io
+import sys
+
+from mydocpy import docformats, formats, replacements
+from mydocpy.parse import parse
+from mydocpy.pipeline import FileProcessor, load_formats
+
+from benchmarks.corpus import generate_module
+from benchmarks.timing import dump, measure, throughput
+
+
+def run_stages(content, srcformat, destformat, repeat):
+    """
+    :return: timings and throughput of every stage on ``content``
+    """
+    load_formats()
+    docformat = docformats.get_format(srcformat)
+    style = formats.get_format(destformat)
+
+    def formatted():
+        docstrings = parse(content)
+        for docstring in docstrings:
+            docformat(docstring)
+        return docstrings
+
+    def styled():
+        source_replacements = []
+        for docstring in formatted():
+            style(docstring, source_replacements)
+        return source_replacements
+
+    def run_docformat(docstrings):
+        for docstring in docstrings:
+            docformat(docstring)
+
+    def run_style(docstrings):
+        source_replacements = []
+        for docstring in docstrings:
+            style(docstring, source_replacements)
+
+    def run_apply(source_replacements):
+        replacements.apply(
+            io.StringIO(content), io.StringIO(), source_replacements)
+
+    processor = FileProcessor(srcformat, destformat)
+
+    def run_end_to_end():
+        processor.rewrite(
+            content, processor.get_source_replacements(content))
+
+    docstrings = parse(content)
+    source_replacements = styled()
+    counts = {
+        "lines": content.count("\n") + 1,
+        "docstrings": len(docstrings),
+    }
+
+    stages = {
+        "parse": measure(lambda: parse(content), repeat),
+        "docformat": measure(
+            run_docformat, repeat, lambda: parse(content)),
+        "style": measure(run_style, repeat, formatted),
+        "apply": measure(run_apply, repeat, lambda: source_replacements),
+        "end_to_end": measure(run_end_to_end, repeat),
+    }
+    for timing in stages.values():
+        timing.update(throughput(timing, **counts))
+
+    counts["replacements"] = len(source_replacements)
+    return {"counts": counts, "stages": stages}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--classes", type=int, default=50)
+    parser.add_argument("--methods", type=int, default=20)
+    parser.add_argument("--fields", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-s", "--src-format", default="sphinx")
+    parser.add_argument("-f", "--format", default="comment")
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    content = generate_module(args.classes, args.methods, args.fields)
+    results = run_stages(content, args.src_format, args.format, args.repeat)
+    results["parameters"] = {
+        "classes": args.classes, "methods": args.methods,
+        "fields": args.fields, "repeat": args.repeat,
+        "src_format": args.src_format, "format": args.format,
+    }
+
+    dump(results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
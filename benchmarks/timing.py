@@ -0,0 +1,77 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Helpers for timing benchmarks
+"""
+
+import json
+import sys
+import time
+
+from typing import Any, Callable, Dict, List, Text
+
+try:
+    clock = time.perf_counter
+except AttributeError:  # Python 2
+    clock = time.time
+
+
+def measure(func, repeat=5, setup=None):
+    # type: (Callable, int, Callable) -> Dict[Text, float]
+    """
+    call ``func`` ``repeat`` times
+
+    :param setup: called before every call of ``func`` (not timed). Its
+        result is passed to ``func``.
+    :return: minimal, median and maximal seconds per call
+    """
+    timings = []  # type: List[float]
+    for _ in range(repeat):
+        args = (setup(),) if setup is not None else ()
+        start = clock()
+        func(*args)
+        timings.append(clock() - start)
+
+    timings.sort()
+    return {
+        "min": timings[0],
+        "median": timings[len(timings) // 2],
+        "max": timings[-1],
+    }
+
+
+def throughput(timing, **counts):
+    # type: (Dict[Text, float], **int) -> Dict[Text, float]
+    """
+    :return: ``<name>_per_s`` for every count (based on the minimal time)
+    """
+    seconds = max(timing["min"], 1e-9)
+    return {name + "_per_s": count / seconds for name, count in counts.items()}
+
+
+def dump(results, output=None):
+    # type: (Any, Text) -> None
+    """
+    write ``results`` as JSON to the file ``output`` or to stdout
+    """
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
@@ -14,34 +14,90 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import codecs
-
 import sys
-from typing import Sequence
 
-from mydocpy import docformats, formats, replacements
+from typing import Iterable, Optional, Text, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mydocpy.cache import ReplacementCache
+    from mydocpy.pipeline import ImportMode
+    from mydocpy.profiling import Profile
+
+__version__ = "0.1.dev0"
 
 
 def process(
-        srcfiles,   # type: Sequence[unicode]
-        srcformat,  # type: unicode
-        destformat  # type: unicode
+        srcfiles,        # type: Iterable[Text]
+        srcformat,       # type: Text
+        destformat,      # type: Text
+        jobs=1,          # type: int
+        cache=None,      # type: Optional[ReplacementCache]
+        in_place=False,  # type: bool
+        profile=None,    # type: Optional[Profile]
+        engine="ast",    # type: Text
+        symbols=None,    # type: Optional[Text]
+        imports=None,    # type: Optional[ImportMode]
+        stub_dir=None,   # type: Optional[Text]
+        diff=False       # type: bool
 ):
-    from mydocpy.parse import parse_file
+    # type: (...) -> int
+    """
+    Convert doc string type information of ``srcfiles`` and write the
+    rewritten sources to stdout (in the order of ``srcfiles``).
+
+    :param jobs: number of worker processes (``0``: one per CPU)
+    :param cache: cache for the replacements of unchanged files. Its hit and
+        miss counters are updated with the results of all files.
+    :param in_place: rewrite changed files instead of writing to stdout
+    :param profile: collects timings and counters of every file when given
+    :param engine: doc string extraction (``"ast"`` or ``"tokenize"``)
+    :param symbols: path of a ``mydocpy.symbols.SymbolIndex`` to import the
+        types of the doc strings
+    :param imports: where to add the imports of the type hints (default:
+        ``ImportMode.TOP_LEVEL``)
+    :param stub_dir: directory for the stubs of the ``stub`` format (default:
+        next to the sources with ``in_place``, otherwise stdout)
+    :param diff: write a unified diff of all changes to stdout instead of the
+        rewritten sources. The diff of a file is written as soon as it is
+        done, so the order of the files depends on the workers.
+    :return: number of files which could not be processed
+    """
+    from mydocpy.pipeline import FileProcessor, ImportMode, OutputMode, \
+        load_formats
+    from mydocpy.utils.pool import imap
 
-    # TODO: use threads or processes?
-    for srcfile in srcfiles:
-        docstrings = parse_file(srcfile)
+    if in_place:
+        mode = OutputMode.IN_PLACE
+    elif diff:
+        mode = OutputMode.DIFF
+    else:
+        mode = OutputMode.STDOUT
+    processor = FileProcessor(
+        srcformat, destformat, cache, mode, profile is not None, engine,
+        symbols, ImportMode.TOP_LEVEL if imports is None else imports,
+        stub_dir)
 
-        docformat = docformats.get_format(srcformat)
-        for docstring in docstrings:
-            docformat(docstring)
+    failed = 0
+    # the diffs of the files are independent: write them as they are done
+    results = imap(processor, srcfiles, jobs, load_formats,
+                   ordered=mode != OutputMode.DIFF)
+    for result in results:
+        if result.error is not None:
+            failed += 1
+            sys.stderr.write("mydocpy: failed to process {}:\n{}".format(
+                result.path, result.error))
+            continue
 
-        source_replacements = []
-        style_format = formats.get_format(destformat)
-        for docstring in docstrings:
-            style_format(docstring, source_replacements)
+        if result.cached is not None:
+            cache.record(result.cached)
+        if result.stats is not None:
+            profile.add(result.stats)
+        if result.output is not None:
+            sys.stdout.write(result.output)
 
-        with codecs.open(srcfile, "r", "utf-8") as src:
-            replacements.apply(src, sys.stdout, source_replacements)
+    if cache is not None:
+        cache.prune()
+    if profile is not None:
+        profile.finish()
 
+    return failed
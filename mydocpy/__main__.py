@@ -18,9 +18,16 @@ import argparse
 import sys
 
 from mydocpy import process
+from mydocpy.discovery import DEFAULT_INCLUDE, iter_source_files
 import mydocpy.docformats as docformats
 import mydocpy.formats as formats
+from mydocpy.pipeline import ImportMode
 
+IMPORT_MODES = {
+    "none": ImportMode.NONE,
+    "top": ImportMode.TOP_LEVEL,
+    "type-checking": ImportMode.TYPE_CHECKING,
+}
 
 def main():
     parser = argparse.ArgumentParser(
@@ -34,24 +41,180 @@ def main():
     parser.add_argument(
         '-s', '--src-format', metavar='SRCFMT', type=str,
         help='Format of source doc strings. '
-        'Supported formats: ' + ", ".join(docformats.get_formats())
+        'Supported formats: ' + ", ".join(docformats.get_formats(False)) +
+        ' and installed plugins (see --list-formats)'
     )
 
     parser.add_argument(
         '-f', '--format', metavar='FMT', type=str,
         help='Destination format of type traits. '
-        'Supported formats: ' + ", ".join(formats.get_formats())
+        'Supported formats: ' + ", ".join(formats.get_formats(False)) +
+        ' and installed plugins (see --list-formats)'
     )
 
     parser.add_argument(
-        "files", metavar='FILE', nargs='+', default=None,
-        help='File paths which should be processed'
+        '--list-formats', action='store_true',
+        help='List all formats including the formats of installed plugins'
+    )
+
+    parser.add_argument(
+        '-j', '--jobs', metavar='N', type=int, default=1,
+        help='Number of worker processes (0: one per CPU, default: 1)'
+    )
+
+    parser.add_argument(
+        '-i', '--in-place', action='store_true',
+        help='Rewrite changed files instead of writing all files to stdout'
+    )
+
+    parser.add_argument(
+        '--diff', action='store_true',
+        help='Write a unified diff of the changes to stdout (for patch -p1 '
+             'or git apply) instead of all files'
+    )
+
+    parser.add_argument(
+        '--cache-dir', metavar='DIR', type=str, default=None,
+        help='Cache the results for unchanged files in DIR'
+    )
+
+    parser.add_argument(
+        '--cache-size', metavar='MB', type=int, default=64,
+        help='Maximal size of the cache in MiB (default: 64)'
+    )
+
+    parser.add_argument(
+        '--cache-stats', action='store_true',
+        help='Print cache hits and misses to stderr'
+    )
+
+    parser.add_argument(
+        '--include', metavar='GLOB', action='append', default=None,
+        help='Process files in directories matching GLOB '
+             '(can be given multiple times, default: *.py)'
+    )
+
+    parser.add_argument(
+        '--exclude', metavar='GLOB', action='append', default=[],
+        help='Skip files and directories in directories matching GLOB '
+             '(can be given multiple times)'
+    )
+
+    parser.add_argument(
+        '--no-gitignore', dest='gitignore', action='store_false',
+        help='Do not skip files ignored by .gitignore files'
+    )
+
+    parser.add_argument(
+        '--profile', metavar='FILE', type=str, default=None,
+        help='Write the time of every stage per file and counters as JSON '
+             'to FILE'
+    )
+
+    parser.add_argument(
+        '--stats', action='store_true',
+        help='Print a summary of the time per stage and the slowest files '
+             'to stderr'
+    )
+
+    parser.add_argument(
+        '--engine', choices=('ast', 'tokenize'), default='ast',
+        help='Extract doc strings from a syntax tree (ast, default) or '
+             'directly from the tokens (tokenize, less memory, slower)'
+    )
+
+    parser.add_argument(
+        '--symbols', metavar='FILE', type=str, default=None,
+        help='Index the classes and type aliases of all given files in FILE '
+             '(updated incrementally) and import them in type hints'
+    )
+
+    parser.add_argument(
+        '--imports', choices=('none', 'top', 'type-checking'), default='top',
+        help='Add the imports of the type hints to the imports at the top '
+             '(top, default), to an "if TYPE_CHECKING:" block for other '
+             'modules than typing (type-checking) or not at all (none)'
+    )
+
+    parser.add_argument(
+        '--stub-dir', metavar='DIR', type=str, default=None,
+        help='Write the stubs of format "stub" to DIR (by module name). '
+             'Without it, stubs are written next to the sources with -i and '
+             'to stdout otherwise.'
+    )
+
+    parser.add_argument(
+        '--server', metavar='SOCKET', type=str, default=None,
+        help='Serve requests on the Unix socket SOCKET instead of processing '
+             'files (see mydocpy.server for the protocol)'
+    )
+
+    parser.add_argument(
+        "files", metavar='PATH', nargs='*', default=None,
+        help='File paths which should be processed. Directories are '
+             'searched recursively.'
     )
 
     args = parser.parse_args()
-    process(args.files, args.src_format, args.format)
+    if args.list_formats:
+        print("doc string formats (-s): " +
+              ", ".join(docformats.get_formats()))
+        print("type hint formats (-f): " + ", ".join(formats.get_formats()))
+        return 0
+
+    if not args.files and not args.server:
+        parser.error("no files given")
+    if args.diff and args.in_place:
+        parser.error("--diff can not be used with --in-place")
+    if args.jobs < 0:
+        parser.error("-j/--jobs must not be negative")
+
+    cache = None
+    if args.cache_dir:
+        from mydocpy.cache import ReplacementCache
+        cache = ReplacementCache(args.cache_dir, args.cache_size * 1024 * 1024)
+
+    if args.server:
+        from mydocpy.server import Service, serve
+        serve(args.server, Service(
+            args.src_format, args.format, cache, engine=args.engine))
+        return 0
+
+    srcfiles = iter_source_files(
+        args.files, args.include or DEFAULT_INCLUDE, args.exclude,
+        args.gitignore)
+
+    if args.symbols:
+        from mydocpy.symbols import SymbolIndex
+
+        # all files have to be indexed before the first one is processed
+        srcfiles = list(srcfiles)
+        index = SymbolIndex.load(args.symbols)
+        index.update(srcfiles)
+        if index.modified:
+            index.save(args.symbols)
+
+    profile = None
+    if args.profile or args.stats:
+        from mydocpy.profiling import Profile
+        profile = Profile()
+
+    failed = process(
+        srcfiles, args.src_format, args.format, args.jobs, cache,
+        args.in_place, profile, args.engine, args.symbols,
+        IMPORT_MODES[args.imports], args.stub_dir, args.diff)
+
+    if args.profile:
+        with open(args.profile, "w") as f:
+            profile.write_json(f)
+    if args.stats:
+        profile.write_summary(sys.stderr)
+
+    if cache is not None and args.cache_stats:
+        sys.stderr.write("mydocpy: cache: {} hits, {} misses\n".format(
+            cache.hits, cache.misses))
 
-    return 0
+    return 1 if failed else 0
 
 if __name__ == '__main__':
     sys.exit(main())
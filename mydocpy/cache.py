@@ -0,0 +1,179 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import errno
+import hashlib
+import os
+import pickle
+from itertools import chain
+
+from typing import Iterable, List, Optional, Text
+
+from mydocpy import __version__
+from mydocpy.replacements import SourceReplacement
+from mydocpy.utils.files import atomic_write
+
+
+# increase when the replacements for the same input change (also between
+# releases), so that old entries are not used anymore
+OUTPUT_VERSION = 2
+
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+# errors of ``pickle.loads`` for data, which is no (complete) pickle
+_BROKEN_PICKLE = (
+    pickle.UnpicklingError, EOFError, ValueError, TypeError, IndexError,
+    KeyError, AttributeError, ImportError)
+
+
+class ReplacementCache(object):
+    """
+    On-disk cache of the source replacements computed for a file.
+
+    Entries are keyed by a hash of the file content, the mydocpy version,
+    the names of the source and destination format and other options of the
+    processing. A file which needs no replacements is stored as an empty
+    entry.
+
+    When the cache grows beyond ``max_size`` bytes, the least recently used
+    entries are removed by ``prune``.
+
+    Lookups can happen in worker processes, so hits and misses are counted
+    by the caller with ``record``.
+
+    :ivar hits: number of files whose replacements were found in the cache
+    :ivar misses: number of files whose replacements had to be computed
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        # type: (Text, int) -> None
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(content, srcformat, destformat, options=()):
+        # type: (bytes, Text, Text, Iterable[Text]) -> Text
+        """
+        :param content: raw file content
+        :param options: other options changing the replacements
+        """
+        digest = hashlib.sha1()
+        parts = (__version__, str(OUTPUT_VERSION), srcformat, destformat)
+        for part in chain(parts, options):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        # type: (Text) -> Text
+        return os.path.join(self.directory, key[:2], key[2:])
+
+    def get(self, key):
+        # type: (Text) -> Optional[List[SourceReplacement]]
+        """
+        :return: cached replacements or None, when ``key`` is not cached (or
+            the entry is broken, it is removed then)
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path, None)  # mark as recently used
+        except (IOError, OSError):
+            return None
+
+        if not data:
+            return []
+        try:
+            return pickle.loads(data)
+        except _BROKEN_PICKLE:
+            # truncated or corrupted (by a crash or another program)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def put(self, key, source_replacements):
+        # type: (Text, List[SourceReplacement]) -> None
+        """
+        store ``source_replacements`` atomically (entries can be written by
+        several processes at once)
+        """
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path))
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+        data = b""
+        if source_replacements:
+            data = pickle.dumps(
+                list(source_replacements), pickle.HIGHEST_PROTOCOL)
+        atomic_write(path, data, fsync=False)  # a lost entry is no harm
+
+    def record(self, hit):
+        # type: (bool) -> None
+        """
+        count a cache hit or miss
+        """
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def prune(self):
+        # type: () -> int
+        """
+        remove least recently used entries until the cache is not bigger than
+        ``max_size``
+
+        :return: number of removed entries
+        """
+        entries = []
+        total = 0
+        for dirpath, dirnames, filenames in os.walk(self.directory):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                # empty entries still take a block on disk
+                size = max(stat.st_size, 512)
+                entries.append((stat.st_mtime, size, path))
+                total += size
+
+        if total <= self.max_size:
+            return 0
+
+        removed = 0
+        entries.sort()
+        for mtime, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,201 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+from fnmatch import fnmatch
+
+from typing import Iterable, Iterator, List, NamedTuple, Sequence, Text
+
+
+DEFAULT_INCLUDE = ("*.py",)
+
+_GitIgnoreRule = NamedTuple(
+    "_GitIgnoreRule",
+    [
+        ("base", Text),  # directory of the .gitignore file
+        ("pattern", Text),
+        ("negate", bool),
+        ("dir_only", bool),
+        ("anchored", bool)  # pattern must match the path relative to base
+    ]
+)
+
+
+def _matches(relpath, patterns):
+    # type: (Text, Iterable[Text]) -> bool
+    """
+    :return: True when the relative path or the base name of ``relpath``
+        matches one of the glob ``patterns``
+    """
+    name = relpath.rsplit("/", 1)[-1]
+    return any(
+        fnmatch(relpath, pattern) or fnmatch(name, pattern)
+        for pattern in patterns
+    )
+
+
+class GitIgnore(object):
+    """
+    Subset of the ``.gitignore`` semantics: glob patterns, negation with
+    ``!``, directory patterns ending with ``/`` and patterns anchored to the
+    directory of the ``.gitignore`` file.
+    """
+
+    def __init__(self, rules=()):
+        # type: (Sequence[_GitIgnoreRule]) -> None
+        self.rules = list(rules)  # type: List[_GitIgnoreRule]
+
+    def extend(self, directory):
+        # type: (Text) -> GitIgnore
+        """
+        :return: matcher with the rules of ``directory/.gitignore`` added or
+            ``self`` when the directory has no ``.gitignore``
+        """
+        path = os.path.join(directory, ".gitignore")
+        try:
+            with open(path, "r") as f:
+                lines = f.read().splitlines()
+        except (IOError, OSError):
+            return self
+
+        rules = list(self.rules)
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if line:
+                rules.append(
+                    _GitIgnoreRule(directory, line, negate, dir_only, anchored)
+                )
+
+        return GitIgnore(rules)
+
+    def ignored(self, path, is_dir):
+        # type: (Text, bool) -> bool
+        """
+        :return: True when ``path`` is ignored (the last matching rule wins)
+        """
+        ignored = False
+        for rule in self.rules:
+            if rule.dir_only and not is_dir:
+                continue
+
+            relpath = os.path.relpath(path, rule.base).replace(os.sep, "/")
+            if relpath.startswith("../"):
+                continue
+
+            if rule.anchored:
+                matched = fnmatch(relpath, rule.pattern)
+            else:
+                matched = fnmatch(relpath.rsplit("/", 1)[-1], rule.pattern)
+            if matched:
+                ignored = not rule.negate
+
+        return ignored
+
+
+def _parent_gitignore(directory):
+    # type: (Text) -> GitIgnore
+    """
+    :return: rules of all ``.gitignore`` files above ``directory`` up to the
+        root of the git work tree (nothing outside of a work tree)
+    """
+    parents = []
+    current = os.path.abspath(directory)
+    while True:
+        parent = os.path.dirname(current)
+        if os.path.exists(os.path.join(current, ".git")) or parent == current:
+            break
+        current = parent
+        parents.append(current)
+
+    if not os.path.exists(os.path.join(current, ".git")):
+        return GitIgnore()
+
+    gitignore = GitIgnore()
+    for parent in reversed(parents):
+        gitignore = gitignore.extend(parent)
+    return gitignore
+
+
+def _walk(root, include, exclude, gitignore):
+    # type: (Text, Sequence[Text], Sequence[Text], bool) -> Iterator[Text]
+    matchers = {}
+    if gitignore:
+        matchers[root] = _parent_gitignore(root).extend(root)
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        matcher = matchers.pop(dirpath, None)
+
+        def skip(name, is_dir):
+            path = os.path.join(dirpath, name)
+            relpath = os.path.relpath(path, root).replace(os.sep, "/")
+            if _matches(relpath, exclude):
+                return True
+            return matcher is not None and matcher.ignored(path, is_dir)
+
+        # prune in place, so that os.walk does not descend
+        dirnames[:] = sorted(
+            name for name in dirnames
+            if name != ".git" and not skip(name, True)
+        )
+        if matcher is not None:
+            for name in dirnames:
+                path = os.path.join(dirpath, name)
+                matchers[path] = matcher.extend(path)
+
+        for name in sorted(filenames):
+            relpath = os.path.relpath(
+                os.path.join(dirpath, name), root).replace(os.sep, "/")
+            if _matches(relpath, include) and not skip(name, False):
+                yield os.path.join(dirpath, name)
+
+
+def iter_source_files(
+        paths,                    # type: Iterable[Text]
+        include=DEFAULT_INCLUDE,  # type: Sequence[Text]
+        exclude=(),               # type: Sequence[Text]
+        gitignore=True            # type: bool
+):
+    # type: (...) -> Iterator[Text]
+    """
+    Lazily find source files.
+
+    Files in ``paths`` are yielded as they are, directories are walked
+    recursively.
+
+    :param include: glob patterns of the files to yield from directories
+    :param exclude: glob patterns of files and directories to skip in
+        directories (matched against the path relative to the walked
+        directory and against the base name)
+    :param gitignore: skip files and directories ignored by ``.gitignore``
+        files
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for srcfile in _walk(path, include, exclude, gitignore):
+                yield srcfile
+        else:
+            yield path
@@ -0,0 +1,131 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import re
+
+from typing import Callable, Dict, List, Optional, Pattern, Sequence, Text
+
+from mydocpy import docformats
+from mydocpy.docformats.doc_tools import DocUtilsStyle
+from mydocpy.docformats.sections import SECTIONS
+from mydocpy.docstrings import DocString
+from mydocpy.utils.registry import Registry
+
+
+_SECTION = r"(?:{})".format("|".join(SECTIONS))
+
+# first line of a field (``:type x:``, ``@param x:``), a NumPy section header
+# (underlined with dashes) or a Google section header (ending with a colon)
+_CLASSIFIER = (
+    r"^[ \t]*(?:"
+    r"(?P<docutils>[@:]\w+(?:[ \t]+[^\s:]+)*[ \t]*:(?=\s|$))"
+    r"|(?P<numpy>{0}[ \t]*\r?\n[ \t]*-{{3,}}[ \t]*$)"
+    r"|(?P<google>{0}[ \t]*:[ \t]*$)"
+    r")"
+).format(_SECTION)
+
+
+class AutoStyle(object):
+    """
+    Detect the format of every doc string and convert it with the matching
+    doc string format.
+
+    The content is scanned once for the first field or section header. Doc
+    strings without any are left alone.
+    """
+
+    # files without type information of any supported format
+    prescan = re.compile(
+        DocUtilsStyle.prescan.pattern +
+        r"|^[ \t]*{}[ \t]*(?::|\r?\n[ \t]*---)".format(_SECTION).encode(
+            "ascii"),
+        re.MULTILINE
+    )  # type: Pattern
+
+    def __init__(self, formats=None):
+        # type: (Optional[Dict[Text, Text]]) -> None
+        """
+        :param formats: name of the doc string format per detected syntax
+            (``docutils``, ``google`` and ``numpy``)
+        """
+        self.formats = formats or {
+            "docutils": "sphinx",
+            "google": "google",
+            "numpy": "numpy",
+        }  # type: Dict[Text, Text]
+        self._re_classifier = re.compile(_CLASSIFIER, re.MULTILINE)
+        self._docformats = {}  # type: Dict[Text, Optional[Callable]]
+
+    def classify(self, content):
+        # type: (Text) -> Optional[Text]
+        """
+        :return: ``docutils``, ``google``, ``numpy`` or None when the syntax
+            of ``content`` is unknown
+        """
+        match = self._re_classifier.search(content)
+        return match.lastgroup if match else None
+
+    def _get_docformat(self, syntax):
+        # type: (Text) -> Optional[Callable[[DocString], None]]
+        try:
+            return self._docformats[syntax]
+        except KeyError:
+            pass
+
+        try:
+            docformat = docformats.get_format(self.formats[syntax])
+        except KeyError:
+            docformat = None  # format is not available
+        self._docformats[syntax] = docformat
+        return docformat
+
+    def __call__(self, doc_string):
+        # type: (DocString) -> None
+        syntax = self.classify(doc_string.content)
+        if syntax is None:
+            return
+
+        docformat = self._get_docformat(syntax)
+        if docformat is not None:
+            docformat(doc_string)
+
+    def convert_all(self, doc_strings):
+        # type: (Sequence[DocString]) -> None
+        """
+        convert the doc strings of every syntax in one batch
+        """
+        groups = {}  # type: Dict[Text, List[DocString]]
+        for doc_string in doc_strings:
+            syntax = self.classify(doc_string.content)
+            if syntax is not None:
+                groups.setdefault(syntax, []).append(doc_string)
+
+        for syntax, group in groups.items():
+            docformat = self._get_docformat(syntax)
+            if docformat is None:
+                continue
+            convert_all = getattr(docformat, "convert_all", None)
+            if convert_all is not None:
+                convert_all(group)
+            else:
+                for doc_string in group:
+                    docformat(doc_string)
+
+
+def register_doc_formats(registry):
+    # type: (Registry) -> None
+    registry.register("auto", AutoStyle())
@@ -15,15 +15,21 @@
 # limitations under the License.
 
 import re
+from bisect import bisect_right
 
-from typing import Pattern, List
+from typing import List, Match, Optional, Pattern, Sequence, Text, Tuple
 
 from mydocpy.docstrings import TypeInformation, DocString, VarType, \
     FunctionDocString
-from mydocpy.source import SourceLocation
+from mydocpy.source import LineIndex, SourceLocation
 from mydocpy.utils.registry import Registry
 
 
+TYPE_FIELDS = ("type", "vartype")
+RTYPE_FIELDS = ("rtype",)
+PARAM_FIELDS = ("param", "parameter", "arg", "argument", "key", "keyword")
+
+
 class DocUtilsStyle(object):
     """
     Parse type information in docstring of Epydoc and Sphinx:
@@ -40,6 +46,14 @@ class DocUtilsStyle(object):
     _re_type = None  # type: Pattern
     _re_rtype = None  # type: Pattern
 
+    # Cheap test on the raw bytes of a file: files without a match have no
+    # type information for this format. Parameters need a type and a name.
+    prescan = re.compile(
+        r"[@:](?:(?:{})\b|(?:{})[ \t]+\w+[ \t]+\w)".format(
+            "|".join(TYPE_FIELDS + RTYPE_FIELDS), "|".join(PARAM_FIELDS)
+        ).encode("ascii")
+    )  # type: Pattern
+
     def __init__(self):
         # variable, parameter or return type
         #
@@ -49,45 +63,102 @@ class DocUtilsStyle(object):
             r"^[ \t]*[@:]([a-zA-Z]+)([ \t]+\w+)?([ \t]+\w+)?[ \t]*:(.*)$",
             re.MULTILINE)
 
+    @staticmethod
+    def _get_field(match, is_func):
+        # type: (Match, bool) -> Optional[Tuple[VarType, Optional[Text], Text]]
+        """
+        :return: kind, name and type of a field or None, when the field has
+            no type information
+        """
+        field = match.group(1)
+        if field in TYPE_FIELDS:
+            if match.group(3):
+                return None  # broken
+            vartype = VarType.PARAM if is_func else VarType.VAR
+            return vartype, match.group(2).strip(), match.group(4).strip()
+
+        if field in RTYPE_FIELDS:
+            if match.group(2):
+                return None  # broken
+            return VarType.RETURN, None, match.group(4).strip()
+
+        if field in PARAM_FIELDS:
+            if not match.group(3):
+                return None  # no type info
+            return VarType.PARAM, match.group(3).strip(), \
+                match.group(2).strip()
+
+        return None
+
     def __call__(self, doc_string):  # type: (DocString) -> None
         type_info = doc_string.type_info or []  # type: List[TypeInformation]
         content = doc_string.content
 
         is_func = isinstance(doc_string, FunctionDocString)
+        index = None  # type: Optional[LineIndex]
 
         for match in self._re_type.finditer(content):
-            field = match.group(1)
-            if field in ("type", "vartype"):
-                if match.group(3):
-                    continue  # broken
-                vartype = VarType.PARAM if is_func else VarType.VAR
-                name = match.group(2).strip()
-                expr = match.group(4).strip()
-
-            elif field == "rtype":
-                if match.group(2):
-                    continue  # broken
-                vartype = VarType.RETURN
-                name = None
-                expr = match.group(4).strip()
-
-            elif field in ("param", "parameter", "arg", "argument", "key",
-                           "keyword"):
-                if not match.group(3):
-                    continue  # no type info
-                vartype = VarType.PARAM
-                name = match.group(3).strip()
-                expr = match.group(2).strip()
-            else:
+            field = self._get_field(match, is_func)
+            if field is None:
                 continue
 
+            if index is None:
+                index = LineIndex(content)
             type_info.append(TypeInformation(
-                vartype, name, expr,
-                SourceLocation.from_text_pos(content, match.start(0))
-            ))
+                field[0], field[1], field[2], index.location(match.start(0))))
 
         doc_string.type_info = type_info
 
+    def convert_all(self, doc_strings):
+        # type: (Sequence[DocString]) -> None
+        """
+        Like calling the format for every doc string, but with one scan over
+        all contents.
+
+        The contents are joined with newlines (fields never span lines) and
+        every match is assigned to its doc string by its offset.
+        """
+        contents = [doc_string.content for doc_string in doc_strings]
+        text = "\n".join(contents)
+
+        # offset of every doc string in ``text``
+        starts = []  # type: List[int]
+        offset = 0
+        for content in contents:
+            starts.append(offset)
+            offset += len(content) + 1
+
+        type_infos = [
+            doc_string.type_info or [] for doc_string in doc_strings
+        ]  # type: List[List[TypeInformation]]
+
+        # matches are in order: count the lines incrementally
+        owner = -1
+        line = last_pos = 0
+        for match in self._re_type.finditer(text):
+            pos = match.start(0)
+            if owner + 1 < len(starts) and pos >= starts[owner + 1]:
+                # next doc string with a match
+                owner = bisect_right(starts, pos, owner + 1) - 1
+                line = 0
+                last_pos = starts[owner]
+            doc_string = doc_strings[owner]
+
+            field = self._get_field(
+                match, isinstance(doc_string, FunctionDocString))
+            if field is None:
+                continue
+
+            line += text.count("\n", last_pos, pos)
+            last_pos = pos
+            last_nl = text.rfind("\n", starts[owner], pos)
+            col = pos - (last_nl + 1 if last_nl >= 0 else starts[owner])
+            type_infos[owner].append(TypeInformation(
+                field[0], field[1], field[2], SourceLocation(line, col)))
+
+        for doc_string, type_info in zip(doc_strings, type_infos):
+            doc_string.type_info = type_info
+
 
 def register_doc_formats(registry): # type: (Registry) -> None
     registry.register("epydoc", DocUtilsStyle())
@@ -0,0 +1,133 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import re
+
+from typing import List, Optional, Pattern, Text, Tuple
+
+from mydocpy.docformats.sections import SECTIONS, get_var_type, \
+    is_type_expr, return_type, strip_optional
+from mydocpy.docstrings import DocString, TypeInformation, VarType
+from mydocpy.source import SourceLocation
+from mydocpy.utils.registry import Registry
+
+
+def _parse_item(item):
+    # type: (Text) -> Optional[Tuple[Text, Text]]
+    """
+    parse ``name (type): description``
+
+    :return: name and type or None, when the item has no type
+    """
+    start = item.find("(")
+    colon = item.find(":")
+    if start < 0 or colon < start:
+        return None
+
+    depth = 0
+    for end in range(start, len(item)):
+        if item[end] == "(":
+            depth += 1
+        elif item[end] == ")":
+            depth -= 1
+            if depth == 0:
+                break
+    else:
+        return None  # broken
+    if not item[end + 1:].lstrip().startswith(":"):
+        return None
+
+    name = item[:start].strip().lstrip("*")
+    expr = strip_optional(item[start + 1:end].strip())
+    if not name or not expr or " " in name:
+        return None
+    return name, expr
+
+
+class GoogleStyle(object):
+    """
+    Parse type information in Google style doc strings:
+
+        Args:
+            id (int): identifier
+            *args (str): more
+
+        Returns:
+            bool: success
+
+    The content is read line by line: a section header starts a section,
+    the first line of the section sets the indent of its items and deeper
+    indented lines are descriptions.
+    """
+
+    prescan = re.compile(
+        r"^[ \t]*(?:{})[ \t]*:[ \t]*\r?$".format(
+            "|".join(SECTIONS)).encode("ascii"),
+        re.MULTILINE
+    )  # type: Pattern
+
+    def __call__(self, doc_string):  # type: (DocString) -> None
+        type_info = doc_string.type_info or []  # type: List[TypeInformation]
+
+        section = None  # type: Optional[Text]
+        var_type = None  # type: Optional[VarType]
+        section_indent = 0
+        item_indent = None  # type: Optional[int]
+
+        for line_no, line in enumerate(doc_string.content.split("\n")):
+            stripped = line.strip()
+            if not stripped:
+                continue
+            indent = len(line) - len(line.lstrip())
+
+            if section is not None and indent <= section_indent:
+                section = None  # end of section
+
+            if section is None:
+                if stripped.endswith(":") and stripped[:-1] in SECTIONS:
+                    section = stripped[:-1]
+                    var_type = get_var_type(section, doc_string)
+                    section_indent = indent
+                    item_indent = None
+                continue
+
+            if item_indent is None:
+                item_indent = indent
+            elif indent != item_indent:
+                continue  # description of an item
+
+            location = SourceLocation(line_no, 0)
+            if var_type is not None:
+                item = _parse_item(stripped)
+                if item is not None:
+                    type_info.append(TypeInformation(
+                        var_type, item[0], item[1], location))
+            else:
+                # only the first line has a type, the following lines
+                # continue the description
+                expr = stripped.partition(":")[0].strip()
+                if ":" in stripped and is_type_expr(expr):
+                    type_info.append(TypeInformation(
+                        VarType.RETURN, None, return_type(section, [expr]),
+                        location))
+                section = None
+
+        doc_string.type_info = type_info
+
+
+def register_doc_formats(registry):  # type: (Registry) -> None
+    registry.register("google", GoogleStyle())
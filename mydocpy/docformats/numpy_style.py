@@ -0,0 +1,126 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import re
+
+from typing import List, Optional, Pattern, Text
+
+from mydocpy.docformats.sections import SECTIONS, get_var_type, \
+    is_type_expr, return_type, strip_optional
+from mydocpy.docstrings import DocString, TypeInformation, VarType
+from mydocpy.source import SourceLocation
+from mydocpy.utils.registry import Registry
+
+
+def _is_underline(line):
+    # type: (Text) -> bool
+    return len(line) >= 3 and line.strip("-") == ""
+
+
+class NumpyStyle(object):
+    """
+    Parse type information in NumPy style doc strings:
+
+        Parameters
+        ----------
+        id : int
+            identifier
+        x, y : float, optional
+
+        Returns
+        -------
+        bool
+            success
+
+    The content is read line by line: a line followed by an underline starts
+    a section, lines with the indent of the section header are items and
+    deeper indented lines are descriptions. Several return values are
+    combined to a ``Tuple``.
+    """
+
+    prescan = re.compile(
+        r"^[ \t]*(?:{})[ \t]*\r?\n[ \t]*---".format(
+            "|".join(SECTIONS)).encode("ascii"),
+        re.MULTILINE
+    )  # type: Pattern
+
+    def __call__(self, doc_string):  # type: (DocString) -> None
+        type_info = doc_string.type_info or []  # type: List[TypeInformation]
+
+        lines = doc_string.content.split("\n")
+        section = None  # type: Optional[Text]
+        var_type = None  # type: Optional[VarType]
+        section_indent = 0
+        returns = []  # type: List[Text]
+        returns_loc = None  # type: Optional[SourceLocation]
+        returns_section = None  # type: Optional[Text]
+        underline = False
+
+        for line_no, line in enumerate(lines + [""]):
+            stripped = line.strip()
+            if underline:
+                underline = False
+                continue
+            is_header = line_no + 1 < len(lines) and \
+                _is_underline(lines[line_no + 1].strip()) and stripped
+            if (is_header or line_no == len(lines)) and returns:
+                type_info.append(TypeInformation(
+                    VarType.RETURN, None,
+                    return_type(returns_section, returns),
+                    returns_loc))
+                returns = []
+            if is_header:
+                section = stripped if stripped in SECTIONS else None
+                var_type = \
+                    get_var_type(section, doc_string) if section else None
+                section_indent = len(line) - len(line.lstrip())
+                underline = True
+                continue
+
+            if section is None or not stripped:
+                continue
+            indent = len(line) - len(line.lstrip())
+            if indent > section_indent:
+                continue  # description of an item
+            if indent < section_indent:
+                section = None
+                continue
+
+            location = SourceLocation(line_no, 0)
+            names, sep, expr = stripped.partition(":")
+            expr = strip_optional(expr.strip())
+            if var_type is not None:
+                if not sep or not expr:
+                    continue  # no type
+                for name in names.split(","):
+                    type_info.append(TypeInformation(
+                        var_type, name.strip().lstrip("*"), expr, location))
+            else:
+                # ``type`` or ``name : type``
+                if not sep:
+                    expr = names.strip()
+                if is_type_expr(expr):
+                    if not returns:
+                        returns_loc = location
+                        returns_section = section
+                    returns.append(expr)
+
+        doc_string.type_info = type_info
+
+
+def register_doc_formats(registry):  # type: (Registry) -> None
+    registry.register("numpy", NumpyStyle())
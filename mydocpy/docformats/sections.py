@@ -0,0 +1,94 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Sections of Google and NumPy style doc strings
+"""
+
+from typing import Optional, Sequence, Text
+
+from mydocpy.docstrings import ClassDocString, DocString, VarType
+
+
+PARAM_SECTIONS = (
+    "Args", "Arguments", "Parameters", "Params", "Other Parameters",
+    "Keyword Args", "Keyword Arguments",
+)
+ATTRIBUTE_SECTIONS = ("Attributes",)
+RETURN_SECTIONS = ("Returns", "Return")
+YIELD_SECTIONS = ("Yields", "Yield")
+
+SECTIONS = PARAM_SECTIONS + ATTRIBUTE_SECTIONS + RETURN_SECTIONS + \
+    YIELD_SECTIONS
+
+
+def get_var_type(section, doc_string):
+    # type: (Text, DocString) -> Optional[VarType]
+    """
+    :return: kind of the names documented in ``section`` or None for
+        sections with types only
+    """
+    if section in PARAM_SECTIONS:
+        return VarType.PARAM
+    if section in ATTRIBUTE_SECTIONS:
+        if isinstance(doc_string, ClassDocString):
+            return VarType.IVAR
+        return VarType.VAR
+    return None
+
+
+def strip_optional(expr):
+    # type: (Text) -> Text
+    """
+    remove the ``optional`` marker: ``int, optional`` -> ``int``
+    """
+    head, sep, tail = expr.rpartition(",")
+    if sep and tail.strip() == "optional":
+        return head.strip()
+    return expr
+
+
+def is_type_expr(expr):
+    # type: (Text) -> bool
+    """
+    :return: whether ``expr`` looks like a type and not like a sentence (no
+        spaces outside of brackets)
+    """
+    if not expr:
+        return False
+    depth = 0
+    for c in expr:
+        if c in "([{":
+            depth += 1
+        elif c in ")]}":
+            depth -= 1
+        elif c.isspace() and depth == 0:
+            return False
+    return depth == 0
+
+
+def return_type(section, exprs):
+    # type: (Text, Sequence[Text]) -> Text
+    """
+    :return: type of a function returning (or yielding) the values with the
+        types ``exprs``
+    """
+    expr = exprs[0] if len(exprs) == 1 else \
+        "Tuple[{}]".format(", ".join(exprs))
+    if section in YIELD_SECTIONS:
+        return "Iterator[{}]".format(expr)
+    return expr
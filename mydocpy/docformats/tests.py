@@ -16,9 +16,14 @@
 
 from testtools import TestCase
 
-from mydocpy.docstrings import DocString, TypeInformation, VarType
+from mydocpy.docstrings import ClassDocString, DocString, \
+    FunctionDocString, TypeInformation, VarType
 from mydocpy.source import SourceLocation
+from mydocpy.docformats import load_formats
+from mydocpy.docformats.auto import AutoStyle
 from mydocpy.docformats.doc_tools import DocUtilsStyle
+from mydocpy.docformats.google_style import GoogleStyle
+from mydocpy.docformats.numpy_style import NumpyStyle
 
 
 class DocUtilsStyleTests(TestCase):
@@ -130,3 +135,232 @@ class DocUtilsStyleTests(TestCase):
     #         TypeInformation("name4", "dict", SourceLocation(None, 14, 0)),
     #         TypeInformation("name5", "float", SourceLocation(None, 18, 0))
     #     ], doc.type_info)
+
+
+class ConvertAllTests(TestCase):
+
+    def _doc_strings(self):
+        return [
+            FunctionDocString(content="""
+                :param int a: first
+                @type b: str
+                :rtype: bool"""),
+            DocString(content=""),
+            ClassDocString(content=":type x: int\n:ivar y: no type\n"),
+            DocString(content="\n\n  :type\tz : List[int]\n"),
+            FunctionDocString(content="text\n:rtype: int", type_info=[
+                TypeInformation(VarType.PARAM, "a", "int", None)]),
+        ]
+
+    def test_SameAsPerDocString(self):
+        sut = DocUtilsStyle()
+        expected = self._doc_strings()
+        for doc_string in expected:
+            sut(doc_string)
+
+        actual = self._doc_strings()
+        sut.convert_all(actual)
+
+        self.assertEqual(
+            [d.type_info for d in expected], [d.type_info for d in actual])
+        self.assertEqual(4, sum(len(d.type_info) > 0 for d in actual))
+
+    def test_Auto(self):
+        load_formats()
+        expected = self._doc_strings()
+        for doc_string in expected:
+            DocUtilsStyle()(doc_string)
+
+        actual = self._doc_strings()
+        AutoStyle().convert_all(actual)
+
+        self.assertEqual(
+            [d.type_info or [] for d in expected],
+            [d.type_info or [] for d in actual])
+
+
+class AutoStyleTests(TestCase):
+
+    def setUp(self):
+        super(AutoStyleTests, self).setUp()
+        load_formats()
+
+    def test_Classify(self):
+        sut = AutoStyle()
+
+        self.assertEqual("docutils", sut.classify("\n    :type a: int\n"))
+        self.assertEqual("docutils", sut.classify("@param a: first"))
+        self.assertEqual("google", sut.classify("Text.\n\nArgs:\n    a: x"))
+        self.assertEqual(
+            "numpy", sut.classify("Text.\n\nParameters\n----------\na : x"))
+        self.assertIsNone(sut.classify("See :class:`Foo`.\nArgs: none"))
+
+    def test_DispatchesPerDocString(self):
+        sut = AutoStyle()
+        content = """
+            Text
+
+            @type name1: int
+            :rtype: str
+        """
+        expected = DocString(content=content)
+        DocUtilsStyle()(expected)
+        doc_strings = [DocString(content=content), DocString(content="Text")]
+
+        for doc_string in doc_strings:
+            sut(doc_string)
+
+        self.assertEqual(expected.type_info, doc_strings[0].type_info)
+        self.assertIsNone(doc_strings[1].type_info)
+
+    def test_UnavailableFormat(self):
+        sut = AutoStyle({"docutils": "sphinx", "google": "does-not-exist"})
+        doc_string = DocString(content="Args:\n    a (int): x")
+
+        sut(doc_string)
+
+        self.assertIsNone(doc_string.type_info)
+
+    def test_Prescan(self):
+        sut = AutoStyle()
+
+        self.assertIsNotNone(sut.prescan.search(b":type a: int"))
+        self.assertIsNotNone(sut.prescan.search(b'"""\n    Args:\n'))
+        self.assertIsNotNone(
+            sut.prescan.search(b"    Returns\n    -------\n"))
+        self.assertIsNone(sut.prescan.search(b"x = 1  # Args: none\n"))
+
+
+class GoogleStyleTests(TestCase):
+
+    def test_Function(self):
+        sut = GoogleStyle()
+        doc_string = FunctionDocString(content="""Summary.
+
+            Args:
+                name1 (int): first
+                    still first (not: a type)
+                name2: no type
+                *args (Dict[str, int], optional): more
+
+            Returns:
+                bool: True on success,
+                    False: otherwise.
+
+            Raises:
+                ValueError: broken
+            """)
+
+        sut(doc_string)
+
+        self.assertEqual([
+            TypeInformation(
+                VarType.PARAM, "name1", "int", SourceLocation(3, 0)),
+            TypeInformation(
+                VarType.PARAM, "args", "Dict[str, int]",
+                SourceLocation(6, 0)),
+            TypeInformation(VarType.RETURN, None, "bool", SourceLocation(9, 0)),
+        ], doc_string.type_info)
+
+    def test_Attributes(self):
+        sut = GoogleStyle()
+        doc_string = ClassDocString(content="""
+            Attributes:
+                value (List[int]): values
+            Yields:
+                The values
+            """)
+
+        sut(doc_string)
+
+        self.assertEqual([
+            TypeInformation(
+                VarType.IVAR, "value", "List[int]", SourceLocation(2, 0)),
+        ], doc_string.type_info)
+
+    def test_Yields(self):
+        sut = GoogleStyle()
+        doc_string = FunctionDocString(content="Yields:\n    int: numbers")
+
+        sut(doc_string)
+
+        self.assertEqual([
+            TypeInformation(
+                VarType.RETURN, None, "Iterator[int]", SourceLocation(1, 0)),
+        ], doc_string.type_info)
+
+
+class NumpyStyleTests(TestCase):
+
+    def test_Function(self):
+        sut = NumpyStyle()
+        doc_string = FunctionDocString(content="""Summary.
+
+            Parameters
+            ----------
+            x, y : float, optional
+                coordinates
+            flag
+                no type
+            **kwargs : dict
+
+            Returns
+            -------
+            int
+                count
+            name : str
+                name
+
+            Notes
+            -----
+            a : b
+            """)
+
+        sut(doc_string)
+
+        self.assertEqual([
+            TypeInformation(VarType.PARAM, "x", "float", SourceLocation(4, 0)),
+            TypeInformation(VarType.PARAM, "y", "float", SourceLocation(4, 0)),
+            TypeInformation(
+                VarType.PARAM, "kwargs", "dict", SourceLocation(8, 0)),
+            TypeInformation(
+                VarType.RETURN, None, "Tuple[int, str]",
+                SourceLocation(12, 0)),
+        ], doc_string.type_info)
+
+    def test_Attributes(self):
+        sut = NumpyStyle()
+        doc_string = ClassDocString(content="""
+            Attributes
+            ----------
+            value : List[int]
+            """)
+
+        sut(doc_string)
+
+        self.assertEqual([
+            TypeInformation(
+                VarType.IVAR, "value", "List[int]", SourceLocation(3, 0)),
+        ], doc_string.type_info)
+
+    def test_YieldsAtEnd(self):
+        sut = NumpyStyle()
+        doc_string = FunctionDocString(content="Yields\n------\nint")
+
+        sut(doc_string)
+
+        self.assertEqual([
+            TypeInformation(
+                VarType.RETURN, None, "Iterator[int]", SourceLocation(2, 0)),
+        ], doc_string.type_info)
+
+    def test_Auto(self):
+        load_formats()
+        doc_string = FunctionDocString(
+            content="Parameters\n----------\nx : int\n")
+
+        AutoStyle()(doc_string)
+
+        self.assertEqual(
+            [TypeInformation(VarType.PARAM, "x", "int", SourceLocation(2, 0))],
+            doc_string.type_info)
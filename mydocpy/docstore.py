@@ -0,0 +1,339 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Compact columnar storage of doc strings.
+
+``DocStringStore`` keeps the doc strings of many files in a few flat arrays
+and lists instead of one object per doc string, per ``TypeInformation`` and
+per ``SourceLocation``. Names and type expressions are interned, because the
+same few ones repeat throughout a project. Records are turned back into
+regular ``DocString`` objects on access, so the formats can read them
+unchanged::
+
+    store = DocStringStore()
+    store.add_file(path, docstrings)
+    for docstring in store.file(path):
+        style_format(docstring, source_replacements)
+
+The command line tool does not use the store: it converts one file at a
+time and drops the doc strings of a file once its output is written, so
+there is nothing to keep. The store is meant for tools holding the doc
+strings of a whole project in one process.
+
+See ``benchmarks.bench_docstore`` for the memory savings.
+"""
+
+from array import array
+
+from typing import Dict, Iterable, Iterator, List, Optional, Text, Tuple
+
+from mydocpy.docstrings import ClassDocString, DocString, FuncType, \
+    FunctionDocString, ModuleDocString, Parameter, Signature, \
+    TypeInformation, VarType
+from mydocpy.source import SourceLocation
+
+_KINDS = (DocString, FunctionDocString, ClassDocString, ModuleDocString)
+_KIND_IDS = {kind: i for i, kind in enumerate(_KINDS)}
+
+_FUNC_TYPES = list(FuncType)
+_VAR_TYPES = list(VarType)
+
+_NONE = -1
+
+
+def _location_fields(location):
+    # type: (Optional[SourceLocation]) -> Tuple[int, int]
+    if location is None:
+        return _NONE, _NONE
+    return location.line, location.col
+
+
+def _location(line, col):
+    # type: (int, int) -> Optional[SourceLocation]
+    if line == _NONE:
+        return None
+    return SourceLocation(line, col)
+
+
+class DocStringStore(object):
+    """
+    Doc strings of one or more files in columns
+
+    Record ``i`` is described by the ``i``-th entry of every record column.
+    Variable length parts (type information, arguments and decorators) are
+    stored in shared columns, ``*_start[i]`` to ``*_start[i + 1]`` are the
+    entries of record ``i``. Every slot of the doc strings is stored.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self._strings = {}  # type: Dict[Text, int]
+        self.strings = []  # type: List[Optional[Text]]
+
+        # one entry per record
+        self.kind = array("b")
+        self.content = []  # type: List[Text]
+        self.qualname = array("i")  # index into ``strings``
+        # obj line, obj col, doc line, doc col, end line, end col
+        self.locations = array("i")
+        self.doc_span = array("i")  # start, end
+        self.has_type_info = array("b")
+        self.func_type = array("b")
+        self.vaarg = array("i")  # index into ``strings``
+        self.kwarg = array("i")
+        self.posonly = array("i")
+        self.is_async = array("b")
+        self.bases = array("i")
+        self.type_info_start = array("I", [0])
+        self.args_start = array("I", [0])
+        self.kwonlyargs_start = array("I", [0])
+        self.defaults_start = array("I", [0])
+        self.decorators_start = array("I", [0])
+        self.has_signature = array("b")
+        self.signature_closing = array("i")  # line, col
+        self.signature_returns = array("b")
+        self.parameters_start = array("I", [0])
+
+        # one entry per type information
+        self.var_type = array("b")
+        self.name = array("i")
+        self.expr = array("i")
+        self.type_info_locations = array("i")  # line, col
+
+        # one entry per argument, keyword-only argument, argument with
+        # default value and decorator
+        self.args = array("i")
+        self.kwonlyargs = array("i")
+        self.defaults = array("i")
+        self.decorators = array("i")
+
+        # one entry per parameter of a signature
+        self.parameter_name = array("i")
+        # name end line, name end col, default line, default col
+        self.parameter_locations = array("i")
+        self.parameter_annotated = array("b")
+
+        self.files = {}  # type: Dict[Text, Tuple[int, int]]
+
+    def _intern(self, string):
+        # type: (Optional[Text]) -> int
+        if string is None:
+            return _NONE
+        index = self._strings.get(string)
+        if index is None:
+            index = self._strings[string] = len(self.strings)
+            self.strings.append(string)
+        return index
+
+    def _string(self, index):
+        # type: (int) -> Optional[Text]
+        return None if index == _NONE else self.strings[index]
+
+    def _extend_strings(self, column, start, strings):
+        # type: (array, array, Iterable[Optional[Text]]) -> None
+        column.extend(self._intern(string) for string in strings)
+        start.append(len(column))
+
+    def _strings_of(self, column, start, index):
+        # type: (array, array, int) -> List[Optional[Text]]
+        return [self._string(i)
+                for i in column[start[index]:start[index + 1]]]
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.kind)
+
+    def append(self, docstring):
+        # type: (DocString) -> int
+        """
+        :return: index of the record
+        """
+        self.kind.append(_KIND_IDS[type(docstring)])
+        self.content.append(docstring.content)
+        self.qualname.append(self._intern(docstring.name))
+        for location in (
+                docstring.obj_loc, docstring.doc_loc, docstring.doc_end):
+            self.locations.extend(_location_fields(location))
+        self.doc_span.extend(docstring.doc_span or (_NONE, _NONE))
+
+        type_info = docstring.type_info
+        self.has_type_info.append(type_info is not None)
+        for info in type_info or ():
+            self.var_type.append(_VAR_TYPES.index(info.var_type))
+            self.name.append(self._intern(info.name))
+            self.expr.append(self._intern(info.expr))
+            self.type_info_locations.extend(
+                _location_fields(info.source_loc))
+        self.type_info_start.append(len(self.var_type))
+
+        if isinstance(docstring, FunctionDocString):
+            func_type = docstring.func_type
+            self.func_type.append(
+                _NONE if func_type is None else _FUNC_TYPES.index(func_type))
+            self.vaarg.append(self._intern(docstring.vaarg))
+            self.kwarg.append(self._intern(docstring.kwarg))
+            self.posonly.append(docstring.posonly)
+            self.is_async.append(docstring.is_async)
+            args = docstring.args or ()
+            kwonlyargs = docstring.kwonlyargs
+            defaults = sorted(docstring.defaults)
+            decorators = docstring.decorators
+            signature = docstring.signature
+        else:
+            self.func_type.append(_NONE)
+            self.vaarg.append(_NONE)
+            self.kwarg.append(_NONE)
+            self.posonly.append(0)
+            self.is_async.append(False)
+            args = kwonlyargs = defaults = decorators = ()
+            signature = None
+        self._extend_strings(self.args, self.args_start, args)
+        self._extend_strings(
+            self.kwonlyargs, self.kwonlyargs_start, kwonlyargs)
+        self._extend_strings(self.defaults, self.defaults_start, defaults)
+        self._extend_strings(
+            self.decorators, self.decorators_start, decorators)
+
+        self.has_signature.append(signature is not None)
+        if signature is None:
+            self.signature_closing.extend((_NONE, _NONE))
+            self.signature_returns.append(False)
+        else:
+            self.signature_closing.extend(
+                _location_fields(signature.closing))
+            self.signature_returns.append(signature.returns)
+            for parameter in signature.parameters:
+                self.parameter_name.append(self._intern(parameter.name))
+                self.parameter_locations.extend(
+                    _location_fields(parameter.name_end))
+                self.parameter_locations.extend(
+                    _location_fields(parameter.default))
+                self.parameter_annotated.append(parameter.annotated)
+        self.parameters_start.append(len(self.parameter_name))
+
+        self.bases.append(self._intern(
+            docstring.bases if isinstance(docstring, ClassDocString)
+            else None))
+
+        return len(self.kind) - 1
+
+    def extend(self, docstrings):
+        # type: (Iterable[DocString]) -> Tuple[int, int]
+        """
+        :return: range of the indices of the new records
+        """
+        start = len(self)
+        for docstring in docstrings:
+            self.append(docstring)
+        return start, len(self)
+
+    def add_file(self, path, docstrings):
+        # type: (Text, Iterable[DocString]) -> None
+        """
+        store the doc strings of the file ``path``
+        """
+        self.files[path] = self.extend(docstrings)
+
+    def file(self, path):
+        # type: (Text) -> Iterator[DocString]
+        """
+        :return: doc strings of the file ``path``
+        """
+        return (self[i] for i in range(*self.files[path]))
+
+    def type_info(self, index):
+        # type: (int) -> Optional[List[TypeInformation]]
+        if not self.has_type_info[index]:
+            return None
+
+        type_info = []  # type: List[TypeInformation]
+        locations = self.type_info_locations
+        for i in range(
+                self.type_info_start[index], self.type_info_start[index + 1]):
+            type_info.append(TypeInformation(
+                _VAR_TYPES[self.var_type[i]],
+                self._string(self.name[i]),
+                self._string(self.expr[i]),
+                _location(locations[2 * i], locations[2 * i + 1])))
+        return type_info
+
+    def signature(self, index):
+        # type: (int) -> Optional[Signature]
+        if not self.has_signature[index]:
+            return None
+
+        parameters = []  # type: List[Parameter]
+        locations = self.parameter_locations
+        for i in range(
+                self.parameters_start[index],
+                self.parameters_start[index + 1]):
+            parameters.append(Parameter(
+                self._string(self.parameter_name[i]),
+                _location(locations[4 * i], locations[4 * i + 1]),
+                _location(locations[4 * i + 2], locations[4 * i + 3]),
+                bool(self.parameter_annotated[i])))
+        closing = self.signature_closing
+        return Signature(
+            parameters,
+            _location(closing[2 * index], closing[2 * index + 1]),
+            bool(self.signature_returns[index]))
+
+    def __getitem__(self, index):
+        # type: (int) -> DocString
+        """
+        :return: record ``index`` as new ``DocString``
+        """
+        if index < 0:
+            index += len(self)
+        kind = _KINDS[self.kind[index]]
+        locations = self.locations[6 * index:6 * index + 6]
+
+        docstring = kind(self.content[index])
+        docstring.name = self._string(self.qualname[index])
+        docstring.obj_loc = _location(locations[0], locations[1])
+        docstring.doc_loc = _location(locations[2], locations[3])
+        docstring.doc_end = _location(locations[4], locations[5])
+        docstring.type_info = self.type_info(index)
+        if self.doc_span[2 * index] != _NONE:
+            docstring.doc_span = tuple(self.doc_span[2 * index:2 * index + 2])
+
+        if kind is FunctionDocString:
+            func_type = self.func_type[index]
+            docstring.func_type = \
+                None if func_type == _NONE else _FUNC_TYPES[func_type]
+            docstring.vaarg = self._string(self.vaarg[index])
+            docstring.kwarg = self._string(self.kwarg[index])
+            docstring.posonly = self.posonly[index]
+            docstring.is_async = bool(self.is_async[index])
+            docstring.args = self._strings_of(
+                self.args, self.args_start, index)
+            docstring.kwonlyargs = self._strings_of(
+                self.kwonlyargs, self.kwonlyargs_start, index)
+            docstring.defaults = frozenset(self._strings_of(
+                self.defaults, self.defaults_start, index))
+            docstring.decorators = self._strings_of(
+                self.decorators, self.decorators_start, index)
+            docstring.signature = self.signature(index)
+        elif kind is ClassDocString:
+            docstring.bases = self._string(self.bases[index])
+        return docstring
+
+    def __iter__(self):
+        # type: () -> Iterator[DocString]
+        for i in range(len(self)):
+            yield self[i]
@@ -18,7 +18,8 @@ import ast
 from collections import namedtuple
 from enum import Enum
 
-from typing import MutableSequence, Optional, Sequence, Text
+from typing import FrozenSet, MutableSequence, Optional, Sequence, Text, \
+    Tuple
 
 from mydocpy.source import SourceLocation
 
@@ -33,18 +34,36 @@ TypeInformation = namedtuple(
 )
 
 
+# parameter of a function header: ``name_end`` is the location after its
+# name, ``default`` the location of its default value (after ``=`` and
+# spaces) or None and ``annotated`` whether it has an annotation
+Parameter = namedtuple(
+    "Parameter", ["name", "name_end", "default", "annotated"])
+
+# all parameters of a function header (including ``*args`` and
+# ``**kwargs``), the location after its closing parenthesis and whether it
+# has a return annotation
+Signature = namedtuple("Signature", ["parameters", "closing", "returns"])
+
+
 class DocString(object):
-    content = None  # type: Text
-    obj_loc = None  # type: SourceLocation
-    doc_loc = None  # type: SourceLocation
-    type_info = None  # type: MutableSequence[TypeInformation]
+
+    __slots__ = (
+        "content", "obj_loc", "doc_loc", "doc_end", "doc_span", "type_info",
+        "name")
 
     def __init__(self, content=None, obj_loc=None, source_loc=None,
                  type_info=None):
-        self.content = content
-        self.obj_loc = obj_loc
-        self.doc_loc = source_loc
-        self.type_info = type_info
+        self.content = content  # type: Text
+        self.obj_loc = obj_loc  # type: SourceLocation
+        self.doc_loc = source_loc  # type: SourceLocation
+        self.doc_end = None  # type: Optional[SourceLocation]
+        # character offsets of the literal (only set by ``mydocpy.tokenparse``)
+        self.doc_span = None  # type: Optional[Tuple[int, int]]
+        self.type_info = type_info  # type: MutableSequence[TypeInformation]
+        # qualified name of the object in its module (like ``__qualname__``,
+        # None for modules)
+        self.name = None  # type: Optional[Text]
 
     def guess_indent(self):
         # type: () -> Text
@@ -60,11 +79,23 @@ class DocString(object):
     @classmethod
     def from_node(cls, obj_node, doc_node):
         # type: (ast.stmt, ast.Str) -> DocString
-        return cls(
-            doc_node.s,
-            SourceLocation.from_node(obj_node),
+        return cls._from_node(SourceLocation.from_node(obj_node), doc_node)
+
+    @classmethod
+    def _from_node(cls, obj_loc, doc_node):
+        # type: (SourceLocation, ast.Str) -> DocString
+        doc_string = cls(
+            doc_node.value if hasattr(doc_node, "value") else doc_node.s,
+            obj_loc,
             SourceLocation.from_node(doc_node)
         )
+        if hasattr(doc_node, "end_lineno"):  # Python 3.8+
+            doc_string.doc_end = SourceLocation(
+                doc_node.end_lineno - 1, doc_node.end_col_offset)
+        else:
+            # the location of multi-line strings is their last line
+            doc_string.doc_end = doc_string.doc_loc
+        return doc_string
 
     def __repr__(self):
         return (
@@ -87,20 +118,32 @@ class FuncType(Enum):
 
 
 class FunctionDocString(DocString):
-    args = None  # type: Sequence[Text]
-    vaarg = None  # type: Optional[Text]
-    kwarg = None  # type: Optional[Text]
-    func_type = None  # type: Optional[FuncType]
+
+    __slots__ = (
+        "args", "vaarg", "kwarg", "func_type", "posonly", "kwonlyargs",
+        "defaults", "is_async", "decorators", "signature")
 
     def __init__(self, content=None, source_loc=None,
                  type_info=None, params=None, vararg=None, kwarg=None,
                  func_type=None
                  ):
         super(FunctionDocString, self).__init__(content, source_loc, type_info)
-        self.args = params
-        self.vaarg = vararg
-        self.kwarg = kwarg
-        self.func_type = func_type
+        self.args = params  # type: Sequence[Text]
+        self.vaarg = vararg  # type: Optional[Text]
+        self.kwarg = kwarg  # type: Optional[Text]
+        self.func_type = func_type  # type: Optional[FuncType]
+        # number of positional-only parameters at the start of ``args``
+        self.posonly = 0
+        self.kwonlyargs = []  # type: Sequence[Text]
+        # names of the parameters with default value
+        self.defaults = frozenset()  # type: FrozenSet[Text]
+        self.is_async = False
+        # dotted names of the decorators (like ``value.setter``, None for
+        # other expressions)
+        self.decorators = []  # type: Sequence[Optional[Text]]
+        # source locations of the parameters (only set, when the parser got
+        # the source text)
+        self.signature = None  # type: Optional[Signature]
 
     def __repr__(self):
         return (
@@ -120,6 +163,16 @@ class FunctionDocString(DocString):
 
 class ClassDocString(DocString):
 
+    __slots__ = ("bases",)
+
+    def __init__(self, content=None, obj_loc=None, source_loc=None,
+                 type_info=None):
+        super(ClassDocString, self).__init__(
+            content, obj_loc, source_loc, type_info)
+        # normalized source of the base classes and keywords (None before
+        # Python 3.9)
+        self.bases = None  # type: Optional[Text]
+
     def __repr__(self):
         return (
             "ClassDocString(content={}, obj_loc={}, doc_loc={}, "
@@ -129,3 +182,20 @@ class ClassDocString(DocString):
             )
         )
 
+
+class ModuleDocString(DocString):
+
+    __slots__ = ()
+
+    @classmethod
+    def from_node(cls, obj_node, doc_node):
+        # type: (ast.Module, ast.Str) -> ModuleDocString
+        return cls._from_node(SourceLocation(0, 0), doc_node)
+
+    def __repr__(self):
+        return (
+            "ModuleDocString(content={}, doc_loc={}, "
+            "type_information={})".format(
+                repr(self.content), repr(self.doc_loc), repr(self.type_info)
+            )
+        )
@@ -14,62 +14,59 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import os
-import pkgutil
-from importlib import import_module
+from typing import Callable, Sequence, Text, TYPE_CHECKING
 
-from typing import Sequence, Text, Callable
-
-from mydocpy.docstrings import DocString
 from mydocpy.utils.registry import Registry
 
+if TYPE_CHECKING:
+    from mydocpy.docstrings import DocString
+
+
+# modules of the built-in formats (imported on first use)
+INDEX = {
+    "annotations": "mydocpy.formats.annotation_style",
+    "comment": "mydocpy.formats.comment_style",
+    "stub": "mydocpy.formats.stub_style",
+}
+
+# entry point group of format plugins: ``name = module``, the module has to
+# provide ``register_formats(registry)``
+ENTRY_POINT_GROUP = "mydocpy.formats"
 
 registry = None  # type: Registry
 
 
-def get_formats():
-    # type: () -> Sequence[unicode]
+def get_formats(plugins=True):
+    # type: (bool) -> Sequence[Text]
     """
-    :return: names of all registered formats or None if formats are not
+    :param plugins: include formats of installed plugins (slow, because all
+        installed packages are searched)
+    :return: names of all known formats or None if formats are not
         loaded (call ``load_formats`` first)
     """
-    return registry.entries.keys() if registry else None
+    return registry.names(plugins) if registry else None
 
 
 def get_format(name):
     # type: (Text) -> Callable[[DocString], None]
     """
-    Get format with ``name``
+    Get format with ``name``. Its module is imported when needed.
 
     :raises: KeyError, when format with ``name`` does not exit
     """
-    return registry.entries[name]
+    return registry.get(name)
 
 
 def load_formats():
     # type: () -> None
     """
-    import all format modules and call ``register_formats(registry)`` on them
-    (when a module has this function).
+    create the registry of all formats. The module of a format is imported,
+    when the format is used first, and ``register_formats(registry)`` is
+    called on it.
     """
     global registry
 
     if registry is not None:
         return
 
-    registry = Registry()
-
-    modules = pkgutil.iter_modules(
-        [os.path.dirname(__file__)],
-        'mydocpy.formats.'
-    )
-    # TODO: add a way to add formats from the outside
-
-    for module_loader, name, ispkg in modules:
-        if not ispkg:
-            # TODO: use module_loader?
-            mdl = import_module(name)
-            if hasattr(mdl, 'register_formats'):
-                mdl.register_formats(registry)
-
-
+    registry = Registry("register_formats", INDEX, ENTRY_POINT_GROUP)
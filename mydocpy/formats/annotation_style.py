@@ -0,0 +1,133 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Inline annotations (PEP 484 and PEP 526) instead of type comments.
+
+The parameters are annotated at the locations of the function header
+recorded by the parser (``FunctionDocString.signature``), so the source is
+not searched again. Existing annotations are kept.
+
+Annotations are evaluated at runtime, unlike type comments: the hints may
+name the enclosing class, classes defined later or names imported only in
+an ``if TYPE_CHECKING:`` block. So ``from __future__ import annotations``
+(Python 3.7+) is imported with the type hints.
+"""
+
+from typing import MutableSequence, MutableSet
+
+from mydocpy.docstrings import ClassDocString, FuncType, FunctionDocString, \
+    VarType
+from mydocpy.formats import Registry
+from mydocpy.formats.comment_style import CommentStyle
+from mydocpy.replacements import SourceReplacement
+from mydocpy.source import SourceRange
+from mydocpy.types import ImportedType
+
+_CLASS_VAR = ImportedType("typing", "ClassVar")
+_ANNOTATIONS = ImportedType("__future__", "annotations")
+
+
+class AnnotationStyle(CommentStyle):
+
+    def _handle_FunctionDocString(
+            self,
+            doc_string,           # type: FunctionDocString
+            source_replacements,  # type: MutableSequence[SourceReplacement]
+            imports               # type: MutableSet[ImportedType]
+    ):
+        # type: (...) -> None
+        signature = doc_string.signature
+        if signature is None:
+            return  # header not known (or formatted in an unusual way)
+
+        params = {}
+        returns = None
+        for type_info in doc_string.type_info:
+            kind = type_info.var_type
+            if kind in (VarType.PARAM, VarType.VAR):
+                params[type_info.name] = self._type_hint(type_info, imports)
+            elif kind == VarType.RETURN:
+                returns = self._type_hint(type_info, imports)
+
+        count = len(source_replacements)
+        parameters = signature.parameters
+        # ignore first arg of instance and class methods
+        if doc_string.args and parameters and \
+                parameters[0].name == doc_string.args[0] and \
+                doc_string.func_type in (FuncType.INSTANCE, FuncType.CLASS):
+            parameters = parameters[1:]
+
+        for parameter in parameters:
+            type_hint = params.get(parameter.name)
+            if type_hint is None or parameter.annotated:
+                continue
+            if parameter.default is None:
+                source_replacements.append(SourceReplacement(
+                    SourceRange.from_location(parameter.name_end),
+                    ": " + type_hint))
+            else:
+                source_replacements.append(SourceReplacement(
+                    SourceRange(
+                        parameter.name_end,
+                        parameter.default - parameter.name_end),
+                    ": {} = ".format(type_hint)))
+
+        if not signature.returns:
+            source_replacements.append(SourceReplacement(
+                SourceRange.from_location(signature.closing),
+                " -> {}".format(returns)))
+
+        if len(source_replacements) != count:
+            imports.add(_ANNOTATIONS)
+
+    def _handle_ClassDocString(
+            self,
+            doc_string,           # type: ClassDocString
+            source_replacements,  # type: MutableSequence[SourceReplacement]
+            imports               # type: MutableSet[ImportedType]
+    ):
+        # type: (...) -> None
+        variables = []
+        for type_info in doc_string.type_info:
+            kind = type_info.var_type
+            if kind in (VarType.IVAR, VarType.VAR):
+                variables.append((
+                    type_info.name, self._type_hint(type_info, imports)))
+            elif kind == VarType.CVAR:
+                imports.add(_CLASS_VAR)
+                variables.append((
+                    type_info.name, "ClassVar[{}]".format(
+                        self._type_hint(type_info, imports))))
+
+        if variables:
+            imports.add(_ANNOTATIONS)
+
+        indent = doc_string.guess_indent()
+        srange = SourceRange.from_location(doc_string.doc_end.next_line())
+        replacement = "\n" + "".join(
+            "{}{}: {}\n".format(indent, name, type_hint)
+            for name, type_hint in variables)
+        source_replacements.append(SourceReplacement(srange, replacement))
+
+
+def register_formats(registry):
+    # type: (Registry) -> None
+    """
+    register annotation format
+    """
+    registry.register("annotations", AnnotationStyle())
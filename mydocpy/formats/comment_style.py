@@ -16,21 +16,29 @@
 
 from enum import Enum
 
-from typing import MutableSequence, Sequence
+from typing import MutableSequence, MutableSet, Optional, Sequence, Text
 
 from mydocpy.docstrings import ClassDocString, DocString, FuncType, \
-    FunctionDocString, VarType
+    FunctionDocString, ModuleDocString, TypeInformation, VarType
 from mydocpy.formats import Registry
 from mydocpy.replacements import SourceReplacement
 from mydocpy.source import SourceRange
+from mydocpy.types import ImportedType, Resolver, TypeInterpreter
 
 
 class TypeCommentStyle(Enum):
     IN_LINE, NEW_LINE, ARG_PER_LINE = range(3)
 
 
+_ANY = ImportedType("typing", "Any")
+_CLASS_VAR = ImportedType("typing", "ClassVar")
+
+
 class CommentStyle(object):
 
+    # ``__call__`` adds the imports of the type hints to ``imports``
+    collects_imports = True
+
     styleOrder = None  # type: Sequence[TypeCommentStyle]
 
     # TODO: get editor style
@@ -39,18 +47,41 @@ class CommentStyle(object):
     def __init__(self):
         # type: () -> None
         self.styleOrder = None
-
-    def _handle_FunctionDocString(self, doc_string, source_replacements):
-        # type: (FunctionDocString, MutableSequence[SourceReplacement]) -> None
+        self.interpreter = TypeInterpreter()
+
+    def with_resolver(self, resolver):
+        # type: (Resolver) -> CommentStyle
+        """
+        :return: copy of this style, which imports other names with
+            ``resolver``
+        """
+        style = type(self)()
+        style.styleOrder = self.styleOrder
+        style.interpreter = TypeInterpreter(resolver=resolver)
+        return style
+
+    def _type_hint(self, type_info, imports):
+        # type: (TypeInformation, MutableSet[ImportedType]) -> Text
+        type_hint, needed = self.interpreter.interpret(type_info.expr)
+        imports.update(needed)
+        return type_hint
+
+    def _handle_FunctionDocString(
+            self,
+            doc_string,           # type: FunctionDocString
+            source_replacements,  # type: MutableSequence[SourceReplacement]
+            imports               # type: MutableSet[ImportedType]
+    ):
+        # type: (...) -> None
 
         params = {}
         returns = None
         for type_info in doc_string.type_info:
             kind = type_info.var_type
             if kind in (VarType.PARAM, VarType.VAR):
-                params[type_info.name] = type_info.expr
+                params[type_info.name] = self._type_hint(type_info, imports)
             elif kind == VarType.RETURN:
-                returns = type_info.expr
+                returns = self._type_hint(type_info, imports)
 
         # ignore first arg of instance and class methods
         func_args = doc_string.args[:]
@@ -68,10 +99,16 @@ class CommentStyle(object):
         if doc_string.vaarg:
             arg_types.append("*" + params.get(doc_string.vaarg, "Any"))
 
+        # keyword-only args follow ``*args`` or the bare ``*``
+        for arg in doc_string.kwonlyargs:
+            arg_types.append(params.get(arg, "Any"))
+
         if doc_string.kwarg:
             arg_types.append("**" + params.get(doc_string.kwarg, "Any"))
 
-        # TODO: add import for Any when needed!
+        if any(arg_type.lstrip("*") == "Any" for arg_type in arg_types):
+            imports.add(_ANY)
+
         # TODO: use right indent (from origin docstring)
         # create
         srange = SourceRange.from_location(doc_string.obj_loc.next_line())
@@ -80,23 +117,30 @@ class CommentStyle(object):
         )
         source_replacements.append(SourceReplacement(srange, replacement))
 
-    def _handle_ClassDocString(self, doc_string, source_replacements):
-        # type: (ClassDocString, MutableSequence[SourceReplacement]) -> None
+    def _handle_ClassDocString(
+            self,
+            doc_string,           # type: ClassDocString
+            source_replacements,  # type: MutableSequence[SourceReplacement]
+            imports               # type: MutableSet[ImportedType]
+    ):
+        # type: (...) -> None
 
         ivars = {}
         cvars = {}
         for type_info in doc_string.type_info:
             kind = type_info.var_type
             if kind in (VarType.IVAR, VarType.VAR):
-                ivars[type_info.name] = type_info.expr
+                ivars[type_info.name] = self._type_hint(type_info, imports)
             elif kind == VarType.CVAR:
-                cvars[type_info.name] = type_info.expr
+                cvars[type_info.name] = self._type_hint(type_info, imports)
+
+        if cvars:
+            imports.add(_CLASS_VAR)
 
-        # TODO: add import for Any and ClassVar when needed!
         # TODO: use right indent (from origin docstring)
         # create
         indent = doc_string.guess_indent()
-        srange = SourceRange.from_location(doc_string.doc_loc.next_line())
+        srange = SourceRange.from_location(doc_string.doc_end.next_line())
         replacement = "\n" + "".join(
             "{}{} = None  # type: {}\n".format(indent, name, value_type)
             for name, value_type in ivars.items()
@@ -107,11 +151,28 @@ class CommentStyle(object):
         )
         source_replacements.append(SourceReplacement(srange, replacement))
 
-    def __call__(self, doc_string, source_replacements):
-        # type: (DocString, MutableSequence[SourceReplacement]) -> None
+    def __call__(
+            self,
+            doc_string,           # type: DocString
+            source_replacements,  # type: MutableSequence[SourceReplacement]
+            imports=None          # type: Optional[MutableSet[ImportedType]]
+    ):
+        # type: (...) -> None
+        """
+        :param imports: receives the imports needed by the added type hints
+        """
+
+        # without any type information a type comment would only guess
+        if not doc_string.type_info:
+            return
+        # the module variables are not assigned next to the module doc
+        # string, there is no place for their type comments
+        if isinstance(doc_string, ModuleDocString):
+            return
 
         getattr(self, "_handle_" + type(doc_string).__name__)(
-            doc_string, source_replacements
+            doc_string, source_replacements,
+            set() if imports is None else imports
         )
 
 
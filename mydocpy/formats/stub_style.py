@@ -0,0 +1,271 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Type stubs (``.pyi`` files) written from the doc strings of a module.
+
+The stub is created from the doc string records alone, the source is not
+rewritten. Objects without doc string are unknown, so stubs are marked as
+incomplete: modules and classes get a ``__getattr__`` returning ``Any``
+(see PEP 484).
+"""
+
+from collections import OrderedDict
+
+from typing import Dict, Iterable, List, MutableSet, Optional, Text
+
+from mydocpy.docstrings import ClassDocString, DocString, FuncType, \
+    FunctionDocString, ModuleDocString, VarType
+from mydocpy.formats import Registry
+from mydocpy.imports import ImportPlanner
+from mydocpy.types import ImportedType, Resolver, TypeInterpreter
+
+_ANY = ImportedType("typing", "Any")
+_CLASS_VAR = ImportedType("typing", "ClassVar")
+
+# decorators changing the signature in a stub
+_DECORATORS = ("staticmethod", "classmethod", "property")
+# decorators adding a method to a property (``@<name>.setter``)
+_ACCESSORS = ("setter", "deleter")
+
+INDENT = "    "
+
+
+def _is_accessor(decorator, name):
+    # type: (Optional[Text], Text) -> bool
+    """
+    :return: whether ``decorator`` adds the function ``name`` to the property
+        ``name`` (like ``@name.setter``)
+    """
+    if decorator is None:
+        return False
+    prop, _, accessor = decorator.rpartition(".")
+    return prop == name and accessor in _ACCESSORS
+
+
+class _Scope(object):
+    """
+    module or class of the stub
+    """
+
+    __slots__ = ("name", "bases", "attributes", "members")
+
+    def __init__(self, name):
+        # type: (Optional[Text]) -> None
+        self.name = name
+        self.bases = None  # type: Optional[Text]
+        self.attributes = []  # type: List[Text]
+        # definitions in source order: function lines or nested classes
+        self.members = OrderedDict()  # type: OrderedDict
+
+    def render(self, lines, indent):
+        # type: (List[Text], Text) -> None
+        body_indent = indent
+        if self.name is not None:
+            lines.append("{}class {}{}:".format(
+                indent, self.name.rsplit(".", 1)[-1],
+                "({})".format(self.bases) if self.bases else ""))
+            body_indent += INDENT
+        for attribute in self.attributes:
+            lines.append(body_indent + attribute)
+
+        # classes of the module are separated by empty lines
+        separate = self.name is None and bool(self.attributes)
+        for member in self.members.values():
+            is_class = isinstance(member, _Scope)
+            if separate or (is_class and self.name is None):
+                lines.append("")
+            if is_class:
+                member.render(lines, body_indent)
+            else:
+                lines.extend(body_indent + line for line in member)
+            separate = is_class and self.name is None
+        if separate:
+            lines.append("")
+        lines.append(body_indent + (
+            "def __getattr__(self, name: str) -> Any: ..."
+            if self.name is not None else
+            "def __getattr__(name: str) -> Any: ..."))
+
+
+class StubStyle(object):
+    """
+    Writes type stubs instead of changing the source.
+
+    ``write_stub`` takes the doc strings of a module with their type
+    information and returns the content of its ``.pyi`` file.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self.interpreter = TypeInterpreter()
+
+    def with_resolver(self, resolver):
+        # type: (Resolver) -> StubStyle
+        """
+        :return: copy of this style, which imports other names with
+            ``resolver``
+        """
+        style = type(self)()
+        style.interpreter = TypeInterpreter(resolver=resolver)
+        return style
+
+    def _type_hint(self, expr, imports):
+        # type: (Text, MutableSet[ImportedType]) -> Text
+        type_hint, needed = self.interpreter.interpret(expr)
+        imports.update(needed)
+        return type_hint
+
+    def _attributes(
+            self,
+            doc_string,  # type: DocString
+            var_types,   # type: Iterable[VarType]
+            imports      # type: MutableSet[ImportedType]
+    ):
+        # type: (...) -> List[Text]
+        attributes = []
+        for type_info in doc_string.type_info or ():
+            if type_info.var_type not in var_types:
+                continue
+            type_hint = self._type_hint(type_info.expr, imports)
+            if type_info.var_type == VarType.CVAR:
+                imports.add(_CLASS_VAR)
+                type_hint = "ClassVar[{}]".format(type_hint)
+            attributes.append("{}: {}".format(type_info.name, type_hint))
+        return attributes
+
+    def _function(self, doc_string, imports):
+        # type: (FunctionDocString, MutableSet[ImportedType]) -> List[Text]
+        params = {}  # type: Dict[Text, Text]
+        returns = None  # type: Optional[Text]
+        for type_info in doc_string.type_info or ():
+            kind = type_info.var_type
+            if kind in (VarType.PARAM, VarType.VAR):
+                params[type_info.name] = self._type_hint(
+                    type_info.expr, imports)
+            elif kind == VarType.RETURN:
+                returns = self._type_hint(type_info.expr, imports)
+
+        def param(name, prefix=""):
+            type_hint = params.get(name)
+            default = name in doc_string.defaults
+            if type_hint is None:
+                return prefix + name + ("=..." if default else "")
+            return "{}{}: {}{}".format(
+                prefix, name, type_hint, " = ..." if default else "")
+
+        args = list(doc_string.args)
+        parameters = []
+        if args and doc_string.func_type in (FuncType.INSTANCE,
+                                             FuncType.CLASS):
+            parameters.append(args.pop(0))
+        parameters.extend(param(arg) for arg in args)
+        if doc_string.posonly:
+            parameters.insert(doc_string.posonly, "/")
+        if doc_string.vaarg:
+            parameters.append(param(doc_string.vaarg, "*"))
+        elif doc_string.kwonlyargs:
+            parameters.append("*")
+        parameters.extend(param(arg) for arg in doc_string.kwonlyargs)
+        if doc_string.kwarg:
+            parameters.append(param(doc_string.kwarg, "**"))
+
+        # like type comments, functions with type information return None
+        # unless documented otherwise
+        if doc_string.type_info:
+            returns = " -> {}".format(returns)
+        else:
+            returns = ""
+
+        name = doc_string.name.rsplit(".", 1)[-1]
+        lines = [
+            "@" + decorator for decorator in doc_string.decorators
+            if decorator in _DECORATORS or _is_accessor(decorator, name)]
+        lines.append("{}def {}({}){}: ...".format(
+            "async " if doc_string.is_async else "", name,
+            ", ".join(parameters), returns))
+        return lines
+
+    def write_stub(self, doc_strings, content=None):
+        # type: (Iterable[DocString], Optional[Text]) -> Text
+        """
+        :param doc_strings: doc strings of a module with type information,
+            in source order (consumed only once)
+        :param content: source of the module, its imports are copied to the
+            stub (needed for the base classes and names in type hints)
+        :return: content of the stub
+        """
+        imports = {_ANY}  # type: MutableSet[ImportedType]
+        module = _Scope(None)
+        classes = {}  # type: Dict[Text, _Scope]
+
+        def get_scope(name):
+            # type: (Optional[Text]) -> _Scope
+            if name is None:
+                return module
+            scope = classes.get(name)
+            if scope is None:
+                parent, _, _ = name.rpartition(".")
+                scope = classes[name] = _Scope(name)
+                get_scope(parent or None).members.setdefault(name, scope)
+            return scope
+
+        for doc_string in doc_strings:
+            if isinstance(doc_string, ModuleDocString):
+                module.attributes.extend(self._attributes(
+                    doc_string, (VarType.VAR, VarType.IVAR), imports))
+                continue
+            if doc_string.name is None or "<locals>" in doc_string.name:
+                continue  # only module and class members are visible
+
+            if isinstance(doc_string, ClassDocString):
+                scope = get_scope(doc_string.name)
+                scope.bases = doc_string.bases
+                scope.attributes.extend(self._attributes(
+                    doc_string, (VarType.VAR, VarType.IVAR, VarType.CVAR),
+                    imports))
+            elif isinstance(doc_string, FunctionDocString):
+                parent, _, _ = doc_string.name.rpartition(".")
+                members = get_scope(parent or None).members
+                # the first definition wins, except for the setter and
+                # deleter of a property, which follow its getter
+                if doc_string.name not in members:
+                    members[doc_string.name] = self._function(
+                        doc_string, imports)
+                elif any(_is_accessor(decorator, doc_string.name.rsplit(
+                        ".", 1)[-1]) for decorator in doc_string.decorators):
+                    members[doc_string.name].extend(
+                        self._function(doc_string, imports))
+
+        lines = ImportPlanner(content or "").statements_for(imports)
+        lines.append("")
+        module.render(lines, "")
+        return "\n".join(
+            line for i, line in enumerate(lines)
+            if line or lines[i - 1]) + "\n"
+
+    def __call__(self, doc_string, source_replacements):
+        # type: (DocString, List) -> None
+        raise TypeError("stubs are written with write_stub")
+
+
+def register_formats(registry):
+    # type: (Registry) -> None
+    """
+    register stub format
+    """
+    registry.register("stub", StubStyle())
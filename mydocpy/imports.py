@@ -0,0 +1,401 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Planning of the imports needed by added type hints.
+
+The imports are merged into the existing import block of a module as
+ordinary source replacements, so they are applied in the same rewrite as
+the type hints (no separate pass with isort):
+
+* names which are already bound in the module are not imported again,
+* names of a module with an existing ``from module import ...`` statement
+  are added to that statement,
+* other modules get a new ``from module import ...`` statement after the
+  last import,
+* with ``use_if``, imports of other modules than ``typing`` are added to
+  the ``if TYPE_CHECKING:`` block (which is created if needed),
+* ``__future__`` imports are added before all other statements (after the
+  module doc string).
+"""
+
+import ast
+import re
+from collections import OrderedDict
+
+from typing import Dict, Iterable, List, Optional, Set, Text, Tuple
+
+from mydocpy.replacements import SourceReplacement
+from mydocpy.source import LineIndex, SourceLocation, SourceRange
+from mydocpy.types import ImportedType
+
+MAX_LINE_LENGTH = 79
+
+# the import block ends before the first definition at module level
+_HEAD_END = re.compile(r"^(?:(?:class|def|async[ \t]+def)\b|@)", re.MULTILINE)
+
+# module level definitions and assignments
+_DEFINED = re.compile(
+    r"^(?:class[ \t]+(\w+)|(\w+)[ \t]*(?::[^=\n]*)?=(?!=))", re.MULTILINE)
+
+_TYPE_CHECKING = "TYPE_CHECKING"
+_FUTURE = "__future__"
+
+
+def _end(node):
+    # type: (ast.stmt) -> Tuple[int, Optional[int]]
+    """
+    :return: last line (starting at 0) and end column of ``node`` (None when
+        unknown, before Python 3.8)
+    """
+    end_lineno = getattr(node, "end_lineno", None)
+    if end_lineno is None:
+        return node.lineno - 1, None
+    return end_lineno - 1, node.end_col_offset
+
+
+def _is_type_checking(node):
+    # type: (ast.stmt) -> bool
+    if not isinstance(node, ast.If) or node.orelse:
+        return False
+    test = node.test
+    if isinstance(test, ast.Attribute):
+        return test.attr == _TYPE_CHECKING
+    return isinstance(test, ast.Name) and test.id == _TYPE_CHECKING
+
+
+def _alias(alias):
+    # type: (ast.alias) -> Text
+    if alias.asname:
+        return "{} as {}".format(alias.name, alias.asname)
+    return alias.name
+
+
+def format_from(module, names, indent=""):
+    # type: (Text, Iterable[Text], Text) -> Text
+    """
+    :return: ``from module import names`` (wrapped in parentheses when too
+        long), without line break at the end
+    """
+    names = sorted(names, key=lambda name: name.split(" ")[0])
+    line = "{}from {} import {}".format(indent, module, ", ".join(names))
+    if len(line) <= MAX_LINE_LENGTH:
+        return line
+    return "{}from {} import (\n{}{})".format(
+        indent, module,
+        "".join("{}    {},\n".format(indent, name) for name in names),
+        indent)
+
+
+class _FromImport(object):
+    """
+    existing ``from module import ...`` statement
+    """
+
+    __slots__ = ("source_range", "names", "indent", "text")
+
+    def __init__(self, source_range, names, indent, text):
+        # type: (SourceRange, List[Text], Text, Text) -> None
+        self.source_range = source_range
+        self.names = names
+        self.indent = indent
+        self.text = text
+
+
+class ImportPlanner(object):
+    """
+    Plans the imports of one module.
+
+    Only the import block at the beginning of the module is parsed (up to
+    the first definition).
+    """
+
+    def __init__(self, content, use_if=False):
+        # type: (Text, bool) -> None
+        self.content = content
+        self.use_if = use_if
+
+        match = _HEAD_END.search(content)
+        head = content[:match.start()] if match else content
+        try:
+            body = ast.parse(head).body
+        except SyntaxError:
+            try:
+                body = ast.parse(content).body
+            except SyntaxError:
+                body = []  # the doc strings may still be found by tokenize
+
+        self.bound = set()  # type: Set[Text]
+        # features imported from __future__
+        self.future = set()  # type: Set[Text]
+        # all import statements (normalized)
+        self.statements = []  # type: List[Text]
+        for match in _DEFINED.finditer(content):
+            self.bound.add(match.group(1) or match.group(2))
+
+        # (module, in TYPE_CHECKING block) -> statement
+        self.from_imports = {}  # type: Dict[Tuple[Text, bool], _FromImport]
+        self.insert_at = self._first_line(content)
+        self.future_at = self.insert_at
+        self.block_at = None  # type: Optional[SourceLocation]
+        self.block_indent = "    "
+        self.has_block = False
+
+        index = LineIndex(content)
+        for node in body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                self._add_import(node, False, index)
+                self.insert_at = _end(node)[0] + 1
+            elif _is_type_checking(node):
+                self.has_block = True
+                for child in node.body:
+                    if isinstance(child, (ast.Import, ast.ImportFrom)):
+                        self._add_import(child, True, index)
+                self.block_at = SourceLocation(_end(node)[0] + 1, 0)
+                self.block_indent = " " * node.body[0].col_offset
+            elif isinstance(node, ast.Expr) and node is body[0] and \
+                    self.insert_at == self._first_line(content):
+                self.insert_at = _end(node)[0] + 1  # doc string
+                self.future_at = self.insert_at
+
+    @staticmethod
+    def _first_line(content):
+        # type: (Text) -> int
+        """
+        :return: first line after the comments at the beginning (shebang and
+            encoding declaration)
+        """
+        line = 0
+        for text in content.splitlines():
+            if not text.startswith("#"):
+                break
+            line += 1
+        return line
+
+    def _add_import(self, node, in_block, index):
+        # type: (ast.stmt, bool, LineIndex) -> None
+        for alias in node.names:
+            self.bound.add((alias.asname or alias.name).split(".")[0])
+
+        names = [_alias(alias) for alias in node.names]
+        if isinstance(node, ast.Import):
+            self.statements.append("import " + ", ".join(names))
+        elif node.module == _FUTURE:
+            self.future.update(alias.name for alias in node.names)
+        else:
+            self.statements.append(format_from(
+                "." * node.level + (node.module or ""), names))
+
+        if not isinstance(node, ast.ImportFrom) or node.level or \
+                node.names[0].name == "*":
+            return
+        key = (node.module, in_block)
+        end_line, end_col = _end(node)
+        if key in self.from_imports or end_col is None:
+            return
+
+        start = SourceLocation(node.lineno - 1, node.col_offset)
+        end = SourceLocation(end_line, end_col)
+        line_start = index.offset(start.line)
+        self.from_imports[key] = _FromImport(
+            SourceRange(start, end - start),
+            [_alias(alias) for alias in node.names],
+            self.content[line_start:line_start + start.col],
+            self.content[
+                line_start + start.col:index.offset(end.line) + end.col])
+
+    def needed(self, imports):
+        # type: (Iterable[ImportedType]) -> Dict[Text, List[Text]]
+        """
+        :return: names to import per module (without the bound names)
+        """
+        modules = OrderedDict()  # type: Dict[Text, List[Text]]
+        for imported in sorted(set(imports)):
+            if imported.name not in (
+                    self.future if imported.module == _FUTURE else
+                    self.bound):
+                modules.setdefault(imported.module, []).append(imported.name)
+        return modules
+
+    def _statement_at_future(self):
+        # type: () -> Optional[Tuple[Text, bool]]
+        """
+        :return: key of the ``from`` import starting where ``__future__``
+            imports are inserted (they are put in front of its replacement)
+        """
+        location = (self.future_at, 0)
+        for key, statement in self.from_imports.items():
+            if _key(statement.source_range) == location:
+                return key
+        return None
+
+    def statements_for(self, imports):
+        # type: (Iterable[ImportedType]) -> List[Text]
+        """
+        :return: existing import statements and new ones for ``imports``
+            (for a new file, like a stub)
+        """
+        return self.statements + [
+            format_from(module, names)
+            for module, names in self.needed(imports).items()
+            if module != _FUTURE]
+
+    def slots(self):
+        # type: () -> List[SourceRange]
+        """
+        :return: ranges, which ``plan`` may replace (sorted)
+        """
+        ranges = [
+            statement.source_range
+            for statement in self.from_imports.values()]
+        ranges.append(SourceRange.from_location(
+            SourceLocation(self.insert_at, 0)))
+        if self.future_at != self.insert_at and \
+                self._statement_at_future() is None:
+            ranges.append(SourceRange.from_location(
+                SourceLocation(self.future_at, 0)))
+        if self.block_at is not None and self.block_at.line != self.insert_at:
+            ranges.append(SourceRange.from_location(self.block_at))
+        ranges.sort(key=_key)
+        return ranges
+
+    def plan(self, imports):
+        # type: (Iterable[ImportedType]) -> List[SourceReplacement]
+        """
+        :return: replacements adding ``imports`` (sorted)
+        """
+        modules = self.needed(imports)
+        if not modules:
+            return []
+
+        checked = OrderedDict()  # type: Dict[Text, List[Text]]
+        if self.use_if:
+            for module in list(modules):
+                if module not in ("typing", _FUTURE):
+                    checked[module] = modules.pop(module)
+            if checked and not self.has_block and \
+                    _TYPE_CHECKING not in self.bound:
+                modules.setdefault("typing", []).append(_TYPE_CHECKING)
+
+        future = []  # type: List[Text]
+        if _FUTURE in modules and (_FUTURE, False) not in self.from_imports:
+            future.append(format_from(_FUTURE, modules.pop(_FUTURE)) + "\n")
+
+        merged = {}  # type: Dict[Tuple[Text, bool], List[Text]]
+        inserted = []  # type: List[Text]
+        block = []  # type: List[Text]
+        for in_block, needed in ((False, modules), (True, checked)):
+            for module, names in needed.items():
+                statement = self.from_imports.get((module, in_block))
+                if statement is not None:
+                    merged[(module, in_block)] = names
+                elif in_block:
+                    block.append(format_from(
+                        module, names, self.block_indent) + "\n")
+                else:
+                    inserted.append(format_from(module, names) + "\n")
+
+        # before the first statement: at the insertion of the other imports,
+        # in front of a from import or on its own
+        at_future = None  # type: Optional[Tuple[Text, bool]]
+        if future and self.future_at != self.insert_at:
+            at_future = self._statement_at_future()
+            if at_future is not None:
+                merged.setdefault(at_future, [])
+
+        source_replacements = []  # type: List[SourceReplacement]
+        for key, names in merged.items():
+            statement = self.from_imports[key]
+            text = format_from(
+                key[0], statement.names + names, statement.indent
+            )[len(statement.indent):] if names else statement.text
+            if key == at_future:
+                text = "".join(future) + text
+                future = []
+            source_replacements.append(
+                SourceReplacement(statement.source_range, text))
+
+        if block and not self.has_block:
+            inserted.append("\nif {}:\n{}".format(_TYPE_CHECKING, "".join(
+                "    " + line.lstrip(" ") for line in block)))
+            block = []
+        if block and self.block_at.line == self.insert_at:
+            inserted.insert(0, "".join(block))
+            block = []
+        if future and self.future_at == self.insert_at:
+            inserted[:0] = future
+            future = []
+        if future:
+            source_replacements.append(SourceReplacement(
+                SourceRange.from_location(SourceLocation(self.future_at, 0)),
+                "".join(future)))
+        next_line = self.content.splitlines()[self.insert_at:][:1]
+        if inserted and next_line and next_line[0].strip():
+            inserted.append("\n")  # separate the imports from the code
+
+        if inserted:
+            source_replacements.append(SourceReplacement(
+                SourceRange.from_location(SourceLocation(self.insert_at, 0)),
+                "".join(inserted)))
+        if block:
+            source_replacements.append(SourceReplacement(
+                SourceRange.from_location(self.block_at), "".join(block)))
+
+        source_replacements.sort(key=lambda x: _key(x.source_range))
+        return source_replacements
+
+    def markers(self):
+        # type: () -> List[SourceReplacement]
+        """
+        Placeholders for the replacements of ``plan``, used when the
+        replacements are applied before all imports are known.
+
+        :return: replacements of all ``slots`` with a marker (sorted)
+        """
+        return [
+            SourceReplacement(source_range, _marker(i))
+            for i, source_range in enumerate(self.slots())]
+
+    def finish(self, output, imports):
+        # type: (Text, Iterable[ImportedType]) -> Text
+        """
+        :param output: content with the ``markers`` applied
+        :return: ``output`` with the markers replaced by the imports
+        """
+        planned = {
+            _key(source_replacement.source_range):
+                source_replacement.replacement
+            for source_replacement in self.plan(imports)}
+        original = {
+            _key(statement.source_range): statement.text
+            for statement in self.from_imports.values()}
+        for i, source_range in enumerate(self.slots()):
+            key = _key(source_range)
+            output = output.replace(
+                _marker(i), planned.get(key, original.get(key, "")), 1)
+        return output
+
+
+def _key(source_range):
+    # type: (SourceRange) -> Tuple[int, int]
+    return source_range.start.line, source_range.start.col
+
+
+def _marker(i):
+    # type: (int) -> Text
+    # NUL characters are not allowed in Python source files
+    return "\0import-{}\0".format(i)
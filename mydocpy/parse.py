@@ -15,11 +15,14 @@
 # limitations under the License.
 
 import ast
+import sys
 
-from typing import Sequence, Union, TextIO, List, Text
+from typing import Iterator, Optional, Sequence, Union, TextIO, List, Text
 
 from mydocpy.docstrings import DocString, FunctionDocString, ClassDocString, \
-    FuncType
+    FuncType, ModuleDocString, Parameter, Signature
+from mydocpy.source import LineIndex, SourceLocation
+from mydocpy.utils.compat import string_types
 
 
 def parse_file(filepath):
@@ -29,7 +32,7 @@ def parse_file(filepath):
     :param filepath: file path to file to process
     :return:
     """
-    if isinstance(filepath, basestring):
+    if isinstance(filepath, string_types):
         with open(filepath, "r") as f:
             content = f.read()
         return parse(content)
@@ -44,71 +47,332 @@ def parse(content):
     :param content: source to process
     :return:
     """
-    extractor = DocStringExtractor()
+    extractor = DocStringExtractor(content)
     extractor.visit(ast.parse(content))
     # TODO: add a hook for use from the outside
     return extractor.doc_strings
 
 
+def iter_parse(content):
+    # type: (Text) -> Iterator[DocString]
+    """
+    Yield the doc strings of ``content`` one at a time, so that they can be
+    processed and dropped before the next one is created.
+
+    The syntax tree is still built completely beforehand.
+    """
+    return iter_docstrings(ast.parse(content), content)
+
+
+if sys.version_info >= (3, 8):  # ast.Str is deprecated
+    def _is_str(node):
+        return isinstance(node, ast.Constant) and isinstance(node.value, str)
+else:
+    def _is_str(node):
+        return isinstance(node, ast.Str)
+
+
 def _get_node_docstring(node, cls=DocString):
     """
-    Return the docstring for a ClassDef or FunctionDef node
+    Return the docstring for a Module, ClassDef or FunctionDef node
     """
     if node.body:
         first_expr = node.body[0]
 
-        if (isinstance(first_expr, ast.Expr)
-                and isinstance(first_expr.value, ast.Str)):
+        if isinstance(first_expr, ast.Expr) and _is_str(first_expr.value):
             return cls.from_node(node, first_expr.value)
 
 
-class DocStringExtractor(ast.NodeVisitor):
+def _get_arg_name(arg):
+    """
+    Return the name of an argument (``ast.Name`` or ``str`` in Python 2,
+    ``ast.arg`` in Python 3)
+    """
+    if arg is None or isinstance(arg, string_types):
+        return arg
+    return arg.arg if hasattr(arg, "arg") else arg.id
+
 
-    doc_strings = None  # type: List[DocString]
+def _get_decorator_name(node):
+    # type: (ast.expr) -> Optional[Text]
+    names = []
+    while isinstance(node, ast.Attribute):
+        names.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    names.append(node.id)
+    return ".".join(reversed(names))
 
-    def __init__(self):
-        self.doc_strings = []
-        self.in_class = False
-
-    def visit_ClassDef(self, node):
-        docstring = _get_node_docstring(node, ClassDocString)
-        if docstring:
-            self.doc_strings.append(docstring)
-
-        # inlined for performance
-        in_class = self.in_class
-        self.in_class = True
-        self.generic_visit(node)
-        self.in_class = in_class
-
-    def visit_FunctionDef(self, node):
-        docstring = _get_node_docstring(node, FunctionDocString)
-        if docstring:
-            docstring.args = [arg.id for arg in node.args.args]
-            docstring.vaarg = node.args.vararg
-            docstring.kwarg = node.args.kwarg
-            if self.in_class:
-                if node.decorator_list:
-                    # FIXME: we hope nobody overwriten staticmethod or
-                    # classmethod
-                    decorators = [
-                        decorator.id for decorator in node.decorator_list
-                    ]
-                    if "staticmethod" in decorators:
-                        docstring.func_type = FuncType.STATIC
-                    elif "classmethod" in decorators:
-                        docstring.func_type = FuncType.CLASS
-                    else:
-                        docstring.func_type = FuncType.INSTANCE
-                else:
-                    docstring.func_type = FuncType.INSTANCE
+
+if hasattr(ast, "unparse"):  # Python 3.9+
+    def _get_bases(node):
+        # type: (ast.ClassDef) -> Optional[Text]
+        return ", ".join(
+            [ast.unparse(base) for base in node.bases] +
+            [ast.unparse(keyword) for keyword in node.keywords])
+else:
+    def _get_bases(node):
+        return None
+
+
+def _set_signature(docstring, node):
+    # type: (FunctionDocString, ast.FunctionDef) -> None
+    """
+    record the signature of function ``node`` in ``docstring``
+    """
+    args = node.args
+    posonlyargs = getattr(args, "posonlyargs", [])
+    positional = posonlyargs + args.args
+    docstring.args = [_get_arg_name(arg) for arg in positional]
+    docstring.posonly = len(posonlyargs)
+    docstring.vaarg = _get_arg_name(args.vararg)
+    docstring.kwarg = _get_arg_name(args.kwarg)
+    kwonlyargs = getattr(args, "kwonlyargs", [])
+    docstring.kwonlyargs = [_get_arg_name(arg) for arg in kwonlyargs]
+    docstring.defaults = frozenset(
+        docstring.args[len(positional) - len(args.defaults):] +
+        [_get_arg_name(arg) for arg, default in zip(
+            kwonlyargs, getattr(args, "kw_defaults", []))
+         if default is not None])
+    docstring.is_async = not isinstance(node, ast.FunctionDef)
+    docstring.decorators = [
+        _get_decorator_name(decorator) for decorator in node.decorator_list]
+
+
+class _Positions(object):
+    """
+    Converts the positions of syntax tree nodes (UTF-8 byte columns) to
+    locations and character offsets of the source text
+    """
+
+    def __init__(self, content):
+        # type: (Text) -> None
+        self.content = content
+        self.index = LineIndex(content)
+
+    def offset(self, lineno, byte_col):
+        # type: (int, int) -> int
+        """
+        :param lineno: line number starting at 1 (like ``ast``)
+        """
+        start = self.index.offset(lineno - 1)
+        prefix = self.content[start:start + byte_col]
+        if len(prefix.encode("utf-8")) != byte_col:  # not only ASCII
+            prefix = self.content[start:start + byte_col].encode(
+                "utf-8")[:byte_col].decode("utf-8", "ignore")
+        return start + len(prefix)
+
+    def location(self, offset):
+        # type: (int) -> SourceLocation
+        return self.index.location(offset)
+
+    def skip(self, offset, chars=" \t"):
+        # type: (int, Text) -> int
+        """
+        :return: offset of the first character from ``offset`` on, which
+            is not in ``chars``
+        """
+        content = self.content
+        while offset < len(content) and content[offset] in chars:
+            offset += 1
+        return offset
+
+    def closing(self, offset):
+        # type: (int) -> Optional[int]
+        """
+        :param offset: offset after the last part of a function header
+            before its closing parenthesis (the header must not have a return
+            annotation)
+        :return: offset after the closing parenthesis
+        """
+        content = self.content
+        closing = None
+        while offset < len(content):
+            char = content[offset]
+            if char == ":":
+                return closing
+            if char == "#":
+                offset = content.find("\n", offset)
+                if offset == -1:
+                    break
+            elif char == ")":
+                closing = offset + 1
+            offset += 1
+        return None
+
+
+def _end_offset(positions, node):
+    # type: (_Positions, ast.AST) -> int
+    return positions.offset(node.end_lineno, node.end_col_offset)
+
+
+def _get_signature(node, positions):
+    # type: (ast.FunctionDef, _Positions) -> Optional[Signature]
+    """
+    :return: locations of the parameters of function ``node``, None when
+        unknown (before Python 3.8 or for unusual formatting)
+    """
+    if not hasattr(node, "end_lineno"):
+        return None
+
+    args = node.args
+    positional = getattr(args, "posonlyargs", []) + args.args
+    defaults = dict(zip(
+        positional[len(positional) - len(args.defaults):], args.defaults))
+    defaults.update(
+        (arg, default) for arg, default in zip(
+            args.kwonlyargs, args.kw_defaults) if default is not None)
+    params = positional[:]
+    if args.vararg:
+        params.append(args.vararg)
+    params.extend(args.kwonlyargs)
+    if args.kwarg:
+        params.append(args.kwarg)
+
+    # the last part of the header before the closing parenthesis
+    last = positions.offset(node.lineno, node.col_offset)
+    parameters = []
+    for arg in params:
+        name_end = positions.offset(arg.lineno, arg.col_offset) + len(arg.arg)
+        last = max(last, _end_offset(positions, arg))
+        default = defaults.get(arg)
+        default_loc = None
+        if default is not None:
+            last = max(last, _end_offset(positions, default))
+            equals = positions.skip(
+                _end_offset(positions, arg), " \t\\\r\n")
+            if positions.content[equals:equals + 1] != "=":
+                return None
+            default_loc = positions.location(positions.skip(equals + 1))
+        parameters.append(Parameter(
+            arg.arg, positions.location(name_end), default_loc,
+            arg.annotation is not None))
+    for type_param in getattr(node, "type_params", ()):  # Python 3.12+
+        last = max(last, _end_offset(positions, type_param))
+
+    closing = None
+    if node.returns is None:
+        closing = positions.closing(last)
+        if closing is None:
+            return None
+        closing = positions.location(closing)
+    return Signature(parameters, closing, node.returns is not None)
+
+
+def _get_func_type(node, in_class):
+    # type: (ast.FunctionDef, bool) -> FuncType
+    if not in_class:
+        return FuncType.FREE
+
+    # FIXME: we hope nobody overwriten staticmethod or classmethod
+    for decorator in node.decorator_list:
+        if isinstance(decorator, ast.Name):
+            if decorator.id == "staticmethod":
+                return FuncType.STATIC
+            if decorator.id == "classmethod":
+                return FuncType.CLASS
+    return FuncType.INSTANCE
+
+
+_FUNCTION_TYPES = tuple(
+    getattr(ast, name) for name in ("FunctionDef", "AsyncFunctionDef")
+    if hasattr(ast, name)
+)
+
+# fields of compound statements (if, for, while, with, try, match ...)
+# containing statements, in source order
+_BODY_FIELDS = ("body", "handlers", "cases", "orelse", "finalbody")
+# fields with clauses (except handlers, match cases) containing statements
+_CLAUSE_FIELDS = frozenset(("handlers", "cases"))
+
+
+def _iter_compound_bodies(node):
+    # type: (ast.stmt) -> Iterator[ast.stmt]
+    """
+    Return the statements nested in a compound statement in source order
+    """
+    for field in _BODY_FIELDS:
+        for stmt in getattr(node, field, ()):
+            if field in _CLAUSE_FIELDS:
+                for clause_stmt in stmt.body:
+                    yield clause_stmt
             else:
-                docstring.func_type = FuncType.FREE
-            self.doc_strings.append(docstring)
+                yield stmt
+
 
-        # inlined for performance
-        in_class = self.in_class
-        self.in_class = False
-        self.generic_visit(node)
-        self.in_class = in_class
+def iter_docstrings(tree, content=None):
+    # type: (ast.Module, Optional[Text]) -> Iterator[DocString]
+    """
+    Yield the doc strings of the module, its classes and functions in source
+    order.
+
+    Only statement bodies are walked, because doc strings and definitions
+    can not be part of expressions. The walk is iterative, so deeply nested
+    code does not hit the recursion limit.
+
+    :param content: source of ``tree``, needed for the ``signature`` of
+        functions
+    """
+    positions = _Positions(content) if content is not None else None
+    docstring = _get_node_docstring(tree, ModuleDocString)
+    if docstring:
+        yield docstring
+
+    # stack of (iterator over statements, statements are in a class body,
+    # prefix of qualified names)
+    stack = [(iter(tree.body), False, "")]
+    while stack:
+        statements, in_class, prefix = stack[-1]
+        for node in statements:
+            if isinstance(node, _FUNCTION_TYPES):
+                name = prefix + node.name
+                docstring = _get_node_docstring(node, FunctionDocString)
+                if docstring:
+                    docstring.name = name
+                    _set_signature(docstring, node)
+                    if positions is not None:
+                        docstring.signature = _get_signature(node, positions)
+                    docstring.func_type = _get_func_type(node, in_class)
+                    yield docstring
+                stack.append((iter(node.body), False, name + ".<locals>."))
+                break
+
+            if isinstance(node, ast.ClassDef):
+                name = prefix + node.name
+                docstring = _get_node_docstring(node, ClassDocString)
+                if docstring:
+                    docstring.name = name
+                    docstring.bases = _get_bases(node)
+                    yield docstring
+                stack.append((iter(node.body), True, name + "."))
+                break
+
+            if hasattr(node, "body") or hasattr(node, "cases"):
+                # definitions in compound statements of a class body are
+                # still part of the class
+                stack.append(
+                    (_iter_compound_bodies(node), in_class, prefix))
+                break
+        else:
+            stack.pop()
+
+
+class DocStringExtractor(object):
+    """
+    Collects the doc strings of a module (see ``iter_docstrings``)
+    """
+
+    doc_strings = None  # type: List[DocString]
+
+    def __init__(self, content=None):
+        # type: (Optional[Text]) -> None
+        """
+        :param content: source of the visited tree (see ``iter_docstrings``)
+        """
+        self.doc_strings = []
+        self.content = content
 
+    def visit(self, tree):
+        # type: (ast.Module) -> None
+        self.doc_strings.extend(iter_docstrings(tree, self.content))
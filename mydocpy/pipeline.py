@@ -0,0 +1,621 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import importlib
+import io
+import os
+import traceback
+from itertools import chain, islice
+from enum import Enum
+
+from typing import Callable, Dict, Iterable, Iterator, List, \
+    MutableSet, NamedTuple, Optional, Sequence, Text, Tuple, TYPE_CHECKING
+
+from mydocpy import docformats, formats, replacements
+from mydocpy.docstrings import DocString
+from mydocpy.profiling import FileStats, NULL_STATS
+from mydocpy.replacements import SourceReplacement
+
+if TYPE_CHECKING:
+    from mydocpy.cache import ReplacementCache
+    from mydocpy.imports import ImportPlanner
+    from mydocpy.symbols import SymbolIndex
+    from mydocpy.types import ImportedType
+
+
+FileResult = NamedTuple(
+    "FileResult",
+    [
+        ("path", Text),
+        ("output", Optional[Text]),
+        ("error", Optional[Text]),
+        ("cached", Optional[bool]),  # None: no cache used
+        ("changed", bool),
+        ("stats", Optional[FileStats])  # None: not profiled
+    ]
+)
+
+Replacements = Iterable[SourceReplacement]
+
+
+class OutputMode(Enum):
+    STDOUT, IN_PLACE, DIFF = range(3)
+
+
+class ImportMode(Enum):
+    """
+    where the imports needed by the type hints are added (see
+    ``mydocpy.imports``)
+    """
+    NONE, TOP_LEVEL, TYPE_CHECKING = range(3)
+
+
+# modules with a ``parse(content)`` function returning the doc strings and an
+# ``iter_parse(content)`` function yielding them
+ENGINES = {
+    "ast": "mydocpy.parse",
+    "tokenize": "mydocpy.tokenparse",
+}
+
+
+def load_formats():
+    # type: () -> None
+    """
+    load doc string formats and type hint formats (used as initializer of
+    worker processes)
+    """
+    formats.load_formats()
+    docformats.load_formats()
+
+
+# type hint formats using a symbol index: (format, index path) -> format
+_RESOLVING_STYLES = {}  # type: Dict[Tuple[Text, Text], Callable]
+# symbol indexes by path
+_SYMBOL_INDEXES = {}  # type: Dict[Text, SymbolIndex]
+
+
+def _load_symbols(path):
+    # type: (Text) -> SymbolIndex
+    """
+    :return: the symbol index stored in ``path``, loaded once per process
+    """
+    index = _SYMBOL_INDEXES.get(path)
+    if index is None:
+        from mydocpy.symbols import SymbolIndex
+
+        index = _SYMBOL_INDEXES[path] = SymbolIndex.load(path)
+    return index
+
+# doc strings converted together by ``FileProcessor.iter_replacements``
+BATCH_SIZE = 64
+
+
+def convert(docformat, docstrings):
+    # type: (Callable[[DocString], None], Sequence[DocString]) -> None
+    """
+    Add the type information of ``docformat`` to ``docstrings``. Formats
+    can provide ``convert_all(docstrings)`` to handle all of them at once.
+    """
+    convert_all = getattr(docformat, "convert_all", None)
+    if convert_all is not None:
+        convert_all(docstrings)
+    else:
+        for docstring in docstrings:
+            docformat(docstring)
+
+
+class _CountingIterator(object):
+    """
+    Iterator counting the returned items
+    """
+
+    def __init__(self, iterable):
+        # type: (Iterable) -> None
+        self._iterator = iter(iterable)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self._iterator)
+        self.count += 1
+        return item
+
+    next = __next__  # Python 2
+
+
+class _ImportSlots(object):
+    """
+    Replacements of ``FileProcessor.iter_replacements`` preceded by
+    placeholders for the imports, which are only known after the last
+    replacement. ``finish`` puts the imports into the rewritten content.
+    """
+
+    def __init__(self, processor, content, docstrings):
+        # type: (FileProcessor, Text, Iterable[DocString]) -> None
+        self.imports = set()  # type: MutableSet[ImportedType]
+        self.planner = None  # type: Optional[ImportPlanner]
+        self._iterator = self._iter(processor, content, docstrings)
+
+    def __iter__(self):
+        return self._iterator
+
+    def _iter(self, processor, content, docstrings):
+        # type: (FileProcessor, Text, Iterable[DocString]) -> Replacements
+        iterator = processor.iter_replacements(docstrings, self.imports)
+        first = next(iterator, None)
+        if first is None:
+            return
+
+        # imports are only needed (and planned) when something is changed
+        self.planner = processor.get_planner(content)
+        for marker in self.planner.markers():
+            yield marker
+        yield first
+        for source_replacement in iterator:
+            yield source_replacement
+
+    def finish(self, output):
+        # type: (Text) -> Text
+        if self.planner is None:
+            return output
+        return self.planner.finish(output, self.imports)
+
+
+class FileProcessor(object):
+    """
+    Convert the doc string type information of single source files.
+
+    Instances only hold format names and options, so they can be sent to
+    worker processes.
+    """
+
+    def __init__(
+            self,
+            srcformat,                # type: Text
+            destformat,               # type: Text
+            cache=None,               # type: Optional[ReplacementCache]
+            mode=OutputMode.STDOUT,   # type: OutputMode
+            profile=False,            # type: bool
+            engine="ast",             # type: Text
+            symbols=None,             # type: Optional[Text]
+            imports=ImportMode.TOP_LEVEL,  # type: ImportMode
+            stub_dir=None             # type: Optional[Text]
+    ):
+        # type: (...) -> None
+        """
+        :param profile: record the time of every stage and counters in
+            ``FileResult.stats``
+        :param engine: name of the doc string extraction (see ``ENGINES``)
+        :param symbols: path of a ``SymbolIndex``, used by type hint formats
+            with ``with_resolver(resolver)`` to import the types
+        :param imports: where to add the imports of the type hints (for type
+            hint formats with ``collects_imports``)
+        :param stub_dir: directory of the stubs of formats with
+            ``write_stub`` (like ``stub``). Without it, stubs are written
+            next to the source files in ``OutputMode.IN_PLACE`` and to the
+            output otherwise.
+        """
+        if engine not in ENGINES:
+            raise ValueError("unknown engine {!r}".format(engine))
+        self.srcformat = srcformat
+        self.destformat = destformat
+        self.cache = cache
+        self.mode = mode
+        self.profile = profile
+        self.engine = engine
+        self.symbols = symbols
+        self.imports = imports
+        self.stub_dir = stub_dir
+
+    def cache_key(self, data):
+        # type: (bytes) -> Text
+        """
+        :param data: raw content of a source file
+        :return: key of its replacements in the ``ReplacementCache``
+        """
+        from mydocpy.cache import ReplacementCache
+
+        options = [self.imports.name]
+        if self.symbols is not None:
+            # the resolved imports change with the symbol index
+            options.append(_load_symbols(self.symbols).digest())
+        return ReplacementCache.key(
+            data, self.srcformat, self.destformat, options)
+
+    def get_style(self):
+        # type: () -> Callable
+        """
+        :return: the type hint format, which resolves names with the symbol
+            index, if there is one
+        """
+        style_format = formats.get_format(self.destformat)
+        with_resolver = getattr(style_format, "with_resolver", None)
+        if self.symbols is None or with_resolver is None:
+            return style_format
+
+        # the index is loaded once per process
+        key = (self.destformat, self.symbols)
+        style = _RESOLVING_STYLES.get(key)
+        if style is None:
+            style = _RESOLVING_STYLES[key] = with_resolver(
+                _load_symbols(self.symbols).resolve)
+        return style
+
+    def collects_imports(self):
+        # type: () -> bool
+        """
+        :return: whether imports are added for the type hint format
+        """
+        return self.imports != ImportMode.NONE and \
+            getattr(self.get_style(), "collects_imports", False)
+
+    def get_planner(self, content):
+        # type: (Text) -> ImportPlanner
+        from mydocpy.imports import ImportPlanner
+
+        return ImportPlanner(
+            content, use_if=self.imports == ImportMode.TYPE_CHECKING)
+
+    def get_replacements(
+            self,
+            docstrings,        # type: Sequence[DocString]
+            stats=NULL_STATS,  # type: FileStats
+            content=None       # type: Optional[Text]
+    ):
+        # type: (...) -> List[SourceReplacement]
+        """
+        :param content: source text of ``docstrings``, needed to add the
+            imports
+        """
+        with stats.stage("docformat"):
+            convert(docformats.get_format(self.srcformat), docstrings)
+
+        imports = None  # type: Optional[MutableSet[ImportedType]]
+        if content is not None and self.collects_imports():
+            imports = set()
+
+        with stats.stage("style"):
+            source_replacements = []  # type: List[SourceReplacement]
+            style_format = self.get_style()
+            for docstring in docstrings:
+                if imports is None:
+                    style_format(docstring, source_replacements)
+                else:
+                    style_format(docstring, source_replacements, imports)
+
+        if imports and source_replacements:
+            with stats.stage("imports"):
+                source_replacements[:0] = \
+                    self.get_planner(content).plan(imports)
+
+        stats.count("docstrings", len(docstrings))
+        stats.count("type_info", sum(
+            len(docstring.type_info or ()) for docstring in docstrings))
+        return source_replacements
+
+    def iter_replacements(
+            self,
+            docstrings,   # type: Iterable[DocString]
+            imports=None  # type: Optional[MutableSet[ImportedType]]
+    ):
+        # type: (...) -> Iterator[SourceReplacement]
+        """
+        Convert ``docstrings`` in batches of ``BATCH_SIZE``, so that only
+        the current doc strings and their type information are kept in
+        memory.
+
+        :param imports: receives the imports needed by the type hints
+        :return: replacements in source order, as long as the type hint format
+            does not add replacements before the object of a doc string
+        """
+        style_format = self.get_style()
+
+        source_replacements = []  # type: List[SourceReplacement]
+        for batch in self.iter_converted(docstrings):
+            for docstring in batch:
+                if imports is None:
+                    style_format(docstring, source_replacements)
+                else:
+                    style_format(docstring, source_replacements, imports)
+            if source_replacements:
+                source_replacements.sort(
+                    key=lambda x: x.source_range.start.line)
+                for source_replacement in source_replacements:
+                    yield source_replacement
+                del source_replacements[:]
+
+    def iter_converted(self, docstrings):
+        # type: (Iterable[DocString]) -> Iterator[List[DocString]]
+        """
+        :return: ``docstrings`` with their type information, in batches of
+            ``BATCH_SIZE``
+        """
+        docformat = docformats.get_format(self.srcformat)
+        docstrings = iter(docstrings)
+        while True:
+            batch = list(islice(docstrings, BATCH_SIZE))
+            if not batch:
+                return
+            convert(docformat, batch)
+            yield batch
+
+    def iter_source_replacements(self, content, stats=NULL_STATS):
+        # type: (Text, FileStats) -> Iterable[SourceReplacement]
+        """
+        :return: replacements for the source text ``content``, produced while
+            they are consumed. When profiling, the stages are run one after
+            another to time them separately and a list is returned.
+        """
+        parser = importlib.import_module(ENGINES[self.engine])
+
+        if not self.profile:
+            docstrings = parser.iter_parse(content)
+            if self.collects_imports():
+                return _ImportSlots(self, content, docstrings)
+            return self.iter_replacements(docstrings)
+
+        return self.get_source_replacements(content, stats)
+
+    def get_source_replacements(self, content, stats=NULL_STATS):
+        # type: (Text, FileStats) -> List[SourceReplacement]
+        """
+        :return: replacements for the source text ``content``, including the
+            imports
+        """
+        parser = importlib.import_module(ENGINES[self.engine])
+
+        with stats.stage("parse"):
+            docstrings = parser.parse(content)
+        return self.get_replacements(docstrings, stats, content)
+
+    def find_replacements(self, data, stats=NULL_STATS):
+        # type: (bytes, FileStats) -> Tuple[Text, Replacements, Optional[bool]]
+        """
+        :param data: raw content of a source file
+        :return: decoded content, its replacements and whether they were
+            found in the cache (None when no cache is used or the file was
+            skipped). Without cache, the replacements are an iterator (see
+            ``iter_source_replacements``), except in ``OutputMode.DIFF``.
+        """
+        content = data.decode("utf-8")
+
+        # most files have no type information at all: skip them without
+        # parsing (and hashing) when the format has a quick test for this
+        prescan = getattr(
+            docformats.get_format(self.srcformat), "prescan", None)
+        if prescan is not None:
+            with stats.stage("prescan"):
+                skip = prescan.search(data) is None
+            if skip:
+                stats.count("skipped", 1)
+                return content, [], None
+
+        if self.cache is None:
+            if self.mode == OutputMode.DIFF:
+                # the hunks need all replacements (and the imports) before
+                # the first one can be written: do not stream them
+                return content, \
+                    self.get_source_replacements(content, stats), None
+            return content, \
+                self.iter_source_replacements(content, stats), None
+
+        with stats.stage("cache"):
+            key = self.cache_key(data)
+            source_replacements = self.cache.get(key)
+        cached = source_replacements is not None
+        if not cached:
+            source_replacements = self.get_source_replacements(content, stats)
+            with stats.stage("cache"):
+                self.cache.put(key, source_replacements)
+        return content, source_replacements, cached
+
+    @staticmethod
+    def rewrite(content, source_replacements, stats=NULL_STATS):
+        # type: (Text, Iterable[SourceReplacement], FileStats) -> Text
+        """
+        :return: ``content`` with ``source_replacements`` applied
+        """
+        with stats.stage("apply"):
+            return replacements.splice(content, source_replacements)
+
+    def rewrite_stream(
+            self,
+            content,              # type: Text
+            source_replacements,  # type: Iterable[SourceReplacement]
+            stats=NULL_STATS,     # type: FileStats
+            finish=None,          # type: Optional[Callable[[Text], Text]]
+            counter=None          # type: Optional[_CountingIterator]
+    ):
+        # type: (...) -> Text
+        """
+        Like ``rewrite``, but applies the replacements while they are
+        produced. Falls back to ``rewrite`` (with all replacements created
+        again) when the type hint format does not produce them in order.
+
+        :param finish: completes the output after the last replacement (see
+            ``_ImportSlots.finish``)
+        :param counter: counts the streamed replacements, set to the number
+            of replacements applied by the fallback
+        """
+        if isinstance(source_replacements, list):
+            return self.rewrite(content, source_replacements, stats)
+
+        with stats.stage("apply"):
+            output = io.StringIO()
+            try:
+                replacements.apply_sorted(
+                    io.StringIO(content), output, source_replacements)
+            except replacements.UnsortedReplacements:
+                pass
+            else:
+                if finish is None:
+                    return output.getvalue()
+                return finish(output.getvalue())
+        source_replacements = self.get_source_replacements(content, stats)
+        if counter is not None:
+            counter.count = len(source_replacements)
+        return self.rewrite(content, source_replacements, stats)
+
+    def get_stub(self, content, stats=NULL_STATS):
+        # type: (Text, FileStats) -> Text
+        """
+        :return: stub of the source text ``content`` written by the type hint
+            format (which needs a ``write_stub`` method)
+        """
+        parser = importlib.import_module(ENGINES[self.engine])
+        style_format = self.get_style()
+
+        if not self.profile:
+            return style_format.write_stub(chain.from_iterable(
+                self.iter_converted(parser.iter_parse(content))), content)
+
+        with stats.stage("parse"):
+            docstrings = parser.parse(content)
+        with stats.stage("docformat"):
+            convert(docformats.get_format(self.srcformat), docstrings)
+        with stats.stage("style"):
+            return style_format.write_stub(docstrings, content)
+
+    def stub_path(self, srcfile):
+        # type: (Text) -> Text
+        """
+        :return: path of the stub for ``srcfile``
+        """
+        if self.stub_dir is None:
+            return os.path.splitext(srcfile)[0] + ".pyi"
+
+        from mydocpy.symbols import module_name
+
+        parts = module_name(srcfile).split(".")
+        if os.path.splitext(os.path.basename(srcfile))[0] == "__init__":
+            parts.append("__init__")
+        return os.path.join(self.stub_dir, *parts) + ".pyi"
+
+    def process_stub(self, srcfile, data, stats=NULL_STATS):
+        # type: (Text, bytes, FileStats) -> FileResult
+        """
+        Write the stub of ``srcfile`` (with content ``data``). Stubs are not
+        cached, because creating them is as fast as reading the cache.
+        """
+        text = self.get_stub(data.decode("utf-8"), stats)
+        if self.stub_dir is None and self.mode != OutputMode.IN_PLACE:
+            return FileResult(
+                srcfile, text, None, None, True,
+                stats if self.profile else None)
+
+        from mydocpy.utils.files import atomic_write
+
+        path = self.stub_path(srcfile)
+        stub = text.encode("utf-8")
+        try:
+            with open(path, "rb") as f:
+                changed = f.read() != stub
+        except (IOError, OSError):
+            changed = True
+        if changed:
+            with stats.stage("write"):
+                directory = os.path.dirname(path)
+                if directory and not os.path.isdir(directory):
+                    try:
+                        os.makedirs(directory)
+                    except OSError:
+                        if not os.path.isdir(directory):  # other worker
+                            raise
+                atomic_write(path, stub)
+        return FileResult(
+            srcfile, None, None, None, changed,
+            stats if self.profile else None)
+
+    def process(self, srcfile):
+        # type: (Text) -> FileResult
+        stats = FileStats(srcfile) if self.profile else NULL_STATS
+
+        # the file is read exactly once: the same buffer is used for the
+        # cache key, the parser and the rewrite
+        with stats.stage("read"):
+            with open(srcfile, "rb") as f:
+                data = f.read()
+        if getattr(self.get_style(), "write_stub", None) is not None:
+            return self.process_stub(srcfile, data, stats)
+
+        content, source_replacements, cached = \
+            self.find_replacements(data, stats)
+        if self.mode == OutputMode.DIFF:
+            return self.process_diff(
+                srcfile, content, source_replacements, cached, stats)
+
+        finish = getattr(source_replacements, "finish", None)
+        source_replacements = _CountingIterator(source_replacements)
+
+        output = None
+        if self.mode == OutputMode.IN_PLACE:
+            # most files need no change: do not touch them at all
+            first = next(source_replacements, None)
+            if first is not None:
+                from mydocpy.utils.files import atomic_write
+
+                text = self.rewrite_stream(
+                    content, chain((first,), source_replacements), stats,
+                    finish, source_replacements)
+                with stats.stage("write"):
+                    atomic_write(srcfile, text.encode("utf-8"))
+        else:
+            output = self.rewrite_stream(
+                content, source_replacements, stats, finish,
+                source_replacements)
+        changed = source_replacements.count != 0
+        stats.count("replacements", source_replacements.count)
+
+        return FileResult(
+            srcfile, output, None, cached, changed,
+            stats if self.profile else None)
+
+    def process_diff(
+            self,
+            srcfile,              # type: Text
+            content,              # type: Text
+            source_replacements,  # type: List[SourceReplacement]
+            cached,               # type: Optional[bool]
+            stats                 # type: FileStats
+    ):
+        # type: (...) -> FileResult
+        """
+        create the unified diff of ``srcfile`` as output of
+        ``OutputMode.DIFF``
+        """
+        with stats.stage("diff"):
+            output = replacements.unified_diff(
+                content, source_replacements, srcfile)
+        stats.count("replacements", len(source_replacements))
+
+        return FileResult(
+            srcfile, output, None, cached, bool(output),
+            stats if self.profile else None)
+
+    def __call__(self, srcfile):
+        # type: (Text) -> FileResult
+        """
+        process ``srcfile`` and catch all errors, so that one broken file does
+        not stop the processing of the other files
+        """
+        try:
+            return self.process(srcfile)
+        except Exception:
+            return FileResult(
+                srcfile, None, traceback.format_exc(), None, False, None)
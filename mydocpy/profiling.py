@@ -0,0 +1,159 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import json
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from typing import Any, Dict, IO, Iterator, List, Optional, Text
+
+try:
+    _clock = time.perf_counter
+except AttributeError:  # Python 2
+    _clock = time.time
+
+
+class FileStats(object):
+    """
+    Wall time per stage and counters of one processed file
+
+    :ivar stages: seconds per stage (in order of execution)
+    :ivar counts: counters (``docstrings``, ``type_info``, ``replacements``)
+    """
+
+    __slots__ = ("path", "stages", "counts")
+
+    def __init__(self, path):
+        # type: (Text) -> None
+        self.path = path
+        self.stages = OrderedDict()  # type: Dict[Text, float]
+        self.counts = OrderedDict()  # type: Dict[Text, int]
+
+    @contextmanager
+    def stage(self, name):
+        # type: (Text) -> Iterator[None]
+        """
+        time the ``with`` block as stage ``name``
+        """
+        start = _clock()
+        try:
+            yield
+        finally:
+            self.stages[name] = \
+                self.stages.get(name, 0.0) + _clock() - start
+
+    def count(self, name, value):
+        # type: (Text, int) -> None
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    @property
+    def total(self):
+        # type: () -> float
+        return sum(self.stages.values())
+
+    def to_json(self):
+        # type: () -> Dict[Text, Any]
+        return OrderedDict([
+            ("path", self.path),
+            ("total", self.total),
+            ("stages", self.stages),
+            ("counts", self.counts),
+        ])
+
+
+class _NullStats(object):
+    """
+    ``FileStats`` replacement which records nothing
+    """
+
+    @contextmanager
+    def stage(self, name):
+        yield
+
+    def count(self, name, value):
+        pass
+
+
+NULL_STATS = _NullStats()
+
+
+class Profile(object):
+    """
+    Collects the ``FileStats`` of all processed files
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self.files = []  # type: List[FileStats]
+        self._start = _clock()
+        self.wall_time = None  # type: Optional[float]
+
+    def add(self, stats):
+        # type: (FileStats) -> None
+        self.files.append(stats)
+
+    def finish(self):
+        # type: () -> None
+        self.wall_time = _clock() - self._start
+
+    def totals(self):
+        # type: () -> Dict[Text, Dict[Text, float]]
+        """
+        :return: sums of all stage times and all counters
+        """
+        stages = OrderedDict()  # type: Dict[Text, float]
+        counts = OrderedDict()  # type: Dict[Text, float]
+        for stats in self.files:
+            for name, seconds in stats.stages.items():
+                stages[name] = stages.get(name, 0.0) + seconds
+            for name, value in stats.counts.items():
+                counts[name] = counts.get(name, 0) + value
+        return OrderedDict([("stages", stages), ("counts", counts)])
+
+    def slowest(self, n=10):
+        # type: (int) -> List[FileStats]
+        return sorted(self.files, key=lambda stats: -stats.total)[:n]
+
+    def write_json(self, f):
+        # type: (IO[Text]) -> None
+        json.dump(OrderedDict([
+            ("wall_time", self.wall_time),
+            ("files_count", len(self.files)),
+            ("totals", self.totals()),
+            ("files", [stats.to_json() for stats in self.files]),
+        ]), f, indent=2)
+        f.write("\n")
+
+    def write_summary(self, f, n=10):
+        # type: (IO[Text], int) -> None
+        totals = self.totals()
+        f.write("{} files in {:.3f}s\n".format(
+            len(self.files), self.wall_time or 0.0))
+        f.write("stages: {}\n".format(", ".join(
+            "{} {:.3f}s".format(name, seconds)
+            for name, seconds in totals["stages"].items())))
+        f.write("counts: {}\n".format(", ".join(
+            "{} {}".format(name, value)
+            for name, value in totals["counts"].items())))
+
+        f.write("slowest files:\n")
+        for stats in self.slowest(n):
+            f.write("  {:8.3f}s  {}  ({})\n".format(
+                stats.total, stats.path, ", ".join(
+                    "{} {:.3f}s".format(name, seconds)
+                    for name, seconds in stats.stages.items())))
@@ -14,14 +14,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import re
 import shutil
+from bisect import bisect_right
 from itertools import islice
 
-from typing import Iterable, TextIO, Tuple, NamedTuple, Text
+from typing import Iterable, List, Optional, TextIO, Tuple, NamedTuple, \
+    Text
 
-from mydocpy.source import SourceLocation, SourceDistance, SourceRange
+from mydocpy.source import LineIndex, SourceLocation, SourceDistance, \
+    SourceRange
 from mydocpy.utils.iterutils import consume
 
+_LINE = re.compile("[^\n]*\n|[^\n]+")
+
 
 SourceReplacement = NamedTuple(
     "SourceReplacement",
@@ -32,6 +39,21 @@ SourceReplacement = NamedTuple(
 )
 
 
+class UnsortedReplacements(ValueError):
+    """
+    A replacement starts before the end of the previous one
+    """
+
+
+class ReplacementConflict(ValueError):
+    """
+    Two replacements change overlapping parts of the source
+    """
+
+
+_Edit = Tuple[int, int, int, Text]
+
+
 class _ReplacementApplier(object):
 
     def __init__(self, srcfile, destfile, source_replacements):
@@ -63,6 +85,9 @@ class _ReplacementApplier(object):
         for source_replacement in self.source_replacements:
             start = source_replacement.source_range.start
             length = source_replacement.source_range.length
+            if start._keys() < self.srcpos._keys():
+                raise UnsortedReplacements(
+                    "replacement at {} before {}".format(start, self.srcpos))
 
             self._write(start - self.srcpos)
             self._skip(length)
@@ -75,15 +100,244 @@ class _ReplacementApplier(object):
         shutil.copyfileobj(self.srcfile, self.destfile)
 
 
+def _sorted_edits(content, source_replacements, index):
+    # type: (Text, Iterable[SourceReplacement], LineIndex) -> List[_Edit]
+    """
+    :return: ``source_replacements`` as (start offset, position, end offset,
+        text) in source order
+    :raises ReplacementConflict: when a replacement starts before the end of
+        another one
+    """
+    starts = index.starts
+    lines = len(starts)
+    size = len(content)
+
+    # offsets are computed inline (no locations are created): this is the
+    # hot loop for large generated files
+    edits = []  # type: List[_Edit]
+    for order, source_replacement in enumerate(source_replacements):
+        source_range = source_replacement.source_range
+        start_loc = source_range.start
+        length = source_range.length
+        line = start_loc.line
+        if line < lines:
+            start = starts[line] + start_loc.col
+        else:
+            start = size  # insertions after the last line break
+        if length.lines:
+            line += length.lines
+            end = starts[line] + length.cols if line < lines else size
+        else:
+            end = start + length.cols
+        edits.append((start, order, end, source_replacement.replacement))
+    edits.sort()
+
+    pos = 0
+    for start, _, end, _ in edits:
+        if start < pos:
+            raise ReplacementConflict(
+                "replacement at {} overlaps the previous one".format(
+                    index.location(start)))
+        pos = end
+    return edits
+
+
+def splice(content, source_replacements, index=None):
+    # type: (Text, Iterable[SourceReplacement], Optional[LineIndex]) -> Text
+    """
+    Apply ``source_replacements`` to the text ``content`` in any order.
+
+    The replacements are converted to character offsets and sorted by
+    (offset, position in ``source_replacements``), so insertions at the same
+    location keep their order. The output is joined once, so the time is
+    linear in the size of ``content`` and the replacements (plus sorting).
+
+    :param index: line index of ``content``, if there is one already
+    :raises ReplacementConflict: when a replacement starts before the end of
+        another one
+    """
+    if index is None:
+        index = LineIndex(content)
+
+    parts = []  # type: List[Text]
+    pos = 0
+    for start, _, end, replacement in _sorted_edits(
+            content, source_replacements, index):
+        parts.append(content[pos:start])
+        parts.append(replacement)
+        pos = end
+    parts.append(content[pos:])
+    return "".join(parts)
+
+
+def _format_range(start, length):
+    # type: (int, int) -> Text
+    # same as difflib: an empty range refers to the line before it
+    if length == 1:
+        return str(start + 1)
+    if length == 0:
+        return "{},0".format(start)
+    return "{},{}".format(start + 1, length)
+
+
+def _diff_line(prefix, line):
+    # type: (Text, Text) -> Text
+    if line.endswith("\n"):
+        return prefix + line
+    return prefix + line + "\n\\ No newline at end of file\n"
+
+
+def _diff_path(path):
+    # type: (Text) -> Text
+    """
+    :return: ``path`` relative to the working directory with ``/``
+    :raises ValueError: when ``path`` is outside of the working directory
+    """
+    relative = os.path.relpath(path)
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        raise ValueError(
+            "{} is outside of the working directory".format(path))
+    return relative.replace(os.sep, "/")
+
+
+def unified_diff(
+        content,              # type: Text
+        source_replacements,  # type: Iterable[SourceReplacement]
+        path,                 # type: Text
+        context=3,            # type: int
+        index=None            # type: Optional[LineIndex]
+):
+    # type: (...) -> Text
+    """
+    Unified diff (for ``patch -p1`` and ``git apply``) between ``content``
+    and ``content`` with ``source_replacements`` applied as by ``splice``.
+
+    The diff is built from the sorted replacements: only the changed lines
+    and their ``context`` lines are taken from ``content``, the rewritten
+    text is never created (nor compared line by line).
+
+    :param path: path of the file, the ``---``/``+++`` headers contain it
+        relative to the working directory
+    :return: the diff or ``""`` when nothing is changed
+    :raises ReplacementConflict: when a replacement starts before the end of
+        another one
+    :raises ValueError: when ``path`` is outside of the working directory
+    """
+    path = _diff_path(path)
+    if index is None:
+        index = LineIndex(content)
+    starts = index.starts
+    size = len(content)
+    # the empty "line" after a final line break is not a line of the diff
+    lines = len(starts) - 1 if starts[-1] == size else len(starts)
+
+    def line_start(line):
+        # type: (int) -> int
+        return starts[line] if line < lines else size
+
+    # changed line ranges [first, stop) with their new lines
+    regions = []  # type: List[Tuple[int, int, List[Text]]]
+    first = stop = 0
+    region_edits = []  # type: List[_Edit]
+
+    def add_region():
+        # type: () -> None
+        parts = []  # type: List[Text]
+        pos = line_start(first)
+        for start, _, end, replacement in region_edits:
+            parts.append(content[pos:start])
+            parts.append(replacement)
+            pos = end
+        parts.append(content[pos:line_start(stop)])
+        new_text = "".join(parts)
+        if new_text != content[line_start(first):line_start(stop)]:
+            regions.append((first, stop, _LINE.findall(new_text)))
+
+    for edit in _sorted_edits(content, source_replacements, index):
+        start, _, end, replacement = edit
+        if content[start:end] == replacement:
+            continue  # changes nothing (hunks without changes are invalid)
+        edit_first = bisect_right(starts, start) - 1
+        edit_stop = bisect_right(starts, end) - 1
+        if (start != line_start(edit_first) or end != line_start(edit_stop)
+                or replacement[-1:] not in ("", "\n")):
+            # not whole lines: the lines of both ends are changed
+            edit_stop = min(edit_stop + 1, lines)
+
+        # edits of adjacent lines share a region, so that their removed
+        # lines are followed by all of their added lines (like difflib)
+        if region_edits and edit_first <= stop:
+            stop = max(stop, edit_stop)
+        else:
+            if region_edits:
+                add_region()
+                del region_edits[:]
+            first, stop = edit_first, edit_stop
+        region_edits.append(edit)
+    if region_edits:
+        add_region()
+
+    def old_line(line):
+        # type: (int) -> Text
+        return content[starts[line]:line_start(line + 1)]
+
+    output = []  # type: List[Text]
+    offset = 0  # difference of the line numbers of the new and old text
+    i = 0
+    while i < len(regions):
+        # regions separated by at most 2 * context lines share a hunk
+        j = i + 1
+        while (j < len(regions) and
+               regions[j][0] - regions[j - 1][1] <= 2 * context):
+            j += 1
+        hunk_first = max(regions[i][0] - context, 0)
+        hunk_stop = min(regions[j - 1][1] + context, lines)
+
+        hunk = []  # type: List[Text]
+        added = 0
+        pos = hunk_first
+        for region_first, region_stop, new_lines in regions[i:j]:
+            hunk.extend(_diff_line(" ", old_line(line))
+                        for line in range(pos, region_first))
+            hunk.extend(_diff_line("-", old_line(line))
+                        for line in range(region_first, region_stop))
+            hunk.extend(_diff_line("+", line) for line in new_lines)
+            added += len(new_lines) - (region_stop - region_first)
+            pos = region_stop
+        hunk.extend(_diff_line(" ", old_line(line))
+                    for line in range(pos, hunk_stop))
+
+        length = hunk_stop - hunk_first
+        output.append("@@ -{} +{} @@\n".format(
+            _format_range(hunk_first, length),
+            _format_range(hunk_first + offset, length + added)))
+        output.extend(hunk)
+        offset += added
+        i = j
+
+    if not output:
+        return ""
+    return "--- a/{0}\n+++ b/{0}\n".format(path) + "".join(output)
+
+
 def apply(srcfile, destfile, source_replacements):
     # type: (TextIO, TextIO, Iterable[SourceReplacement]) -> None
+    """
+    Write the content of ``srcfile`` with ``source_replacements`` applied
+    (in any order) to ``destfile`` (see ``splice``)
+    """
+    destfile.write(splice(srcfile.read(), source_replacements))
 
-    source_replacements = list(source_replacements)
-    source_replacements.sort(
-        key=lambda x: x.source_range.start.line
-    )
-    # TODO: use itertools.groupby
-    # TODO: find conflicts
 
+def apply_sorted(srcfile, destfile, source_replacements):
+    # type: (TextIO, TextIO, Iterable[SourceReplacement]) -> None
+    """
+    Like ``apply``, but consumes ``source_replacements`` one at a time, so
+    they can be produced while the output is written. The replacements must
+    be in source order.
+
+    :raises UnsortedReplacements: when a replacement starts before the end of
+        the previous one (the output is incomplete then)
+    """
     applier = _ReplacementApplier(srcfile, destfile, source_replacements)
     applier.execute()
@@ -0,0 +1,254 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Long running server, which keeps the formats and caches loaded.
+
+Requests and responses are JSON objects, one per line. A request has the
+keys:
+
+``src_format``, ``format``
+    doc string format and type hint format (default: formats given on the
+    command line of the server)
+
+``path`` or ``source``
+    file to process or source text to process (``path`` is only used in
+    error messages when ``source`` is given)
+
+``output``
+    ``"text"`` (default) for the rewritten source, ``"replacements"`` for
+    the list of replacements or ``"diff"`` for a unified diff
+
+A response has the key ``text``, ``replacements`` (list of objects with
+``start``, ``length`` as ``[line, col]`` and ``text``) or ``diff`` or
+``error``, when the request failed.
+"""
+
+import errno
+import json
+import os
+import socket
+import stat
+import threading
+import traceback
+from collections import OrderedDict
+
+from typing import Any, Dict, List, Optional, Text
+
+from mydocpy.cache import ReplacementCache
+from mydocpy.pipeline import FileProcessor, load_formats
+from mydocpy.replacements import SourceReplacement, unified_diff
+
+try:
+    import socketserver
+except ImportError:  # Python 2
+    import SocketServer as socketserver
+
+
+class Service(object):
+    """
+    Handles requests of the server.
+
+    The replacements of the last ``memory_cache_size`` sources are kept in
+    memory in addition to the (optional) on-disk ``cache``.
+    """
+
+    def __init__(
+            self,
+            srcformat=None,          # type: Optional[Text]
+            destformat=None,         # type: Optional[Text]
+            cache=None,              # type: Optional[ReplacementCache]
+            memory_cache_size=1024,  # type: int
+            engine="ast"             # type: Text
+    ):
+        # type: (...) -> None
+        self.srcformat = srcformat
+        self.destformat = destformat
+        self.cache = cache
+        self.memory_cache_size = memory_cache_size
+        self.engine = engine
+        self._memory_cache = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+        load_formats()
+
+    def _get_replacements(self, processor, content):
+        # type: (FileProcessor, Text) -> List[SourceReplacement]
+        data = content.encode("utf-8")
+        key = processor.cache_key(data)
+
+        with self._lock:
+            source_replacements = self._memory_cache.pop(key, None)
+            if source_replacements is None and self.cache is not None:
+                source_replacements = self.cache.get(key)
+                self.cache.record(source_replacements is not None)
+
+        if source_replacements is None:
+            source_replacements = processor.get_source_replacements(content)
+            if self.cache is not None:
+                self.cache.put(key, source_replacements)
+
+        with self._lock:
+            self._memory_cache[key] = source_replacements
+            while len(self._memory_cache) > self.memory_cache_size:
+                self._memory_cache.popitem(last=False)
+
+        return source_replacements
+
+    def handle(self, request):
+        # type: (Dict[Text, Any]) -> Dict[Text, Any]
+        try:
+            processor = FileProcessor(
+                request.get("src_format", self.srcformat),
+                request.get("format", self.destformat),
+                engine=self.engine)
+
+            path = request.get("path")
+            content = request.get("source")
+            if content is None:
+                with open(path, "rb") as f:
+                    content = f.read().decode("utf-8")
+
+            source_replacements = self._get_replacements(processor, content)
+
+            output = request.get("output", "text")
+            if output == "diff":
+                return {"diff": unified_diff(
+                    content, source_replacements, path or "<source>")}
+            if output == "replacements":
+                return {"replacements": [
+                    {
+                        "start": [r.source_range.start.line,
+                                  r.source_range.start.col],
+                        "length": [r.source_range.length.lines,
+                                   r.source_range.length.cols],
+                        "text": r.replacement
+                    }
+                    for r in source_replacements
+                ]}
+
+            return {"text": processor.rewrite(content, source_replacements)}
+        except Exception:
+            return {"error": traceback.format_exc()}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line.decode("utf-8"))
+            except ValueError as e:
+                response = {"error": "invalid request: {}".format(e)}
+            else:
+                response = self.server.service.handle(request)
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+def _remove_stale_socket(address):
+    # type: (Text) -> None
+    """
+    Remove the socket ``address`` of a previous server, which is not running
+    anymore.
+
+    :raises OSError: when ``address`` is not a socket or a server is still
+        listening on it
+    """
+    try:
+        mode = os.stat(address).st_mode
+    except OSError:
+        return  # does not exist
+    if not stat.S_ISSOCK(mode):
+        raise OSError(errno.EEXIST, "File exists and is not a socket",
+                      address)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(address)
+    except socket.error:
+        os.remove(address)
+    else:
+        raise OSError(errno.EADDRINUSE, "A server is running on", address)
+    finally:
+        sock.close()
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        # type: (Text, Service) -> None
+        _remove_stale_socket(address)
+        # only the socket file created by this server is removed on close
+        self.bound = False
+        socketserver.UnixStreamServer.__init__(
+            self, address, _RequestHandler)
+        self.service = service
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        self.bound = True
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        if self.bound and os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        self.bound = False
+
+
+def serve(address, service):
+    # type: (Text, Service) -> None
+    """
+    serve requests on the Unix socket ``address`` until interrupted
+    """
+    server = Server(address, service)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if service.cache is not None:
+            service.cache.prune()
+
+
+class Client(object):
+    """
+    Client for a server listening on the Unix socket ``address``
+    """
+
+    def __init__(self, address):
+        # type: (Text) -> None
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(address)
+        self._file = self._socket.makefile("rwb")
+
+    def request(self, **request):
+        # type: (**Any) -> Dict[Text, Any]
+        """
+        send a request (see module documentation) and wait for the response
+        """
+        self._file.write(json.dumps(request).encode("utf-8") + b"\n")
+        self._file.flush()
+        return json.loads(self._file.readline().decode("utf-8"))
+
+    def close(self):
+        # type: () -> None
+        self._file.close()
+        self._socket.close()
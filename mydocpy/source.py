@@ -15,8 +15,12 @@
 # limitations under the License.
 
 import ast
+import re
+from bisect import bisect_right
 
-from typing import Text, Match
+from typing import List, Match, Optional, Text
+
+_NEWLINE = re.compile("\n")
 
 
 class SourceLocation(object):
@@ -38,7 +42,8 @@ class SourceLocation(object):
     def __add__(self, other):
         # type: (SourceDistance) -> SourceLocation
         lines = self.line + other.lines
-        cols = self.col if other.lines else self.col + other.cols
+        # the columns of a distance over lines are the end column
+        cols = other.cols if other.lines else self.col + other.cols
         return SourceLocation(lines, cols)
 
     def __sub__(self, other):
@@ -55,12 +60,14 @@ class SourceLocation(object):
     def from_text_pos(cls, text, pos):  # type: (Text, int) -> SourceLocation
         """
         get line number (starting at 0) and column offset of ``pos`` in ``text``
+
+        Use ``LineIndex`` for more than one position in the same text.
         """
         last_nl = text.rfind('\n', 0, pos)
         if last_nl < 0:
             return SourceLocation(0, pos)
 
-        return SourceLocation(text[:pos].count('\n'), pos - (last_nl + 1))
+        return SourceLocation(text.count('\n', 0, pos), pos - (last_nl + 1))
 
     def __repr__(self):
         return "SourceLocation(line={}, col={})".format(
@@ -132,10 +139,14 @@ class SourceRange(object):
                )
 
     @classmethod
-    def from_match(cls, text, match):  # type: (Text, Match) -> SourceRange
-        start = SourceLocation.from_text_pos(text, match.start(0))
-        end = SourceLocation.from_text_pos(text, match.end(0))
-        return cls(start, end - start)
+    def from_match(cls, text, match, index=None):
+        # type: (Text, Match, Optional[LineIndex]) -> SourceRange
+        """
+        :param index: line index of ``text`` (pass it for more than one match)
+        """
+        if index is None:
+            index = LineIndex(text)
+        return index.range(match.start(0), match.end(0))
 
     @classmethod
     def from_location(cls, location):  # type: (SourceLocation) -> SourceRange
@@ -146,3 +157,57 @@ class SourceRange(object):
 
     def __eq__(self, other):
         return type(self) == type(other) and self._keys() == other._keys()
+
+
+class LineIndex(object):
+    """
+    Start offsets of the lines of a text, to convert between character
+    offsets and locations in ``O(log n)``
+
+    Build it once per text, instead of counting the lines before every
+    offset again.
+    """
+
+    __slots__ = ("starts",)
+
+    def __init__(self, text):
+        # type: (Text) -> None
+        self.starts = [0]  # type: List[int]
+        self.starts.extend(match.end() for match in _NEWLINE.finditer(text))
+
+    def __len__(self):
+        # type: () -> int
+        """
+        :return: number of lines
+        """
+        return len(self.starts)
+
+    def location(self, pos):
+        # type: (int) -> SourceLocation
+        """
+        :return: line number (starting at 0) and column offset of ``pos``
+        """
+        line = bisect_right(self.starts, pos) - 1
+        return SourceLocation(line, pos - self.starts[line])
+
+    def offset(self, line, col=0):
+        # type: (int, int) -> int
+        """
+        :return: character offset of column ``col`` in line ``line``
+        """
+        return self.starts[line] + col
+
+    def position(self, location):
+        # type: (SourceLocation) -> int
+        """
+        :return: character offset of ``location``
+        """
+        return self.starts[location.line] + location.col
+
+    def range(self, start, end):
+        # type: (int, int) -> SourceRange
+        """
+        :return: source range between the offsets ``start`` and ``end``
+        """
+        start_loc = self.location(start)
+        return SourceRange(start_loc, self.location(end) - start_loc)
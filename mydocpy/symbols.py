@@ -0,0 +1,280 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Index of the classes and type aliases defined in a project, to find the
+module to import for a short type name.
+
+The index is stored as JSON and updated incrementally: files are only read
+again when their modification time or size changed, and only parsed again
+when their content hash changed.
+"""
+
+import ast
+import errno
+import hashlib
+import json
+import os
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Text
+
+from mydocpy.parse import _iter_compound_bodies
+from mydocpy.types import ImportedType
+from mydocpy.utils.files import atomic_write
+
+# increase when the stored format or the recorded symbols change
+INDEX_VERSION = 2
+
+# calls creating types, which are assigned to a name
+_TYPE_FACTORIES = frozenset(
+    ["NamedTuple", "NewType", "TypeVar", "namedtuple", "Enum"])
+
+# builtin types, which can be aliased (``Number = int``)
+_BUILTIN_TYPES = frozenset([
+    "bool", "bytes", "complex", "dict", "float", "frozenset", "int", "list",
+    "object", "set", "str", "tuple", "type"])
+
+# ``X: TypeAlias = ...`` statements of Python 3.6
+_ANNOTATED_ASSIGNMENTS = tuple(
+    getattr(ast, name) for name in ("AnnAssign",) if hasattr(ast, name))
+
+# ``type X = ...`` statements of Python 3.12
+_TYPE_ALIAS_STATEMENTS = tuple(
+    getattr(ast, name) for name in ("TypeAlias",) if hasattr(ast, name))
+
+# module level blocks containing definitions
+_BLOCKS = tuple(
+    getattr(ast, name) for name in ("If", "Try", "TryExcept", "TryFinally")
+    if hasattr(ast, name)
+)
+
+
+def module_name(path):
+    # type: (Text) -> Text
+    """
+    :return: qualified name of the module in file ``path`` (the parent
+        directories with an ``__init__.py`` are its packages)
+    """
+    directory, filename = os.path.split(os.path.abspath(path))
+    name = os.path.splitext(filename)[0]
+    parts = [] if name == "__init__" else [name]
+    while os.path.isfile(os.path.join(directory, "__init__.py")):
+        directory, package = os.path.split(directory)
+        parts.insert(0, package)
+    return ".".join(parts)
+
+
+def _last_name(node):
+    # type: (ast.expr) -> Optional[Text]
+    """
+    :return: last part of a (dotted) name, like ``Bar`` of ``foo.Bar``
+    """
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def _is_alias_value(node, types):
+    # type: (ast.expr, Set[Text]) -> bool
+    """
+    :param types: names of the types defined before
+    :return: whether ``node`` is the value of a type alias: a name of a type
+        (capitalized like a class, not a constant in capitals) or a
+        generic (``Dict[str, int]``) or a call creating a type
+    """
+    if isinstance(node, ast.Subscript):
+        node = node.value
+    name = _last_name(node)
+    if name is not None:
+        return name in types or name in _BUILTIN_TYPES or \
+            (name[:1].isupper() and not name.isupper())
+    if isinstance(node, ast.Call):
+        func = node.func
+        name = func.attr if isinstance(func, ast.Attribute) else \
+            getattr(func, "id", None)
+        return name in _TYPE_FACTORIES
+    return False
+
+
+def scan(content):
+    # type: (bytes) -> List[Text]
+    """
+    :return: names of the classes and type aliases defined at module level
+        (also in ``if`` and ``try`` blocks)
+    """
+    names = []  # type: List[Text]
+    stack = [iter(ast.parse(content).body)]
+    while stack:
+        for node in stack[-1]:
+            if isinstance(node, ast.ClassDef):
+                names.append(node.name)
+            elif isinstance(node, ast.Assign):
+                if len(node.targets) == 1 and \
+                        isinstance(node.targets[0], ast.Name) and \
+                        _is_alias_value(node.value, set(names)):
+                    names.append(node.targets[0].id)
+            elif isinstance(node, _ANNOTATED_ASSIGNMENTS):
+                # X: TypeAlias = ...
+                if isinstance(node.target, ast.Name) and \
+                        node.value is not None and \
+                        _last_name(node.annotation) == "TypeAlias":
+                    names.append(node.target.id)
+            elif isinstance(node, _TYPE_ALIAS_STATEMENTS):
+                names.append(node.name.id)
+            elif isinstance(node, _BLOCKS):
+                stack.append(_iter_compound_bodies(node))
+                break
+        else:
+            stack.pop()
+    return names
+
+
+class SymbolIndex(object):
+    """
+    Classes and type aliases of a set of files
+
+    :ivar files: per file path its ``mtime``, ``size``, ``hash``, ``module``
+        and defined ``symbols``
+    :ivar modified: whether ``files`` changed since the index was loaded or
+        saved
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self.files = {}  # type: Dict[Text, Dict[Text, Any]]
+        self.modified = False
+        self._modules = None  # type: Optional[Dict[Text, List[Text]]]
+        self._digest = None  # type: Optional[Text]
+
+    @classmethod
+    def load(cls, path):
+        # type: (Text) -> SymbolIndex
+        """
+        :return: index stored in ``path`` or an empty index, if it does not
+            exist or has an old format
+        """
+        index = cls()
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except IOError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            return index
+        except ValueError:
+            return index  # broken: build it again
+
+        if data.get("version") == INDEX_VERSION:
+            index.files = data["files"]
+        return index
+
+    def save(self, path):
+        # type: (Text) -> None
+        data = {"version": INDEX_VERSION, "files": self.files}
+        atomic_write(
+            path, json.dumps(data, sort_keys=True).encode("utf-8"),
+            fsync=False)
+        self.modified = False
+
+    def update(self, paths):
+        # type: (Iterable[Text]) -> int
+        """
+        Index the files ``paths``. Other indexed files are kept, as long as
+        they exist.
+
+        :return: number of parsed files
+        """
+        files = dict(
+            (path, entry) for path, entry in self.files.items()
+            if os.path.exists(path)
+        )  # type: Dict[Text, Dict[Text, Any]]
+        parsed = 0
+        for path in paths:
+            path = os.path.abspath(path)
+            stat = os.stat(path)
+            entry = self.files.get(path)
+            if entry is not None and entry["mtime"] == stat.st_mtime and \
+                    entry["size"] == stat.st_size:
+                files[path] = entry
+                continue
+
+            with open(path, "rb") as f:
+                content = f.read()
+            digest = hashlib.sha1(content).hexdigest()
+            if entry is None or entry["hash"] != digest:
+                try:
+                    symbols = scan(content)
+                except (SyntaxError, ValueError):
+                    symbols = []
+                parsed += 1
+                entry = {
+                    "hash": digest,
+                    "module": module_name(path),
+                    "symbols": symbols,
+                }
+            # a copy: the loaded entry is compared to detect changes
+            files[path] = dict(entry, mtime=stat.st_mtime, size=stat.st_size)
+
+        if files != self.files:
+            self.files = files
+            self.modified = True
+            self._modules = None
+            self._digest = None
+        return parsed
+
+    def digest(self):
+        # type: () -> Text
+        """
+        :return: hash of the modules and their symbols, which only changes
+            when names are resolved differently (not when files are touched)
+        """
+        if self._digest is None:
+            modules = sorted(
+                (entry["module"], entry["symbols"])
+                for entry in self.files.values())
+            self._digest = hashlib.sha1(
+                json.dumps(modules).encode("utf-8")).hexdigest()
+        return self._digest
+
+    def modules(self, name):
+        # type: (Text) -> List[Text]
+        """
+        :return: modules defining ``name``
+        """
+        if self._modules is None:
+            modules = {}  # type: Dict[Text, List[Text]]
+            for entry in self.files.values():
+                for symbol in entry["symbols"]:
+                    modules.setdefault(symbol, []).append(entry["module"])
+            for defining in modules.values():
+                defining.sort()
+            self._modules = modules
+        return self._modules.get(name, [])
+
+    def resolve(self, name, module=None):
+        # type: (Text, Optional[Text]) -> Optional[ImportedType]
+        """
+        :param module: module using ``name``
+        :return: import of ``name`` or None, if ``name`` is defined in
+            ``module``, in no module or in several modules
+        """
+        modules = self.modules(name)
+        if len(modules) != 1 or modules[0] == module:
+            return None
+        return ImportedType(modules[0], name)
@@ -0,0 +1,166 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import shutil
+import tempfile
+import textwrap
+
+from testtools import TestCase
+
+from mydocpy.pipeline import FileProcessor, ImportMode, load_formats
+from mydocpy.symbols import SymbolIndex
+
+SOURCE = textwrap.dedent('''\
+    class Service(object):
+        """
+        :ivar name: name of the service
+        :type name: str
+        """
+
+        def get(self, key, default=None, *args, strict=False, **kw):
+            """
+            :type key: str
+            :type default: int
+            :type args: int
+            :type strict: bool
+            :rtype: list of str
+            """
+
+        def put(self, k: int, v) -> bool:  # comment (x)
+            """:type v: dict(str, int)"""
+
+
+    def free(
+            a,  # comment
+            b=(1, 2)):
+        """
+        :type a: Service
+        :type b: tuple of int
+        """
+    ''')
+
+EXPECTED = textwrap.dedent('''\
+    class Service(object):
+        """
+        :ivar name: name of the service
+        :type name: str
+        """
+
+        name: str
+
+        def get(self, key: str, default: int = None, *args: int, \
+strict: bool = False, **kw) -> List[str]:
+            """
+            :type key: str
+            :type default: int
+            :type args: int
+            :type strict: bool
+            :rtype: list of str
+            """
+
+        def put(self, k: int, v: Dict[str, int]) -> bool:  # comment (x)
+            """:type v: dict(str, int)"""
+
+
+    def free(
+            a: Service,  # comment
+            b: Tuple[int, ...] = (1, 2)) -> None:
+        """
+        :type a: Service
+        :type b: tuple of int
+        """
+    ''')
+
+
+class AnnotationStyleTests(TestCase):
+
+    def setUp(self):
+        super(AnnotationStyleTests, self).setUp()
+        load_formats()
+
+    def test_Annotations(self):
+        for engine in ("ast", "tokenize"):
+            sut = FileProcessor(
+                "sphinx", "annotations", engine=engine,
+                imports=ImportMode.NONE)
+
+            output = sut.rewrite(
+                SOURCE, sut.get_source_replacements(SOURCE))
+
+            self.assertEqual(EXPECTED, output)
+
+    def test_Imports(self):
+        sut = FileProcessor("sphinx", "annotations")
+
+        output = sut.rewrite(SOURCE, sut.get_source_replacements(SOURCE))
+
+        self.assertEqual(
+            "from __future__ import annotations\n"
+            "from typing import Dict, List, Tuple\n\n" + EXPECTED, output)
+
+    def test_OutputRuns(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        package = os.path.join(directory, "pkg")
+        os.makedirs(package)
+        sources = {
+            "__init__.py": "",
+            "foo.py": "class Foo(object):\n    pass\n",
+            "node.py": textwrap.dedent('''\
+                """nodes"""
+
+
+                class Node(object):
+                    """
+                    :ivar parent: parent node
+                    :type parent: Node or None
+                    """
+
+                    def link(self, other):
+                        """
+                        :type other: Node
+                        :rtype: Node
+                        """
+                        return other
+
+
+                def use(x):
+                    """:type x: Foo"""
+                    return x
+                '''),
+        }
+        for name, content in sources.items():
+            with open(os.path.join(package, name), "w") as f:
+                f.write(content)
+        index_path = os.path.join(directory, "index.json")
+        index = SymbolIndex()
+        index.update(os.path.join(package, name) for name in sources)
+        index.save(index_path)
+
+        result = FileProcessor(
+            "sphinx", "annotations", symbols=index_path,
+            imports=ImportMode.TYPE_CHECKING)(os.path.join(package, "node.py"))
+
+        self.assertIsNone(result.error)
+        self.assertIn("    parent: Optional[Node]\n", result.output)
+        self.assertIn("def link(self, other: Node) -> Node:", result.output)
+        self.assertIn("    from pkg.foo import Foo\n", result.output)
+        namespace = {"__name__": "node"}
+        exec(compile(result.output, "node.py", "exec"), namespace)
+        node = namespace["Node"]()
+        self.assertIs(node, node.link(node))
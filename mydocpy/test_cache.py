@@ -0,0 +1,92 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import shutil
+import tempfile
+import time
+
+from testtools import TestCase
+
+from mydocpy.cache import ReplacementCache
+from mydocpy.replacements import SourceReplacement
+from mydocpy.source import SourceLocation, SourceRange
+
+
+class ReplacementCacheTests(TestCase):
+
+    def setUp(self):
+        super(ReplacementCacheTests, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_Roundtrip(self):
+        sut = ReplacementCache(self.directory)
+        source_replacements = [SourceReplacement(
+            SourceRange.from_location(SourceLocation(1, 0)),
+            "# type: () -> int\n"
+        )]
+
+        key = sut.key(b"def f(): pass", "sphinx", "comment")
+        self.assertIsNone(sut.get(key))
+        sut.put(key, source_replacements)
+
+        self.assertEqual(source_replacements, sut.get(key))
+
+    def test_NoChanges(self):
+        sut = ReplacementCache(self.directory)
+
+        key = sut.key(b"", "sphinx", "comment")
+        sut.put(key, [])
+
+        self.assertEqual([], sut.get(key))
+
+    def test_BrokenEntryIsAMiss(self):
+        sut = ReplacementCache(self.directory)
+        key = sut.key(b"def f(): pass", "sphinx", "comment")
+        sut.put(key, [SourceReplacement(
+            SourceRange.from_location(SourceLocation(1, 0)), "# x\n")])
+        path = sut._path(key)
+        with open(path, "rb") as f:
+            data = f.read()
+
+        for broken in (data[:len(data) // 2], b"garbage"):
+            with open(path, "wb") as f:
+                f.write(broken)
+
+            self.assertIsNone(sut.get(key))
+            self.assertFalse(os.path.exists(path))
+
+    def test_KeyDependsOnFormats(self):
+        self.assertNotEqual(
+            ReplacementCache.key(b"x = 1", "sphinx", "comment"),
+            ReplacementCache.key(b"x = 1", "epydoc", "comment"))
+
+    def test_PruneRemovesLeastRecentlyUsed(self):
+        sut = ReplacementCache(self.directory, max_size=2 * 512)
+        keys = [sut.key(str(i).encode(), "sphinx", "comment")
+                for i in range(3)]
+        for i, key in enumerate(keys):
+            sut.put(key, [])
+            mtime = time.time() - 100 + i
+            os.utime(sut._path(key), (mtime, mtime))
+
+        self.assertEqual(1, sut.prune())
+
+        self.assertIsNone(sut.get(keys[0]))
+        self.assertEqual([], sut.get(keys[1]))
+        self.assertEqual([], sut.get(keys[2]))
@@ -0,0 +1,76 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import textwrap
+
+from testtools import TestCase
+
+from mydocpy.pipeline import FileProcessor, ImportMode, load_formats
+
+SOURCE = textwrap.dedent('''\
+    class Service(object):
+        async def get(self, a, /, b, *, c):
+            """
+            :type a: int
+            :type c: bool
+            :rtype: str
+            """
+
+        def put(self, key, *args, strict=False, **kw):
+            """
+            :type key: str
+            :type args: int
+            :type strict: bool
+            """
+    ''')
+
+EXPECTED = textwrap.dedent('''\
+    class Service(object):
+        async def get(self, a, /, b, *, c):
+            # type: (int, Any, bool) -> str
+            """
+            :type a: int
+            :type c: bool
+            :rtype: str
+            """
+
+        def put(self, key, *args, strict=False, **kw):
+            # type: (str, *int, bool, **Any) -> None
+            """
+            :type key: str
+            :type args: int
+            :type strict: bool
+            """
+    ''')
+
+
+class CommentStyleTests(TestCase):
+
+    def setUp(self):
+        super(CommentStyleTests, self).setUp()
+        load_formats()
+
+    def test_KeywordOnlyArgs(self):
+        for engine in ("ast", "tokenize"):
+            sut = FileProcessor(
+                "sphinx", "comment", engine=engine,
+                imports=ImportMode.NONE)
+
+            output = sut.rewrite(
+                SOURCE, sut.get_source_replacements(SOURCE))
+
+            self.assertEqual(EXPECTED, output)
@@ -0,0 +1,81 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import shutil
+import tempfile
+
+from testtools import TestCase
+
+from mydocpy.discovery import iter_source_files
+
+
+class IterSourceFilesTests(TestCase):
+
+    def setUp(self):
+        super(IterSourceFilesTests, self).setUp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        os.mkdir(os.path.join(self.root, ".git"))
+
+    def create(self, *paths):
+        for path in paths:
+            path = os.path.join(self.root, path)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, "w") as f:
+                f.write("x = 1\n")
+
+    def found(self, **kwargs):
+        return [
+            os.path.relpath(path, self.root).replace(os.sep, "/")
+            for path in iter_source_files([self.root], **kwargs)
+        ]
+
+    def test_Recursive(self):
+        self.create("a.py", "b.txt", "pkg/c.py", "pkg/sub/d.py")
+
+        self.assertEqual(["a.py", "pkg/c.py", "pkg/sub/d.py"], self.found())
+
+    def test_IncludeExclude(self):
+        self.create("a.py", "a.pyi", "gen/b.py", "c_pb2.py")
+
+        self.assertEqual(
+            ["a.pyi"],
+            self.found(include=["*.pyi"]))
+        self.assertEqual(
+            ["a.py"],
+            self.found(exclude=["gen", "*_pb2.py"]))
+
+    def test_GitIgnore(self):
+        self.create(
+            ".gitignore", "a.py", "build/b.py", "pkg/c.py", "pkg/d.py",
+            "pkg/.gitignore")
+        with open(os.path.join(self.root, ".gitignore"), "w") as f:
+            f.write("# comment\nbuild/\n/d.py\n")
+        with open(os.path.join(self.root, "pkg", ".gitignore"), "w") as f:
+            f.write("*.py\n!c.py\n")
+
+        self.assertEqual(["a.py", "pkg/c.py"], self.found())
+        self.assertEqual(
+            ["a.py", "build/b.py", "pkg/c.py", "pkg/d.py"],
+            self.found(gitignore=False))
+
+    def test_FilesArePassedThrough(self):
+        self.assertEqual(
+            ["does-not-exist.txt"],
+            list(iter_source_files(["does-not-exist.txt"])))
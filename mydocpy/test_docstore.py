@@ -0,0 +1,131 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+from testtools import TestCase
+
+from mydocpy import docformats, tokenparse
+from mydocpy.docstore import DocStringStore
+from mydocpy.parse import parse
+from mydocpy.test_tokenparse import EDGE_CASES
+
+SOURCE = '''\
+"""
+:var x: module variable
+:type x: int
+"""
+
+
+class A(object):
+    """
+    :ivar value: value
+    :type value: List[int]
+    """
+
+    def method(self, a, *args, **kwargs):
+        """
+        :param a: first
+        :type a: int
+        :rtype: str
+        """
+'''
+
+FIELDS = '''\
+class B(A, metaclass=Meta):
+    """class"""
+
+    @property
+    @functools.wraps(f)
+    @decorators[0]
+    @value.setter
+    async def method(self, a, /, b: int = 1, *args, c, d=None,
+                     **kwargs) -> None:
+        """method"""
+
+    def other(self):
+        """method"""
+'''
+
+
+def _slots(docstring):
+    return {
+        slot: getattr(docstring, slot)
+        for kind in type(docstring).__mro__
+        for slot in getattr(kind, "__slots__", ())}
+
+
+class DocStringStoreTests(TestCase):
+
+    def setUp(self):
+        super(DocStringStoreTests, self).setUp()
+        docformats.load_formats()
+
+    def test_RoundTrip(self):
+        docstrings = parse(SOURCE)
+        docformat = docformats.get_format("sphinx")
+        for docstring in docstrings:
+            docformat(docstring)
+        sut = DocStringStore()
+
+        sut.add_file("a.py", docstrings)
+        sut.add_file("b.py", parse(EDGE_CASES))
+
+        self.assertEqual(len(docstrings) + len(parse(EDGE_CASES)), len(sut))
+        restored = list(sut.file("a.py"))
+        self.assertEqual(docstrings, restored)
+        self.assertEqual(
+            [d.doc_end for d in docstrings], [d.doc_end for d in restored])
+        self.assertEqual(
+            [(getattr(d, "vaarg", None), getattr(d, "kwarg", None))
+             for d in parse(EDGE_CASES)],
+            [(getattr(d, "vaarg", None), getattr(d, "kwarg", None))
+             for d in sut.file("b.py")])
+        self.assertIsNone(sut[-1].type_info)
+
+    def test_AllSlots(self):
+        for parse_source in (parse, tokenparse.parse):
+            docstrings = parse_source(SOURCE + FIELDS + EDGE_CASES)
+            docformat = docformats.get_format("sphinx")
+            for docstring in docstrings:
+                docformat(docstring)
+            sut = DocStringStore()
+
+            sut.extend(docstrings)
+
+            self.assertEqual(
+                [_slots(d) for d in docstrings], [_slots(d) for d in sut])
+
+    def test_DocSpan(self):
+        docstrings = tokenparse.parse(EDGE_CASES)
+        sut = DocStringStore()
+
+        sut.extend(docstrings)
+
+        self.assertEqual(
+            [d.doc_span for d in docstrings], [d.doc_span for d in sut])
+
+    def test_StringsAreShared(self):
+        docstrings = parse(SOURCE * 2)
+        docformat = docformats.get_format("sphinx")
+        for docstring in docstrings:
+            docformat(docstring)
+        sut = DocStringStore()
+
+        sut.extend(docstrings)
+
+        self.assertEqual(len(set(sut.strings)), len(sut.strings))
+        self.assertIn("List[int]", sut.strings)
@@ -0,0 +1,183 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import io
+
+from testtools import TestCase
+
+from mydocpy import replacements
+from mydocpy.imports import ImportPlanner, format_from
+from mydocpy.types import ImportedType
+
+SOURCE = u'''\
+#!/usr/bin/env python
+"""
+Module doc string
+"""
+import os
+from typing import Dict as D, List
+
+from pkg.models import (
+    Model,
+)
+
+if TYPE_CHECKING:
+    from pkg.services import Service
+
+Bound = D[str, int]
+
+
+class Local(object):
+    pass
+
+from late import Late
+'''
+
+
+def _rewrite(content, source_replacements):
+    output = io.StringIO()
+    replacements.apply(io.StringIO(content), output, source_replacements)
+    return output.getvalue()
+
+
+class ImportPlannerTests(TestCase):
+
+    def test_MergeIntoExistingImports(self):
+        sut = ImportPlanner(SOURCE)
+
+        output = _rewrite(SOURCE, sut.plan([
+            ImportedType("typing", "Any"),
+            ImportedType("typing", "List"),
+            ImportedType("pkg.models", "Other"),
+            ImportedType("collections", "OrderedDict"),
+        ]))
+
+        self.assertIn(
+            "import os\n"
+            "from typing import Any, Dict as D, List\n"
+            "\n"
+            "from pkg.models import Model, Other\n"
+            "from collections import OrderedDict\n"
+            "\n", output)
+
+    def test_BoundNamesAreNotImported(self):
+        sut = ImportPlanner(SOURCE)
+
+        self.assertEqual([], sut.plan([
+            ImportedType("typing", "List"),
+            ImportedType("pkg", "Local"),
+            ImportedType("pkg", "Bound"),
+            ImportedType("pkg.services", "Service"),
+            ImportedType("os", "os"),
+        ]))
+
+    def test_TypeCheckingBlock(self):
+        sut = ImportPlanner(SOURCE, use_if=True)
+
+        output = _rewrite(SOURCE, sut.plan([
+            ImportedType("typing", "Any"),
+            ImportedType("pkg.services", "Manager"),
+            ImportedType("pkg.views", "View"),
+        ]))
+
+        self.assertIn(
+            "from typing import Any, Dict as D, List\n", output)
+        self.assertIn(
+            "if TYPE_CHECKING:\n"
+            "    from pkg.services import Manager, Service\n"
+            "    from pkg.views import View\n"
+            "\n"
+            "Bound", output)
+
+    def test_NewTypeCheckingBlock(self):
+        content = u"# comment\nclass A(object):\n    pass\n"
+        sut = ImportPlanner(content, use_if=True)
+
+        output = _rewrite(content, sut.plan([
+            ImportedType("typing", "Any"),
+            ImportedType("pkg", "B"),
+        ]))
+
+        self.assertEqual(
+            u"# comment\n"
+            u"from typing import Any, TYPE_CHECKING\n"
+            u"\n"
+            u"if TYPE_CHECKING:\n"
+            u"    from pkg import B\n"
+            u"\n"
+            u"class A(object):\n"
+            u"    pass\n", output)
+
+    def test_FutureImports(self):
+        annotations = ImportedType("__future__", "annotations")
+        imports = [annotations, ImportedType("typing", "Any")]
+        for content, expected in (
+                # after the doc string, before other imports
+                (SOURCE, SOURCE.replace(
+                    '"""\nimport os\nfrom typing import Dict as D, List\n',
+                    '"""\nfrom __future__ import annotations\nimport os\n'
+                    'from typing import Any, Dict as D, List\n')),
+                # in front of a from import
+                (u"from typing import List\n", u"from __future__ import "
+                 u"annotations\nfrom typing import Any, List\n"),
+                (u'"""doc"""\nfrom x import y\nfrom typing import List\n',
+                 u'"""doc"""\nfrom __future__ import annotations\n'
+                 u'from x import y\nfrom typing import Any, List\n'),
+                # merged into the existing __future__ import
+                (u"from __future__ import division\n",
+                 u"from __future__ import annotations, division\n"
+                 u"from typing import Any\n"),
+                (u"from __future__ import annotations\n",
+                 u"from __future__ import annotations\n"
+                 u"from typing import Any\n"),
+        ):
+            for use_if in (False, True):
+                sut = ImportPlanner(content, use_if=use_if)
+
+                self.assertEqual(
+                    expected, _rewrite(content, sut.plan(imports)))
+                self.assertEqual(
+                    expected,
+                    sut.finish(_rewrite(content, sut.markers()), imports))
+        self.assertEqual(
+            [], ImportPlanner(u"").statements_for([annotations]))
+
+    def test_MarkersAreReplacedByPlan(self):
+        imports = [
+            ImportedType("typing", "Any"),
+            ImportedType("pkg.models", "Other"),
+        ]
+        sut = ImportPlanner(SOURCE, use_if=True)
+
+        marked = _rewrite(SOURCE, sut.markers())
+
+        self.assertEqual(
+            _rewrite(SOURCE, sut.plan(imports)), sut.finish(marked, imports))
+        self.assertEqual(SOURCE, sut.finish(marked, []))
+
+    def test_FormatFrom(self):
+        self.assertEqual(
+            "from typing import Any, List as L",
+            format_from("typing", ["List as L", "Any"]))
+        self.assertEqual(
+            "    from typing import (\n"
+            "        Callable,\n" + "".join(
+                "        Name{},\n".format(i) for i in range(10)) +
+            "    )",
+            format_from(
+                "typing", ["Name{}".format(i) for i in range(10)] +
+                ["Callable"], "    "))
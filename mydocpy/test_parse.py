@@ -0,0 +1,138 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import textwrap
+
+from testtools import TestCase
+
+from mydocpy.docstrings import ClassDocString, FuncType, FunctionDocString, \
+    ModuleDocString
+from mydocpy.parse import parse
+
+SOURCE = textwrap.dedent('''\
+    """module"""
+
+
+    class A(object):
+        """class A"""
+
+        if True:
+            @staticmethod
+            def static(a):
+                """static"""
+
+        @property.setter
+        def prop(self, value):
+            """prop"""
+
+        async def coroutine(self, *args, **kwargs):
+            """coroutine"""
+
+            def inner(x):
+                """inner"""
+
+
+    try:
+        import foo
+    except ImportError:
+        def fallback():
+            """fallback"""
+    else:
+        x = [lambda: "no doc string" for _ in range(3)]
+    ''')
+
+
+class ParseTests(TestCase):
+
+    def test_Types(self):
+        docstrings = parse(SOURCE)
+
+        self.assertEqual(
+            [ModuleDocString, ClassDocString, FunctionDocString,
+             FunctionDocString, FunctionDocString, FunctionDocString,
+             FunctionDocString],
+            [type(docstring) for docstring in docstrings])
+        self.assertEqual(
+            ["module", "class A", "static", "prop", "coroutine", "inner",
+             "fallback"],
+            [docstring.content for docstring in docstrings])
+
+    def test_Functions(self):
+        functions = [
+            (docstring.args, docstring.vaarg, docstring.kwarg,
+             docstring.func_type)
+            for docstring in parse(SOURCE)
+            if isinstance(docstring, FunctionDocString)
+        ]
+
+        self.assertEqual([
+            (["a"], None, None, FuncType.STATIC),
+            (["self", "value"], None, None, FuncType.INSTANCE),
+            (["self"], "args", "kwargs", FuncType.INSTANCE),
+            (["x"], None, None, FuncType.FREE),
+            ([], None, None, FuncType.FREE),
+        ], functions)
+
+    def test_Names(self):
+        self.assertEqual(
+            [None, "A", "A.static", "A.prop", "A.coroutine",
+             "A.coroutine.<locals>.inner", "fallback"],
+            [docstring.name for docstring in parse(SOURCE)])
+
+    def test_Signature(self):
+        docstring, = parse(
+            "@property\n"
+            "@value.setter\n"
+            "@decorate()\n"
+            "async def f(a, b=1, /, c=2, *, d, e=3):\n"
+            "    \"\"\"doc\"\"\"\n")
+
+        self.assertEqual(["a", "b", "c"], docstring.args)
+        self.assertEqual(2, docstring.posonly)
+        self.assertEqual(["d", "e"], docstring.kwonlyargs)
+        self.assertEqual(frozenset(["b", "c", "e"]), docstring.defaults)
+        self.assertTrue(docstring.is_async)
+        self.assertEqual(
+            ["property", "value.setter", None], docstring.decorators)
+
+    def test_SourceOrder(self):
+        source = textwrap.dedent('''\
+            try:
+                def a(): """a"""
+            except ImportError:
+                def b(): """b"""
+            else:
+                def c(): """c"""
+            finally:
+                def d(): """d"""
+            match x:
+                case 1:
+                    def e(): """e"""
+                case _:
+                    def f(): """f"""
+            ''')
+
+        self.assertEqual(
+            ["a", "b", "c", "d", "e", "f"],
+            [docstring.content for docstring in parse(source)])
+
+    def test_DeeplyNested(self):
+        source = "".join(
+            "    " * i + "if x:\n" for i in range(90)
+        ) + "    " * 90 + 'def f():\n' + "    " * 91 + '"""doc"""\n'
+
+        self.assertEqual(["doc"], [d.content for d in parse(source)])
@@ -0,0 +1,470 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import ast
+import difflib
+import io
+import os
+import shutil
+import tempfile
+
+from testtools import TestCase
+
+from mydocpy import formats, replacements
+from mydocpy.pipeline import FileProcessor, ImportMode, OutputMode, \
+    _CountingIterator, load_formats
+from mydocpy.replacements import ReplacementConflict, SourceReplacement, \
+    UnsortedReplacements
+from mydocpy.source import SourceDistance, SourceLocation, SourceRange
+from mydocpy.utils.pool import imap
+
+TESTFILES = os.path.join(os.path.dirname(__file__), "tests", "testfiles")
+
+
+class FileProcessorTests(TestCase):
+
+    def setUp(self):
+        super(FileProcessorTests, self).setUp()
+        load_formats()
+
+    def chdir(self, directory):
+        # diffs need the files below the working directory
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(directory)
+
+    def test_ErrorIsReported(self):
+        sut = FileProcessor("sphinx", "comment")
+
+        result = sut(os.path.join(TESTFILES, "does-not-exist.py"))
+
+        self.assertIsNone(result.output)
+        self.assertIn("does-not-exist.py", result.error)
+
+    def test_JobsKeepInputOrder(self):
+        sut = FileProcessor("sphinx", "comment")
+        srcfiles = [
+            os.path.join(TESTFILES, "class.py"),
+            os.path.join(TESTFILES, "does-not-exist.py"),
+            os.path.join(TESTFILES, "class.py"),
+        ]
+
+        serial = list(imap(sut, srcfiles, 1, load_formats))
+        parallel = list(imap(sut, srcfiles, 2, load_formats))
+
+        self.assertEqual(srcfiles, [result.path for result in parallel])
+        self.assertEqual(
+            [result.output for result in serial],
+            [result.output for result in parallel])
+        self.assertIsNotNone(parallel[1].error)
+
+    def test_InPlace(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        changed = os.path.join(directory, "class.py")
+        unchanged = os.path.join(directory, "plain.py")
+        shutil.copy(os.path.join(TESTFILES, "class.py"), changed)
+        with open(unchanged, "w") as f:
+            f.write("x = 1\n")
+        expected = FileProcessor("sphinx", "comment")(changed).output
+        mtime = os.stat(unchanged).st_mtime - 100
+        os.utime(unchanged, (mtime, mtime))
+
+        sut = FileProcessor("sphinx", "comment", mode=OutputMode.IN_PLACE)
+        results = [sut(changed), sut(unchanged)]
+
+        self.assertEqual([True, False], [r.changed for r in results])
+        self.assertEqual([None, None], [r.output for r in results])
+        with open(changed) as f:
+            self.assertEqual(expected, f.read())
+        self.assertEqual(mtime, os.stat(unchanged).st_mtime)
+        self.assertEqual(
+            ["class.py", "plain.py"], sorted(os.listdir(directory)))
+
+    def test_Diff(self):
+        srcfile = os.path.join(TESTFILES, "class.py")
+        with open(srcfile) as f:
+            content = f.read()
+        rewritten = FileProcessor("sphinx", "comment")(srcfile).output
+        self.chdir(os.path.dirname(TESTFILES))
+
+        sut = FileProcessor("sphinx", "comment", mode=OutputMode.DIFF)
+        result = sut(srcfile)
+
+        self.assertTrue(result.changed)
+        self.assertTrue(result.output.startswith(
+            "--- a/testfiles/class.py\n+++ b/testfiles/class.py\n@@ "))
+        self.assertEqual(rewritten, _patch(content, result.output))
+
+    def test_DiffParsesOnce(self):
+        srcfile = os.path.join(TESTFILES, "class.py")
+        self.chdir(TESTFILES)
+        parsed = []
+        original_parse = ast.parse
+
+        def parse(*args, **kwargs):
+            parsed.append(args)
+            return original_parse(*args, **kwargs)
+
+        self.patch(ast, "parse", parse)
+        FileProcessor("sphinx", "comment")(srcfile)
+        rewrite_parses = len(parsed)
+        del parsed[:]
+        FileProcessor("sphinx", "comment", mode=OutputMode.DIFF)(srcfile)
+
+        self.assertEqual(rewrite_parses, len(parsed))
+
+    def test_Profile(self):
+        sut = FileProcessor("sphinx", "comment", profile=True)
+
+        result = sut(os.path.join(TESTFILES, "class.py"))
+
+        self.assertEqual(
+            ["read", "prescan", "parse", "docformat", "style", "imports",
+             "apply"],
+            list(result.stats.stages))
+        self.assertEqual(
+            {"docstrings": 3, "type_info": 4, "replacements": 4},
+            dict(result.stats.counts))
+
+    def test_FilesWithoutTypeInformationAreNotParsed(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        srcfile = os.path.join(directory, "broken.py")
+        content = 'def f(:\n    """\n    :param x: no type\n    """\n'
+        with open(srcfile, "w") as f:
+            f.write(content)
+        sut = FileProcessor("sphinx", "comment", profile=True)
+
+        result = sut(srcfile)
+
+        self.assertIsNone(result.error)
+        self.assertEqual(content, result.output)
+        self.assertFalse(result.changed)
+        self.assertNotIn("parse", result.stats.stages)
+
+    def test_StreamingMatchesStages(self):
+        for name in sorted(os.listdir(TESTFILES)):
+            if not name.endswith(".py"):
+                continue
+            srcfile = os.path.join(TESTFILES, name)
+            for engine in ("ast", "tokenize"):
+                streamed = FileProcessor(
+                    "sphinx", "comment", engine=engine)(srcfile)
+                staged = FileProcessor(
+                    "sphinx", "comment", profile=True, engine=engine)(srcfile)
+
+                self.assertEqual(staged.output, streamed.output)
+                self.assertEqual(staged.changed, streamed.changed)
+
+    def test_UnsortedReplacementsFallBack(self):
+        style = formats.get_format("comment")
+
+        def first_line_style(doc_string, source_replacements):
+            style(doc_string, source_replacements)
+            if doc_string.type_info:
+                source_replacements.append(SourceReplacement(
+                    SourceRange.from_location(SourceLocation(0, 0)), "#\n"))
+
+        self.patch(formats, "get_format", lambda name: first_line_style)
+        srcfile = os.path.join(TESTFILES, "class.py")
+        expected = FileProcessor("sphinx", "comment", profile=True)(srcfile)
+
+        result = FileProcessor("sphinx", "comment")(srcfile)
+
+        self.assertIsNone(result.error)
+        self.assertEqual(expected.output, result.output)
+        self.assertTrue(result.output.startswith("#\n#\n#\n"))
+
+        # the applied replacements of the fallback are counted
+        with open(srcfile) as f:
+            content = f.read()
+        sut = FileProcessor("sphinx", "comment")
+        counter = _CountingIterator(
+            sut.iter_source_replacements(content))
+        sut.rewrite_stream(content, counter, counter=counter)
+        self.assertEqual(
+            len(sut.get_source_replacements(content)), counter.count)
+
+    def test_SymbolIndex(self):
+        from mydocpy.symbols import SymbolIndex
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        index_path = os.path.join(directory, "index.json")
+        srcfile = os.path.join(TESTFILES, "class.py")
+        index = SymbolIndex()
+        index.update([srcfile])
+        index.save(index_path)
+
+        sut = FileProcessor("sphinx", "comment", symbols=index_path)
+
+        interpreter = sut.get_style().interpreter
+        self.assertEqual(
+            "ServiceLocator",
+            interpreter.resolver("ServiceLocator").name)
+        self.assertIs(sut.get_style(), sut.get_style())
+        self.assertIsNot(formats.get_format("comment"), sut.get_style())
+
+    def test_Imports(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        srcfile = os.path.join(directory, "module.py")
+        with open(srcfile, "w") as f:
+            f.write(
+                'from typing import Dict\n'
+                '\n'
+                '\n'
+                'def f(a, b):\n'
+                '    """\n'
+                '    :type a: list of int\n'
+                '    :rtype: Dict[str, int]\n'
+                '    """\n')
+
+        outputs = {}
+        for mode in ImportMode:
+            for profile in (False, True):
+                result = FileProcessor(
+                    "sphinx", "comment", profile=profile,
+                    imports=mode)(srcfile)
+                self.assertIsNone(result.error)
+                outputs.setdefault(mode, set()).add(result.output)
+
+        self.assertEqual(
+            [1, 1, 1], [len(outputs[mode]) for mode in ImportMode])
+        self.assertTrue(outputs[ImportMode.NONE].pop().startswith(
+            "from typing import Dict\n\n\ndef f(a, b):\n"
+            "    # type: (List[int], Any) -> Dict[str, int]\n"))
+        self.assertTrue(outputs[ImportMode.TOP_LEVEL].pop().startswith(
+            "from typing import Any, Dict, List\n\n\ndef"))
+        self.assertTrue(outputs[ImportMode.TYPE_CHECKING].pop().startswith(
+            "from typing import Any, Dict, List\n\n\ndef"))
+
+    def test_CacheKeyDependsOnImports(self):
+        keys = set(
+            FileProcessor("sphinx", "comment", imports=mode).cache_key(b"")
+            for mode in ImportMode)
+
+        self.assertEqual(3, len(keys))
+
+
+class ApplySortedTests(TestCase):
+
+    def test_UnsortedRaises(self):
+        source_replacements = [
+            SourceReplacement(
+                SourceRange.from_location(SourceLocation(1, 0)), "b"),
+            SourceReplacement(
+                SourceRange.from_location(SourceLocation(0, 0)), "a"),
+        ]
+
+        self.assertRaises(
+            UnsortedReplacements, replacements.apply_sorted,
+            io.StringIO(u"x\ny\n"), io.StringIO(), source_replacements)
+
+        output = io.StringIO()
+        replacements.apply(
+            io.StringIO(u"x\ny\n"), output, source_replacements)
+        self.assertEqual(u"ax\nby\n", output.getvalue())
+
+
+def _replacement(line, col, lines, cols, text):
+    return SourceReplacement(
+        SourceRange(SourceLocation(line, col), SourceDistance(lines, cols)),
+        text)
+
+
+def _patch(content, diff):
+    """
+    apply the unified ``diff`` (of a single file) to ``content``
+    """
+    old_lines = content.splitlines(True)
+    new_lines = []
+    pos = 0
+    diff_lines = diff.splitlines(True)[2:]
+    for i, line in enumerate(diff_lines):
+        if line.startswith("@@"):
+            old_range = line.split()[1][1:].split(",")
+            start = int(old_range[0])
+            if len(old_range) == 1 or old_range[1] != "0":
+                start -= 1
+            new_lines.extend(old_lines[pos:start])
+            pos = start
+            continue
+        if line.startswith("\\"):
+            continue
+        text = line[1:]
+        if i + 1 < len(diff_lines) and diff_lines[i + 1].startswith("\\"):
+            text = text[:-1]
+        if line[0] in " -":
+            assert old_lines[pos] == text
+            pos += 1
+        if line[0] in " +":
+            new_lines.append(text)
+    new_lines.extend(old_lines[pos:])
+    return "".join(new_lines)
+
+
+class SpliceTests(TestCase):
+
+    def test_AnyOrder(self):
+        content = u"def f(a, b):\n    pass\n"
+        source_replacements = [
+            _replacement(0, 10, 0, 0, ": str"),
+            _replacement(0, 7, 0, 0, ": int"),
+            _replacement(0, 11, 0, 0, " -> None"),
+            _replacement(1, 4, 0, 4, "return"),
+            _replacement(2, 0, 0, 0, "# end\n"),
+        ]
+
+        self.assertEqual(
+            u"def f(a: int, b: str) -> None:\n    return\n# end\n",
+            replacements.splice(content, source_replacements))
+
+    def test_SameLocationKeepsOrder(self):
+        source_replacements = [
+            _replacement(0, 1, 0, 0, "a"),
+            _replacement(0, 1, 0, 0, "b"),
+            _replacement(0, 1, 0, 1, "c"),
+        ]
+
+        self.assertEqual(
+            u"xabcz", replacements.splice(u"xyz", source_replacements))
+
+    def test_MultiLineRange(self):
+        content = u"from x import (\n    a,\n)\nimport y\n"
+
+        self.assertEqual(
+            u"from x import a, b\nimport y\n",
+            replacements.splice(
+                content, [_replacement(0, 0, 2, 1, "from x import a, b")]))
+
+    def test_ConflictRaises(self):
+        for source_replacements in (
+                [_replacement(0, 0, 0, 2, "a"), _replacement(0, 1, 0, 0, "b")],
+                [_replacement(0, 1, 0, 0, "b"), _replacement(0, 0, 1, 0, "a")],
+        ):
+            self.assertRaises(
+                ReplacementConflict, replacements.splice, u"xyz\n",
+                source_replacements)
+
+    def test_SameAsStreaming(self):
+        srcfile = os.path.join(TESTFILES, "class.py")
+        with open(srcfile) as f:
+            content = f.read()
+        load_formats()
+        sut = FileProcessor("sphinx", "comment")
+        source_replacements = sut.get_source_replacements(content)
+
+        output = io.StringIO()
+        replacements.apply_sorted(
+            io.StringIO(content), output, source_replacements)
+
+        self.assertEqual(
+            output.getvalue(),
+            replacements.splice(content, source_replacements))
+
+
+class UnifiedDiffTests(TestCase):
+
+    def assertDiffLikeDifflib(self, content, source_replacements):
+        expected = "".join(difflib.unified_diff(
+            content.splitlines(True),
+            replacements.splice(content, source_replacements).splitlines(
+                True),
+            "a/f.py", "b/f.py"))
+
+        self.assertEqual(
+            expected,
+            replacements.unified_diff(content, source_replacements, "f.py"))
+
+    def test_NoChanges(self):
+        self.assertEqual(
+            "", replacements.unified_diff(u"x = 1\n", [], "f.py"))
+
+    def test_NoOpEditsAreDropped(self):
+        content = u"x = 1\ny = 2\n"
+
+        self.assertEqual("", replacements.unified_diff(
+            content,
+            [_replacement(0, 0, 0, 0, ""), _replacement(1, 0, 0, 1, "y"),
+             _replacement(1, 2, 0, 0, "="), _replacement(1, 2, 0, 1, "")],
+            "f.py"))
+        self.assertDiffLikeDifflib(
+            content,
+            [_replacement(0, 0, 0, 0, ""), _replacement(1, 5, 0, 0, "  # z")])
+
+    def test_Hunks(self):
+        content = u"".join(u"x{} = 1\n".format(i) for i in range(20))
+
+        for source_replacements in (
+                # inserted lines
+                [_replacement(5, 0, 0, 0, "# a\n# b\n")],
+                # changed lines, the first hunk without leading context
+                [_replacement(1, 6, 0, 0, "  # c"),
+                 _replacement(4, 0, 0, 0, "# d\n")],
+                # changes closer than 2 * context lines share a hunk
+                [_replacement(3, 0, 1, 0, ""),
+                 _replacement(9, 2, 0, 1, "="),
+                 _replacement(19, 0, 1, 0, "y = 2\n")],
+                # changes of adjacent lines (like a multi-line signature)
+                [_replacement(6, 2, 0, 0, ": int"),
+                 _replacement(7, 2, 0, 0, ": str"),
+                 _replacement(8, 2, 0, 0, " -> None")],
+                # separate hunks
+                [_replacement(2, 0, 0, 0, "# e\n"),
+                 _replacement(12, 2, 0, 0, ": int")],
+                # appended lines
+                [_replacement(20, 0, 0, 0, "# f\n")],
+        ):
+            self.assertDiffLikeDifflib(content, source_replacements)
+
+    def test_Formats(self):
+        with open(os.path.join(TESTFILES, "class.py")) as f:
+            content = f.read()
+        load_formats()
+        for destformat in ("comment", "annotations"):
+            sut = FileProcessor("sphinx", destformat)
+            source_replacements = sut.get_source_replacements(content)
+
+            # difflib can choose other lines around the inserted blank
+            # lines: compare the patched content instead
+            self.assertEqual(
+                replacements.splice(content, source_replacements),
+                _patch(content, replacements.unified_diff(
+                    content, source_replacements, "f.py")))
+
+    def test_RelativePath(self):
+        content = u"x = 1\n"
+        source_replacements = [_replacement(0, 5, 0, 0, "  # y")]
+
+        for path in (os.path.abspath("f.py"), os.path.join(".", "f.py")):
+            self.assertTrue(replacements.unified_diff(
+                content, source_replacements, path).startswith(
+                    "--- a/f.py\n+++ b/f.py\n"))
+        self.assertRaises(
+            ValueError, replacements.unified_diff, content,
+            source_replacements, os.path.join(os.pardir, "f.py"))
+
+    def test_NoNewlineAtEnd(self):
+        self.assertEqual(
+            "--- a/f.py\n+++ b/f.py\n@@ -1,2 +1,2 @@\n"
+            " x = 1\n"
+            "-y = 2\n\\ No newline at end of file\n"
+            "+y = 2  # z\n\\ No newline at end of file\n",
+            replacements.unified_diff(
+                u"x = 1\ny = 2", [_replacement(1, 5, 0, 0, "  # z")],
+                "f.py"))
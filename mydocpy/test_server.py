@@ -0,0 +1,125 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import errno
+import os
+import shutil
+import socket
+import tempfile
+import threading
+
+from testtools import TestCase
+
+from mydocpy.pipeline import FileProcessor
+from mydocpy import server as server_module
+from mydocpy.server import Client, Server, Service
+
+TESTFILE = os.path.join(
+    os.path.dirname(__file__), "tests", "testfiles", "class.py")
+
+
+class ServiceTests(TestCase):
+
+    def test_Path(self):
+        sut = Service("sphinx", "comment")
+
+        response = sut.handle({"path": TESTFILE})
+
+        self.assertEqual(
+            FileProcessor("sphinx", "comment")(TESTFILE).output,
+            response["text"])
+
+    def test_SourceReplacements(self):
+        sut = Service()
+
+        response = sut.handle({
+            "src_format": "sphinx", "format": "comment",
+            "source": 'def f(a):\n    """\n    :type a: int\n    """\n',
+            "output": "replacements"
+        })
+
+        self.assertEqual([{
+            "start": [1, 0], "length": [0, 0],
+            "text": "    # type: (int) -> None\n"
+        }], response["replacements"])
+
+    def test_Error(self):
+        sut = Service("sphinx", "comment")
+
+        response = sut.handle({"source": "def f(:\n"})
+
+        self.assertIn("SyntaxError", response["error"])
+
+
+class ServerTests(TestCase):
+
+    def setUp(self):
+        super(ServerTests, self).setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.address = os.path.join(directory, "socket")
+
+    def test_Roundtrip(self):
+        address = self.address
+
+        server = Server(address, Service("sphinx", "comment"))
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        client = Client(address)
+        self.addCleanup(client.close)
+        responses = [client.request(path=TESTFILE) for _ in range(2)]
+
+        self.assertEqual(responses[0], responses[1])
+        self.assertIn("# type: (Any) -> None", responses[0]["text"])
+
+    def test_StaleSocketIsReplaced(self):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.address)
+        stale.close()
+
+        server = Server(self.address, Service())
+        server.server_close()
+
+    def test_RunningServerIsKept(self):
+        server = Server(self.address, Service())
+        self.addCleanup(server.server_close)
+
+        error = self.assertRaises(OSError, Server, self.address, Service())
+        self.assertEqual(errno.EADDRINUSE, error.errno)
+        self.assertTrue(os.path.exists(self.address))
+
+    def test_FailedBindKeepsSocket(self):
+        server = Server(self.address, Service())
+        self.addCleanup(server.server_close)
+        # another server started between the check and the bind
+        self.patch(server_module, "_remove_stale_socket", lambda address: None)
+
+        self.assertRaises(OSError, Server, self.address, Service())
+        self.assertTrue(os.path.exists(self.address))
+
+    def test_OtherFileIsKept(self):
+        with open(self.address, "w") as f:
+            f.write("data")
+
+        error = self.assertRaises(OSError, Server, self.address, Service())
+        self.assertEqual(errno.EEXIST, error.errno)
+        with open(self.address) as f:
+            self.assertEqual("data", f.read())
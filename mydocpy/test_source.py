@@ -16,6 +16,8 @@
 
 from testtools import TestCase
 
+from mydocpy.source import LineIndex, SourceDistance, SourceLocation, \
+    SourceRange
 from mydocpy.utils.text import get_line_no
 
 
@@ -41,7 +43,7 @@ class LineNoTests(TestCase):
 
         s = "\nsdghgfdhhfghabc              \n\n"
         self.assertEqual(
-            (1, 16), get_line_no(s, s.index("abc"))
+            (1, 12), get_line_no(s, s.index("abc"))
         )
         s = "\nabc"
         self.assertEqual(
@@ -59,3 +61,25 @@ class LineNoTests(TestCase):
         self.assertEqual(
             (2, 0), get_line_no(s, s.index("abc"))
         )
+
+
+class LineIndexTests(TestCase):
+
+    def test_MatchesFromTextPos(self):
+        text = "\nab\n\n  cd\nef"
+        sut = LineIndex(text)
+
+        self.assertEqual(5, len(sut))
+        for pos in range(len(text) + 1):
+            location = sut.location(pos)
+            self.assertEqual(
+                SourceLocation.from_text_pos(text, pos), location)
+            self.assertEqual(pos, sut.position(location))
+
+    def test_Range(self):
+        text = "a\nbc\nd"
+        sut = LineIndex(text)
+
+        self.assertEqual(
+            SourceRange(SourceLocation(1, 1), SourceDistance(1, 1)),
+            sut.range(3, 6))
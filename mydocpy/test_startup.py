@@ -0,0 +1,108 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import json
+import os
+import pkgutil
+import subprocess
+import sys
+from importlib import import_module
+
+from testtools import TestCase
+
+import mydocpy
+import mydocpy.docformats as docformats
+import mydocpy.formats as formats
+from mydocpy.utils.registry import Registry
+
+# generous, so that slow machines do not fail (typical: below 0.1s)
+IMPORT_TIME_BUDGET = 0.5
+
+_STARTUP_SCRIPT = """
+import json, sys, time
+start = time.time()
+sys.argv = ["mydocpy", "--help"]
+import mydocpy.__main__
+try:
+    mydocpy.__main__.main()
+except SystemExit:
+    pass
+sys.stderr.write(json.dumps({
+    "seconds": time.time() - start, "modules": list(sys.modules)
+}))
+"""
+
+_PACKAGES = [
+    (formats, "register_formats"),
+    (docformats, "register_doc_formats"),
+]
+
+
+class RegistryTests(TestCase):
+
+    def test_FormatIsImportedOnFirstUse(self):
+        sut = Registry("register_doc_formats", docformats.INDEX)
+
+        self.assertEqual([], sorted(sut.entries))
+        sut.get("sphinx")
+
+        self.assertEqual(["epydoc", "sphinx"], sorted(sut.entries))
+
+    def test_UnknownFormat(self):
+        sut = Registry("register_formats", formats.INDEX)
+
+        self.assertRaises(KeyError, sut.get, "unknown")
+
+    def test_ImportErrorIsRaisedAgain(self):
+        sut = Registry("register_formats", {"broken": "mydocpy.missing"})
+
+        for _ in range(2):
+            self.assertRaises(ImportError, sut.get, "broken")
+
+    def test_IndexIsComplete(self):
+        for package, hook in _PACKAGES:
+            modules = pkgutil.iter_modules(
+                [os.path.dirname(package.__file__)], package.__name__ + ".")
+            for _, name, ispkg in modules:
+                module = import_module(name)
+                if ispkg or not hasattr(module, hook):
+                    continue
+
+                registry = Registry()
+                getattr(module, hook)(registry)
+                for format_name in registry.entries:
+                    self.assertEqual(name, package.INDEX.get(format_name))
+
+
+class StartupTests(TestCase):
+
+    def test_ImportTimeBudget(self):
+        root = os.path.dirname(os.path.dirname(mydocpy.__file__))
+        env = dict(os.environ, PYTHONPATH=root)
+
+        process = subprocess.Popen(
+            [sys.executable, "-c", _STARTUP_SCRIPT],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+        _, stderr = process.communicate()
+        result = json.loads(stderr.decode("utf-8"))
+
+        self.assertLess(result["seconds"], IMPORT_TIME_BUDGET)
+        for package, hook in _PACKAGES:
+            for module in package.INDEX.values():
+                self.assertNotIn(module, result["modules"])
+        self.assertNotIn("importlib.metadata", result["modules"])
+        self.assertNotIn("multiprocessing", result["modules"])
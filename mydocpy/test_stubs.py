@@ -0,0 +1,155 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import shutil
+import tempfile
+import textwrap
+
+from testtools import TestCase
+
+from mydocpy import docformats, formats, parse, tokenparse
+from mydocpy.pipeline import FileProcessor, OutputMode, load_formats
+
+SOURCE = textwrap.dedent('''\
+    """
+    :var DEFAULT: default value
+    :type DEFAULT: int
+    """
+    from pkg.base import Base
+
+    DEFAULT = 1
+
+
+    class Service(Base):
+        """
+        :ivar name: name of the service
+        :type name: str
+        """
+
+        class Config:
+            def get(self, key, /, default=None, *, strict=False):
+                """
+                :type key: str
+                :type strict: bool
+                :rtype: list of str
+                """
+
+        @property
+        def size(self):
+            """:rtype: int"""
+
+        @size.setter
+        def size(self, value):
+            """:type value: int"""
+
+        @staticmethod
+        async def create(*args, **kwargs):
+            """
+            :type args: int
+            :rtype: Service
+            """
+
+
+    def helper(x, /):
+        """no types"""
+
+        def inner(y):
+            """:type y: int"""
+    ''')
+
+STUB = textwrap.dedent('''\
+    from pkg.base import Base
+    from typing import Any, List
+
+    DEFAULT: int
+
+    class Service(Base):
+        name: str
+        class Config:
+            def get(self, key: str, /, default=..., *, \
+strict: bool = ...) -> List[str]: ...
+            def __getattr__(self, name: str) -> Any: ...
+        @property
+        def size(self) -> int: ...
+        @size.setter
+        def size(self, value: int) -> None: ...
+        @staticmethod
+        async def create(*args: int, **kwargs) -> Service: ...
+        def __getattr__(self, name: str) -> Any: ...
+
+    def helper(x, /): ...
+    def __getattr__(name: str) -> Any: ...
+    ''')
+
+
+class StubStyleTests(TestCase):
+
+    def setUp(self):
+        super(StubStyleTests, self).setUp()
+        load_formats()
+
+    def test_Stub(self):
+        docformat = docformats.get_format("sphinx")
+        for parser in (parse, tokenparse):
+            docstrings = parser.parse(SOURCE)
+            for docstring in docstrings:
+                docformat(docstring)
+
+            stub = formats.get_format("stub").write_stub(docstrings, SOURCE)
+
+            self.assertEqual(STUB, stub)
+
+    def test_StubDir(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        package = os.path.join(directory, "src", "pkg")
+        os.makedirs(package)
+        for name, content in (("__init__.py", ""), ("service.py", SOURCE)):
+            with open(os.path.join(package, name), "w") as f:
+                f.write(content)
+        stub_dir = os.path.join(directory, "stubs")
+        srcfile = os.path.join(package, "service.py")
+
+        sut = FileProcessor("sphinx", "stub", stub_dir=stub_dir)
+        results = [sut(srcfile), sut(srcfile)]
+
+        self.assertEqual([None, None], [r.error for r in results])
+        self.assertEqual([True, False], [r.changed for r in results])
+        with open(os.path.join(stub_dir, "pkg", "service.pyi")) as f:
+            self.assertEqual(STUB, f.read())
+        with open(srcfile) as f:
+            self.assertEqual(SOURCE, f.read())
+        self.assertEqual(
+            os.path.join(stub_dir, "pkg", "__init__.pyi"),
+            sut.stub_path(os.path.join(package, "__init__.py")))
+
+    def test_NextToSource(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        srcfile = os.path.join(directory, "service.py")
+        with open(srcfile, "w") as f:
+            f.write(SOURCE)
+
+        printed = FileProcessor("sphinx", "stub", profile=True)(srcfile)
+        written = FileProcessor(
+            "sphinx", "stub", mode=OutputMode.IN_PLACE)(srcfile)
+
+        self.assertEqual(STUB, printed.output)
+        self.assertIsNone(written.output)
+        with open(os.path.join(directory, "service.pyi")) as f:
+            self.assertEqual(STUB, f.read())
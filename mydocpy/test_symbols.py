@@ -0,0 +1,168 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import shutil
+import tempfile
+
+from testtools import TestCase
+
+from mydocpy.symbols import SymbolIndex, module_name, scan
+from mydocpy.types import ImportedType, TypeInterpreter
+
+SOURCE = b'''\
+import logging
+from typing import Dict, List, NamedTuple, TypeAlias, TypeVar
+
+import foo
+
+
+class Service(object):
+    class Inner(object):
+        pass
+
+
+Services = Dict[str, Service]
+Alias = foo.Bar
+T = TypeVar("T")
+Point = NamedTuple("Point", [("x", int)])
+Number = int
+Vector: TypeAlias = List[float]
+count = 0
+DEFAULT = OTHER
+log = logging.getLogger
+first = foo.items[0]
+
+if foo:
+    class Conditional(object):
+        pass
+'''
+
+
+class SymbolIndexTests(TestCase):
+
+    def setUp(self):
+        super(SymbolIndexTests, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.package = os.path.join(self.directory, "pkg")
+        os.mkdir(self.package)
+        self.write("__init__.py", b"")
+        self.write("services.py", SOURCE)
+        self.write("other.py", b"class Other(object):\n    pass\n")
+
+    def write(self, name, content):
+        path = os.path.join(self.package, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def paths(self):
+        return [os.path.join(self.package, name)
+                for name in sorted(os.listdir(self.package))]
+
+    def test_Scan(self):
+        self.assertEqual(
+            ["Service", "Services", "Alias", "T", "Point", "Number",
+             "Vector", "Conditional"],
+            scan(SOURCE))
+
+    def test_ModuleName(self):
+        self.assertEqual(
+            "pkg.services",
+            module_name(os.path.join(self.package, "services.py")))
+        self.assertEqual(
+            "pkg", module_name(os.path.join(self.package, "__init__.py")))
+
+    def test_Resolve(self):
+        sut = SymbolIndex()
+        sut.update(self.paths())
+
+        self.assertEqual(
+            ImportedType("pkg.services", "Service"), sut.resolve("Service"))
+        self.assertEqual(
+            ImportedType("pkg.other", "Other"), sut.resolve("Other"))
+        self.assertIsNone(sut.resolve("Service", "pkg.services"))
+        self.assertIsNone(sut.resolve("Unknown"))
+
+        self.write("copy.py", b"class Other(object):\n    pass\n")
+        sut.update(self.paths())
+        self.assertIsNone(sut.resolve("Other"))  # ambiguous
+
+    def test_Incremental(self):
+        index_path = os.path.join(self.directory, "index.json")
+        sut = SymbolIndex()
+        self.assertEqual(3, sut.update(self.paths()))
+        sut.save(index_path)
+
+        sut = SymbolIndex.load(index_path)
+        self.assertEqual(0, sut.update(self.paths()))
+
+        # touched, but the same content
+        path = os.path.join(self.package, "other.py")
+        os.utime(path, (0, 0))
+        self.assertEqual(0, sut.update(self.paths()))
+
+        self.write("other.py", b"class Changed(object):\n    pass\n")
+        os.remove(os.path.join(self.package, "services.py"))
+        self.assertEqual(1, sut.update([path]))
+        self.assertEqual(
+            ImportedType("pkg.other", "Changed"), sut.resolve("Changed"))
+        self.assertIsNone(sut.resolve("Service"))
+
+    def test_ModifiedAndDigest(self):
+        index_path = os.path.join(self.directory, "index.json")
+        sut = SymbolIndex()
+        sut.update(self.paths())
+        self.assertTrue(sut.modified)
+        sut.save(index_path)
+        digest = sut.digest()
+
+        sut = SymbolIndex.load(index_path)
+        sut.update(self.paths())
+        self.assertFalse(sut.modified)
+        self.assertEqual(digest, sut.digest())
+
+        # touched: the times are saved, but the names resolve the same
+        os.utime(os.path.join(self.package, "other.py"), (0, 0))
+        sut.update(self.paths())
+        self.assertTrue(sut.modified)
+        self.assertEqual(digest, sut.digest())
+
+        self.write("other.py", b"class Changed(object):\n    pass\n")
+        sut.update(self.paths())
+        self.assertNotEqual(digest, sut.digest())
+
+    def test_LoadMissingOrBroken(self):
+        path = os.path.join(self.directory, "index.json")
+        self.assertEqual({}, SymbolIndex.load(path).files)
+
+        with open(path, "w") as f:
+            f.write("{")
+        self.assertEqual({}, SymbolIndex.load(path).files)
+
+    def test_Interpreter(self):
+        index = SymbolIndex()
+        index.update(self.paths())
+        sut = TypeInterpreter(resolver=index.resolve)
+
+        self.assertEqual(
+            ("List[Service]", (
+                ImportedType("pkg.services", "Service"),
+                ImportedType("typing", "List"))),
+            sut.interpret("list of Service"))
+        self.assertEqual(("foo.Service", ()), sut.interpret("foo.Service"))
@@ -0,0 +1,143 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import ast
+import locale
+import ntpath
+import posixpath
+import textwrap
+
+from testtools import TestCase
+
+from mydocpy import parse, tokenparse
+from mydocpy.pipeline import FileProcessor, load_formats
+from mydocpy.test_parse import SOURCE
+
+EDGE_CASES = textwrap.dedent('''\
+    # comment
+    r"""module""" "continued"
+    import os
+
+
+    @decorator(with_args=1)
+    @classmethod
+    def f(a, b=lambda x, y: x, /, c=(1, 2), *args, d, e=3, **kw) -> "x:y":
+        # comment before the doc string
+        """f"""; x = 1
+
+
+    def g(a, *, b): "g"
+
+
+    def h(
+        a,  # comment
+        b,
+    ):
+        b"""bytes"""
+
+
+    def no_doc():
+        "not" + "doc"
+
+
+    class B(Base, metaclass=Meta):
+        async def method(self, a: "int" = {1: 2}):
+            u"""method"""
+            def nested(): """nested"""
+
+        class C:
+            """C"""
+
+            @ staticmethod
+            def s(): """s"""
+
+        while x:
+            def in_loop(self):
+                """in loop"""
+        else:
+            pass
+
+        def after(self):
+            """after"""
+''')
+
+
+def _fields(docstring):
+    return (
+        type(docstring), docstring.content, docstring.obj_loc,
+        docstring.doc_loc, docstring.doc_end,
+        getattr(docstring, "args", None), getattr(docstring, "vaarg", None),
+        getattr(docstring, "kwarg", None),
+        getattr(docstring, "func_type", None), docstring.name,
+        getattr(docstring, "posonly", None),
+        getattr(docstring, "kwonlyargs", None),
+        getattr(docstring, "defaults", None),
+        getattr(docstring, "is_async", None),
+        getattr(docstring, "decorators", None),
+        getattr(docstring, "bases", None),
+        getattr(docstring, "signature", None))
+
+
+class TokenParseTest(TestCase):
+
+    def assertSameAsAst(self, source):
+        expected = [_fields(d) for d in parse.parse(source)]
+        actual = [_fields(d) for d in tokenparse.parse(source)]
+        self.assertEqual(expected, actual)
+
+    def test_SameAsAst(self):
+        self.assertSameAsAst(SOURCE)
+
+    def test_EdgeCases(self):
+        self.assertSameAsAst(EDGE_CASES)
+        self.assertEqual(
+            ["module" "continued", "f", "g", "method", "nested", "C", "s",
+             "in loop", "after"],
+            [d.content for d in tokenparse.parse(EDGE_CASES)])
+
+    def test_OwnSources(self):
+        for module in (parse, tokenparse):
+            with open(module.__file__.replace(".pyc", ".py")) as f:
+                self.assertSameAsAst(f.read())
+
+    def test_StdlibSources(self):
+        # modules with definitions in except handlers and else clauses
+        for module in (locale, ntpath, posixpath):
+            with open(module.__file__) as f:
+                self.assertSameAsAst(f.read())
+
+    def test_DocSpan(self):
+        for docstring in tokenparse.parse(EDGE_CASES):
+            start, end = docstring.doc_span
+            self.assertEqual(
+                docstring.content, ast.literal_eval(EDGE_CASES[start:end]))
+
+    def test_Empty(self):
+        self.assertEqual([], tokenparse.parse(""))
+        self.assertEqual([], tokenparse.parse("x = 1\n"))
+
+    def test_Engine(self):
+        load_formats()
+        processor = FileProcessor("sphinx", "comment", engine="tokenize")
+        source = 'def f(a):\n    """\n    :type a: int\n    """\n'
+        self.assertEqual(
+            FileProcessor("sphinx", "comment").get_source_replacements(
+                source),
+            processor.get_source_replacements(source))
+        self.assertRaises(ValueError, FileProcessor, "sphinx", "comment",
+                          engine="unknown")
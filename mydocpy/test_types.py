@@ -0,0 +1,116 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+from testtools import TestCase
+
+from mydocpy.types import ImportedType, TypeInterpreter
+
+TYPING = "typing"
+
+
+class TypeInterpreterTests(TestCase):
+
+    def assertInterpretation(self, expected, type_expr, *imports):
+        sut = TypeInterpreter()
+
+        self.assertEqual(
+            (expected, tuple(ImportedType(TYPING, name) for name in imports)),
+            sut.interpret(type_expr))
+
+    def test_Plain(self):
+        self.assertInterpretation("int", "int")
+        self.assertInterpretation("int", " long ")
+        self.assertInterpretation("float", "floating point")
+        self.assertInterpretation("foo.Bar", "foo.Bar")
+        self.assertInterpretation("Any", "object", "Any")
+        self.assertInterpretation("None", "None")
+
+    def test_Generics(self):
+        self.assertInterpretation("List[int]", "list of int", "List")
+        self.assertInterpretation("List[int]", "list<int>", "List")
+        self.assertInterpretation("List[int]", "List[int]", "List")
+        self.assertInterpretation("Dict[str, int]", "dict(str: int)", "Dict")
+        self.assertInterpretation(
+            "Dict[str, List[int]]", "dict of str to list of int",
+            "List", "Dict")
+        self.assertInterpretation("Tuple[int, ...]", "tuple of int", "Tuple")
+        self.assertInterpretation(
+            "Tuple[int, str]", "tuple of (int, str)", "Tuple")
+
+    def test_Unions(self):
+        self.assertInterpretation("Optional[int]", "int or None", "Optional")
+        self.assertInterpretation(
+            "Union[int, str, None]", "int | str | None", "Union")
+        self.assertInterpretation(
+            "Optional[List[int]]", "list of int or None", "List", "Optional")
+        self.assertInterpretation("int", "int or int")
+
+    def test_Callables(self):
+        self.assertInterpretation("Callable[[a], b]", "a -> b", "Callable")
+        self.assertInterpretation(
+            "Callable[[int, str], bool]", "(int, str) -> bool", "Callable")
+        self.assertInterpretation(
+            "Callable[[], None]", "() -> None", "Callable")
+        self.assertInterpretation(
+            "Callable[[int, str], bool]", "Callable[[int, str], bool]",
+            "Callable")
+        self.assertInterpretation(
+            "Callable[[], None]", "Callable[[], None]", "Callable")
+        self.assertInterpretation(
+            "Callable[..., int]", "Callable[..., int]", "Callable")
+        self.assertInterpretation(
+            "Dict[str, Callable[[int], List[int]]]",
+            "dict(str: Callable[[int], list of int])",
+            "List", "Callable", "Dict")
+
+    def test_Invalid(self):
+        sut = TypeInterpreter()
+
+        self.assertEqual(
+            ("a list with words", ()), sut.interpret("a list with words "))
+        self.assertEqual(("List[", ()), sut.interpret("List["))
+        self.assertRaises(ValueError, sut.parse, "int or")
+        self.assertRaises(ValueError, sut.parse, "int $")
+        for prose in ("dict of str", "iterable of str", "sequence of int",
+                      "list of int to str"):
+            self.assertEqual((prose, ()), sut.interpret(prose))
+        self.assertEqual(("Dict[str]", ()), sut.interpret("Dict[str]"))
+
+    def test_Cache(self):
+        sut = TypeInterpreter(cache_size=2)
+
+        first = sut.interpret("list of int")
+        self.assertIs(first, sut.interpret("list of int"))
+        sut.interpret("dict(str: int)")
+        sut.interpret("int")
+        second = sut.interpret("list of int")  # evicted
+
+        self.assertEqual(first, second)
+        self.assertIs(first[0], second[0])
+        self.assertIs(first[1][0], second[1][0])
+        self.assertEqual((1, 4), (sut.hits, sut.misses))
+        self.assertEqual(0.2, sut.hit_rate)
+
+    def test_NoCache(self):
+        sut = TypeInterpreter(cache_size=0)
+
+        for _ in range(2):
+            self.assertEqual(
+                ("List[int]", (ImportedType(TYPING, "List"),)),
+                sut.interpret("list of int"))
+        self.assertEqual((0, 2), (sut.hits, sut.misses))
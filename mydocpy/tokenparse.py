@@ -0,0 +1,487 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Doc string extraction with ``tokenize`` instead of ``ast.parse``.
+
+Only the headers of ``def`` and ``class`` statements and the first token of
+their bodies are looked at, so no syntax tree is built. The records are the
+same as the ones of ``mydocpy.parse`` and additionally have ``doc_span``,
+the exact character offsets of the doc string literal in the source.
+"""
+
+import ast
+import io
+import re
+import tokenize
+from collections import namedtuple
+
+from typing import Iterator, List, Optional, Sequence, Set, Text, Tuple
+
+from mydocpy.docstrings import ClassDocString, DocString, FuncType, \
+    FunctionDocString, ModuleDocString, Parameter, Signature
+from mydocpy.source import LineIndex, SourceLocation
+
+_MODULE, _CLASS, _FUNCTION = range(3)
+
+# tokens without meaning for the statement structure
+_SKIPPED = frozenset(
+    getattr(tokenize, name) for name in ("COMMENT", "NL", "ENCODING")
+    if hasattr(tokenize, name)
+)
+
+_PREFIX = re.compile(r"[a-zA-Z]*")
+
+_OPENING = frozenset("([{")
+_CLOSING = frozenset(")]}")
+
+
+class _TokenStream(object):
+    """
+    Token iterator with push back
+    """
+
+    def __init__(self, tokens):
+        self._tokens = tokens
+        self._pushed = []  # type: List[tokenize.TokenInfo]
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._pushed:
+            return self._pushed.pop()
+        return next(self._tokens)
+
+    next = __next__  # Python 2
+
+    def push(self, token):
+        self._pushed.append(token)
+
+    def significant(self):
+        """
+        :return: next token, which is not a comment or empty line
+        """
+        for token in self:
+            if token[0] not in _SKIPPED:
+                return token
+        raise StopIteration
+
+
+def _skip_to_colon(stream):
+    # type: (_TokenStream) -> bool
+    """
+    skip tokens until the colon ending a ``def`` or ``class`` header
+
+    :return: whether there was a return annotation
+    """
+    depth = 0
+    returns = False
+    for token in stream:
+        string = token[1]
+        if token[0] != tokenize.OP:
+            continue
+        if string in _OPENING:
+            depth += 1
+        elif string in _CLOSING:
+            depth -= 1
+        elif string == "->" and depth == 0:
+            returns = True
+        elif string == ":" and depth == 0:
+            break
+    return returns
+
+
+def _location(pos):
+    # type: (Tuple[int, int]) -> SourceLocation
+    return SourceLocation(pos[0] - 1, pos[1])  # tokenize counts from 1
+
+
+_Parameters = namedtuple(
+    "_Parameters",
+    ["args", "posonly", "vararg", "kwarg", "kwonlyargs", "defaults",
+     "positions", "closing"])
+
+_NO_PARAMETERS = _Parameters([], 0, None, None, [], frozenset(), [], None)
+
+
+def _parse_parameters(stream):
+    # type: (_TokenStream) -> _Parameters
+    """
+    parse the parameter list after the opening parenthesis
+
+    :return: positional parameters (like ``ast.arguments.args`` plus the
+        positional-only ones), the number of positional-only parameters,
+        name of ``*args``, name of ``**kwargs``,
+        keyword-only parameters, the parameters with default value, the
+        ``Parameter`` locations and the location after the closing
+        parenthesis
+    """
+    args = []  # type: List[Text]
+    posonly = 0
+    vararg = None
+    kwarg = None
+    kwonlyargs = []  # type: List[Text]
+    defaults = set()  # type: Set[Text]
+    name = None  # current parameter without star
+    positions = []  # type: List[Parameter]
+    current = None  # index of the current parameter in positions
+    default = None  # index of the parameter, whose default is the next token
+    closing = None  # type: Optional[SourceLocation]
+
+    depth = 1
+    at_start = True  # at the beginning of a parameter
+    star = None  # "*" or "**" before the parameter name
+    keyword_only = False
+    in_lambda = False  # between ``lambda`` and its colon in a default
+
+    for token in stream:
+        kind, string = token[0], token[1]
+        if default is not None:
+            positions[default] = positions[default]._replace(
+                default=_location(token[2]))
+            default = None
+        if kind in _SKIPPED:
+            continue
+
+        if kind == tokenize.OP and string in _OPENING:
+            depth += 1
+        elif kind == tokenize.OP and string in _CLOSING:
+            depth -= 1
+            if depth == 0:
+                closing = _location(token[3])
+                break
+
+        if depth != 1:
+            continue
+
+        if kind == tokenize.NAME and string == "lambda":
+            in_lambda = True
+        elif kind == tokenize.OP and string == ":" and in_lambda:
+            in_lambda = False
+        elif kind == tokenize.OP and string == "," and not in_lambda:
+            at_start = True
+            star = None
+            name = None
+            current = None
+        elif kind == tokenize.OP and string == ":":
+            if current is not None:
+                positions[current] = positions[current]._replace(
+                    annotated=True)
+        elif kind == tokenize.OP and string == "=" and not in_lambda:
+            if name is not None:
+                defaults.add(name)
+                default = current
+        elif at_start and kind == tokenize.OP and string in ("*", "**"):
+            star = string
+            if string == "*":
+                keyword_only = True  # also for a bare "*"
+        elif at_start and kind == tokenize.OP and string == "/":
+            posonly = len(args)
+            at_start = False
+        elif at_start and kind == tokenize.NAME:
+            if star == "*":
+                vararg = string
+            elif star == "**":
+                kwarg = string
+            elif keyword_only:
+                kwonlyargs.append(string)
+                name = string
+            else:
+                args.append(string)
+                name = string
+            current = len(positions)
+            positions.append(
+                Parameter(string, _location(token[3]), None, False))
+            at_start = False
+
+    return _Parameters(
+        args, posonly, vararg, kwarg, kwonlyargs, frozenset(defaults),
+        positions, closing)
+
+
+if hasattr(ast, "unparse"):  # Python 3.9+
+    def _normalize_bases(text):
+        # type: (Text) -> Optional[Text]
+        """
+        :return: ``text`` between the parentheses of a class header like
+            ``mydocpy.parse`` records it
+        """
+        call = ast.parse("_(" + text + ")", mode="eval").body
+        return ", ".join(
+            [ast.unparse(base) for base in call.args] +
+            [ast.unparse(keyword) for keyword in call.keywords])
+else:
+    def _normalize_bases(text):
+        return None
+
+
+class _Extractor(object):
+
+    def __init__(self, content):
+        # type: (Text) -> None
+        self.content = content
+        self.index = LineIndex(content)
+        self.stream = _TokenStream(
+            tokenize.generate_tokens(io.StringIO(content).readline))
+
+    def _offset(self, pos):
+        # type: (Tuple[int, int]) -> int
+        return self.index.position(_location(pos))
+
+    def _read_docstring(self, cls, obj_loc):
+        # type: (type, SourceLocation) -> Optional[DocString]
+        """
+        read the doc string, when the next statement is a string literal
+        """
+        first = token = self.stream.significant()
+        parts = []
+        while token[0] == tokenize.STRING:
+            parts.append(token)
+            token = next(self.stream)
+        self.stream.push(token)
+
+        if not parts or token[0] not in (
+                tokenize.NEWLINE, tokenize.ENDMARKER, tokenize.COMMENT) and \
+                token[1] != ";":
+            if parts:
+                for part in reversed(parts[1:]):
+                    self.stream.push(part)
+                self.stream.push(first)
+            return None
+
+        for part in parts:
+            prefix = _PREFIX.match(part[1]).group().lower()
+            if "b" in prefix or "f" in prefix:
+                return None  # bytes and f-strings are no doc strings
+        values = [ast.literal_eval(part[1]) for part in parts]
+
+        doc_string = cls(
+            "".join(values), obj_loc,
+            SourceLocation(first[2][0] - 1, first[2][1]))
+        doc_string.doc_end = SourceLocation(
+            parts[-1][3][0] - 1, parts[-1][3][1])
+        doc_string.doc_span = (
+            self._offset(first[2]), self._offset(parts[-1][3]))
+        return doc_string
+
+    def _read_decorator(self):
+        # type: () -> Optional[Text]
+        """
+        read a decorator after the ``@`` up to the end of the line
+
+        :return: dotted name of the decorator or None for other expressions
+        """
+        stream = self.stream
+        token = next(stream)
+        if token[0] != tokenize.NAME:
+            return None
+        name = token[1]
+        token = stream.significant()
+        while token[1] == ".":
+            token = stream.significant()
+            if token[0] != tokenize.NAME:
+                break
+            name += "." + token[1]
+            token = stream.significant()
+        stream.push(token)
+        return name if token[0] == tokenize.NEWLINE else None
+
+    def _read_bases(self):
+        # type: () -> Text
+        """
+        read a class header after the name up to the colon
+
+        :return: source text between the parentheses
+        """
+        opening = self.stream.significant()
+        if opening[1] != "(":
+            self.stream.push(opening)
+            _skip_to_colon(self.stream)
+            return ""
+
+        depth = 1
+        for token in self.stream:
+            if token[0] != tokenize.OP:
+                continue
+            if token[1] in _OPENING:
+                depth += 1
+            elif token[1] in _CLOSING:
+                depth -= 1
+                if depth == 0:
+                    break
+        _skip_to_colon(self.stream)
+        return self.content[self._offset(opening[3]):self._offset(token[2])]
+
+    def _read_body_docstring(self, cls, obj_loc):
+        # type: (type, SourceLocation) -> Tuple[Optional[DocString], bool]
+        """
+        read the doc string after the colon of a ``def`` or ``class`` header
+
+        :return: doc string and whether the body is an indented block
+        """
+        token = self.stream.significant()
+        if token[0] != tokenize.NEWLINE:
+            # body on the same line as the header
+            self.stream.push(token)
+            return self._read_docstring(cls, obj_loc), False
+
+        token = self.stream.significant()
+        self.stream.push(token)
+        if token[0] != tokenize.INDENT:
+            return None, False  # broken source
+        next(self.stream)
+        return self._read_docstring(cls, obj_loc), True
+
+    def run(self):
+        # type: () -> Iterator[DocString]
+        stream = self.stream
+
+        token = stream.significant()
+        stream.push(token)
+        if token[0] == tokenize.STRING:
+            docstring = self._read_docstring(
+                ModuleDocString, SourceLocation(0, 0))
+            if docstring:
+                yield docstring
+
+        # (kind, prefix of qualified names) per indentation level
+        scopes = [(_MODULE, "")]
+        decorators = []  # type: List[Optional[Text]]
+        at_statement_start = True
+
+        for token in stream:
+            kind, string = token[0], token[1]
+
+            if kind in _SKIPPED:
+                continue
+            if kind == tokenize.INDENT:
+                scopes.append(scopes[-1])  # compound statement
+                continue
+            if kind == tokenize.DEDENT:
+                scopes.pop()
+                continue
+            if kind == tokenize.NEWLINE or string == ";":
+                at_statement_start = True
+                continue
+            if not at_statement_start:
+                continue
+            at_statement_start = False
+
+            if kind == tokenize.OP and string == "@":
+                decorators.append(self._read_decorator())
+                continue
+
+            start = token
+            is_async = kind == tokenize.NAME and string == "async"
+            if is_async:
+                token = stream.significant()
+                kind, string = token[0], token[1]
+                if string != "def":
+                    stream.push(token)
+                    decorators = []
+                    continue
+
+            if kind != tokenize.NAME or string not in ("def", "class"):
+                decorators = []
+                continue
+
+            obj_loc = SourceLocation(start[2][0] - 1, start[2][1])
+            in_class, prefix = scopes[-1][0] == _CLASS, scopes[-1][1]
+            name = prefix + next(stream)[1]
+            if string == "class":
+                bases = self._read_bases()
+                docstring, block = self._read_body_docstring(
+                    ClassDocString, obj_loc)
+                if docstring:
+                    docstring.bases = _normalize_bases(bases)
+                scope = (_CLASS, name + ".")
+            else:
+                opening = stream.significant()
+                parameters = _parse_parameters(stream) \
+                    if opening[1] == "(" else _NO_PARAMETERS
+                returns = _skip_to_colon(stream)
+                docstring, block = self._read_body_docstring(
+                    FunctionDocString, obj_loc)
+                if docstring:
+                    if parameters.closing is not None:
+                        docstring.signature = Signature(
+                            parameters.positions,
+                            None if returns else parameters.closing,
+                            returns)
+                    docstring.args = parameters.args
+                    docstring.posonly = parameters.posonly
+                    docstring.vaarg = parameters.vararg
+                    docstring.kwarg = parameters.kwarg
+                    docstring.kwonlyargs = parameters.kwonlyargs
+                    docstring.defaults = parameters.defaults
+                    docstring.is_async = is_async
+                    docstring.decorators = decorators
+                    docstring.func_type = _get_func_type(
+                        decorators, in_class)
+                scope = (_FUNCTION, name + ".<locals>.")
+
+            if docstring:
+                docstring.name = name
+            if block:
+                scopes.append(scope)
+            decorators = []
+            at_statement_start = True
+            if docstring:
+                yield docstring
+
+
+def _get_func_type(decorators, in_class):
+    # type: (Sequence[Optional[Text]], bool) -> FuncType
+    if not in_class:
+        return FuncType.FREE
+    # FIXME: we hope nobody overwriten staticmethod or classmethod
+    if "staticmethod" in decorators:
+        return FuncType.STATIC
+    if "classmethod" in decorators:
+        return FuncType.CLASS
+    return FuncType.INSTANCE
+
+
+def iter_docstrings(content):
+    # type: (Text) -> Iterator[DocString]
+    """
+    Yield the doc strings of the module, its classes and functions in source
+    order.
+
+    :raises tokenize.TokenError: for incomplete source
+    """
+    return _Extractor(content).run()
+
+
+def iter_parse(content):
+    # type: (Text) -> Iterator[DocString]
+    """
+    Yield the doc strings of ``content`` while the tokens are read (like
+    ``mydocpy.parse.iter_parse``).
+    """
+    return iter_docstrings(content)
+
+
+def parse(content):
+    # type: (Text) -> Sequence[DocString]
+    """
+    parse file (like ``mydocpy.parse.parse``)
+    :param content: source to process
+    :return:
+    """
+    return list(iter_docstrings(content))
@@ -14,58 +14,383 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+
 import re
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
+
+from typing import Callable, Dict, List, Optional, Sequence, Text, Tuple, \
+    Union
 
-from typing import Text, Tuple, Sequence
+from mydocpy.utils.compat import intern
 
 ImportedType = namedtuple("ImportedType", ["module", "name"])
 
+# names of ``typing`` which need an import
+TYPING_NAMES = frozenset([
+    "Any", "AnyStr", "ByteString", "Callable", "ClassVar", "Container",
+    "DefaultDict", "Deque", "Dict", "FrozenSet", "Generator", "Hashable",
+    "Iterable", "Iterator", "List", "Mapping", "MutableMapping",
+    "MutableSequence", "MutableSet", "NamedTuple", "Optional", "Sequence",
+    "Set", "Sized", "Text", "Tuple", "Type", "Union",
+])
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<arrow>->|=>)
+      | (?P<ellipsis>\.\.\.)
+      | (?P<op>[\[\]()<>,:|])
+      | (?P<name>[A-Za-z_][\w.]*)
+      | (?P<string>'[^']*'|"[^"]*")
+    )""", re.VERBOSE)
+
+# number of arguments of the generics of ``typing`` which can be written
+# as ``<generic> of <type>`` (None: any number)
+_GENERIC_ARITY = {
+    "Container": 1, "Deque": 1, "FrozenSet": 1, "Iterable": 1, "Iterator": 1,
+    "List": 1, "MutableSequence": 1, "MutableSet": 1, "Sequence": 1, "Set": 1,
+    "Type": 1,
+    "DefaultDict": 2, "Dict": 2, "Mapping": 2, "MutableMapping": 2,
+    "Tuple": None,
+}  # type: Dict[Text, Optional[int]]
+
+_CLOSING = {"[": "]", "(": ")", "<": ">"}
+
+Token = Tuple[Text, Text]  # kind and text
+
+Resolver = Callable[[Text], Optional[ImportedType]]
+
+
+def tokenize(type_expr):
+    # type: (Text) -> List[Token]
+    """
+    :raises ValueError: for characters which are not part of a type
+        expression
+    """
+    tokens = []  # type: List[Token]
+    pos = 0
+    end = len(type_expr.rstrip())
+    while pos < end:
+        match = _TOKEN.match(type_expr, pos)
+        if match is None:
+            raise ValueError("unexpected {!r} in type expression {!r}".format(
+                type_expr[pos:].strip()[:1], type_expr))
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == "name":
+            text = text.rstrip(".")  # end of a sentence
+        tokens.append((kind, text))
+        pos = match.end()
+    return tokens
+
+
+class _Parser(object):
+    """
+    Recursive descent parser of a type expression::
+
+        expr     := union ["->" union]
+        union    := postfix (("or" | "|") postfix)*
+        postfix  := primary ["of" postfix [("to" | "and") postfix]]
+        primary  := NAME [("[" | "(" | "<") args ("]" | ")" | ">")]
+                  | ("(" | "[") args (")" | "]") | "..." | STRING
+        args     := [arg ("," arg)*]
+        arg      := expr [":" expr]
+
+    Intermediate results are atoms: ``("name", raw name)``, ``("group",
+    types)`` for parenthesized lists (tuples), ``("list", types)`` for
+    bracketed lists (like the parameters of ``Callable``) or ``("type",
+    type hint)``.
+    """
+
+    def __init__(self, interpreter, type_expr):
+        # type: (TypeInterpreter, Text) -> None
+        self.interpreter = interpreter
+        self.type_expr = type_expr
+        self.tokens = tokenize(type_expr)
+        self.pos = 0
+        self.imports = OrderedDict()  # type: Dict[ImportedType, None]
+
+    def error(self, message):
+        # type: (Text) -> ValueError
+        return ValueError("{} in type expression {!r}".format(
+            message, self.type_expr))
+
+    def peek(self):
+        # type: () -> Optional[Token]
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return None
+
+    def next(self):
+        # type: () -> Token
+        token = self.peek()
+        if token is None:
+            raise self.error("unexpected end")
+        self.pos += 1
+        return token
+
+    def accept(self, *texts):
+        # type: (*Text) -> bool
+        token = self.peek()
+        if token is not None and token[1] in texts and token[0] != "string":
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, text):
+        # type: (Text) -> None
+        if not self.accept(text):
+            raise self.error("expected {!r}".format(text))
+
+    def typing(self, name):
+        # type: (Text) -> Text
+        self.imports[ImportedType("typing", name)] = None
+        return name
+
+    def canonical(self, raw):
+        # type: (Text) -> Text
+        """
+        :return: ``raw`` with the replacements of the interpreter applied
+        """
+        interpreter = self.interpreter
+        raw = interpreter.builtin_replacements.get(raw, raw)
+        return interpreter.typing_replacements.get(raw, raw)
+
+    def name(self, raw):
+        # type: (Text) -> Text
+        """
+        :return: type hint of the plain name ``raw``
+        """
+        interpreter = self.interpreter
+        if raw in ("None", "none"):
+            return "None"
+        raw = self.canonical(raw)
+        if raw in TYPING_NAMES:
+            return self.typing(raw)
+        resolver = interpreter.resolver
+        if resolver is not None and "." not in raw:
+            imported = resolver(raw)
+            if imported is not None:
+                self.imports[imported] = None
+        return raw
+
+    def resolve(self, atom):
+        # type: (Tuple[Text, Union[Text, List[Text]]]) -> Text
+        kind, value = atom
+        if kind == "name":
+            return self.name(value)
+        if kind == "group":
+            if len(value) == 1:
+                return value[0]
+            return self.generic("Tuple", value)
+        if kind == "list":
+            return "[{}]".format(", ".join(value))
+        return value
+
+    def generic(self, raw, args):
+        # type: (Text, Sequence[Text]) -> Text
+        arity = _GENERIC_ARITY.get(self.canonical(raw))
+        if arity is not None and args and len(args) != arity:
+            raise self.error("{} arguments for {!r}".format(len(args), raw))
+        name = self.name(raw)
+        if name == "Callable" and args:
+            if len(args) == 2 and (args[0] == "..." or
+                                   args[0].startswith("[")):
+                return "Callable[{}, {}]".format(*args)  # Callable[[a], b]
+            return "Callable[[{}], {}]".format(
+                ", ".join(args[:-1]), args[-1])
+        if not args:
+            return name
+        return "{}[{}]".format(name, ", ".join(args))
+
+    def parse(self):
+        # type: () -> Text
+        result = self.expr()
+        if self.peek() is not None:
+            raise self.error("unexpected {!r}".format(self.peek()[1]))
+        return result
+
+    def expr(self):
+        # type: () -> Text
+        left = self.union()
+        if not self.accept("->", "=>"):
+            return self.resolve(left)
+
+        args = left[1] if left[0] in ("group", "list") else \
+            [self.resolve(left)]
+        result = self.resolve(self.union())
+        return "{}[[{}], {}]".format(
+            self.typing("Callable"), ", ".join(args), result)
+
+    def union(self):
+        atom = self.postfix()
+        if self.peek() is None or self.peek()[1] not in ("or", "|"):
+            return atom
+
+        members = [self.resolve(atom)]
+        while self.accept("or", "|"):
+            member = self.resolve(self.postfix())
+            if member not in members:
+                members.append(member)
+        if len(members) == 1:
+            return "type", members[0]
+        if len(members) == 2 and "None" in members:
+            members.remove("None")
+            return "type", "{}[{}]".format(
+                self.typing("Optional"), members[0])
+        return "type", "{}[{}]".format(
+            self.typing("Union"), ", ".join(members))
+
+    def postfix(self):
+        atom = self.primary()
+        if not self.accept("of"):
+            return atom
+        # "a sequence of words" is prose, not a type
+        if atom[0] != "name" or self.canonical(atom[1]) not in _GENERIC_ARITY:
+            raise self.error("expected a generic before 'of'")
+
+        arg = self.postfix()
+        if arg[0] in ("group", "list"):
+            args = arg[1]  # tuple of (int, str)
+        else:
+            args = [self.resolve(arg)]
+            if self.accept("to", "and"):
+                args.append(self.resolve(self.postfix()))
+            elif self.canonical(atom[1]) == "Tuple":
+                args.append("...")  # tuple of int
+        return "type", self.generic(atom[1], args)
+
+    def primary(self):
+        kind, text = self.next()
+        if kind == "name":
+            token = self.peek()
+            if token is not None and token[0] == "name" and \
+                    (text + " " + token[1]) in \
+                    self.interpreter.builtin_replacements:
+                self.pos += 1
+                text += " " + token[1]
+            if self.peek() is not None and self.peek()[1] in _CLOSING:
+                opening = self.next()[1]
+                return "type", self.generic(text, self.args(opening))
+            return "name", text
+
+        if kind == "op" and text == "(":
+            return "group", self.args(text)
+        if kind == "op" and text == "[":
+            return "list", self.args(text)
+        if kind in ("ellipsis", "string"):
+            return "type", text
+        raise self.error("unexpected {!r}".format(text))
+
+    def args(self, opening):
+        # type: (Text) -> List[Text]
+        closing = _CLOSING[opening]
+        args = []  # type: List[Text]
+        if self.accept(closing):
+            return args
+        while True:
+            args.append(self.expr())
+            if self.accept(":"):  # dict(str: int)
+                args.append(self.expr())
+            if self.accept(closing):
+                return args
+            self.expect(",")
+
 
 class TypeInterpreter(object):
+    """
+    Interpret the type expressions of doc strings (like ``list of int``,
+    ``dict(str: int)``, ``int or None``, ``list<int>`` or ``a -> b``) as
+    type hints.
+
+    The results of the last ``cache_size`` expressions are kept (none for
+    ``cache_size <= 0``), because the same expressions repeat throughout a
+    code base. Equal results share one (interned) object.
+
+    :ivar hits: number of expressions found in the cache
+    :ivar misses: number of interpreted expressions
+    """
 
     # options
     # imports.prevered_import = typing | collections
 
+    typing_replacements = {
+        "dict": "Dict",
+        "list": "List",
+        "set": "Set",
+        "tuple": "Tuple",
+        "defaultdict": "DefaultDict",
+        "frozenset": "FrozenSet",
+        "namedtuple": "NamedTuple",
+        "deque": "Deque",
+        "unicode": "Text",
+        "string": "Text",
+        "object": "Any",
+        "function": "Callable"
+    }
+
+    builtin_replacements = {
+        "integer": "int",
+        "long": "int",
+        "double": "float",
+        "real": "float",
+        "floating point": "float"
+    }
+
+    def __init__(self, cache_size=1024, resolver=None):
+        # type: (int, Optional[Resolver]) -> None
+        """
+        :param resolver: returns the import of other short names (like
+            ``SymbolIndex.resolve``)
+        """
+        self.cache_size = cache_size
+        self.resolver = resolver
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()  # type: OrderedDict
+        self._imported_types = {}  # type: Dict[ImportedType, ImportedType]
+
+    @property
+    def hit_rate(self):
+        # type: () -> float
+        total = self.hits + self.misses
+        return float(self.hits) / total if total else 0.0
+
+    def parse(self, type_expr):
+        # type: (Text) -> Tuple[Text, Sequence[ImportedType]]
+        """
+        Interpret ``type_expr`` without cache
+
+        :raises ValueError: if ``type_expr`` is no valid type expression
+        """
+        parser = _Parser(self, type_expr)
+        return parser.parse(), tuple(parser.imports)
+
     def interpret(self, type_expr):
         # type: (Text) -> Tuple[Text, Sequence[ImportedType]]
         """
         Interpret a user type expression to a python type hint
         :param type_expr: type expression (for example:
             ``List[int]`` or ``list<int>``)
-        :return: Type hint expression and needed imports
+        :return: Type hint expression and needed imports. Invalid
+            expressions are returned unchanged and without imports.
         """
-        re.sub(r"(\S+)\s*->\s*(\S+)", "Callable[[\1], \2]")
-        re.sub(r"(\S+)\s*|\s*(\S+)+", "Union[\1, \2]")
-
-        re.sub(r"[<(]", "[")
-        re.sub(r"[>)]", "]")
-
-        return (type_expr, ())
-
-        typing_replacements = {
-            "dict": "Dict",
-            "list": "List",
-            "set": "Set",
-            "tuple": "Tuple",
-            "defaultdict": "DefaultDict",
-            "frozenset": "FrozenSet",
-            "namedtuple": "NamedTuple",
-            "deque": "Deque",
-            "str": "ByteString",
-            "unicode": "Text",
-            "string": "Text",
-            "object": "Any",
-            "function": "Callable"
-        }
-
-        builtin_replacements = {
-            "integer": "int",
-            "long": "int",
-            "double": "float",
-            "real": "float",
-            "floating point": "float"
-        }
-
-
+        key = type_expr.strip()
+        result = self._cache.pop(key, None)
+        if result is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            try:
+                type_hint, imports = self.parse(key)
+            except ValueError:
+                type_hint, imports = key, ()
+            result = (intern(type_hint), tuple(
+                self._imported_types.setdefault(imported, imported)
+                for imported in imports))
+            if self.cache_size <= 0:
+                return result  # no memoization
+            while len(self._cache) >= self.cache_size:
+                self._cache.popitem(last=False)
 
+        self._cache[key] = result
+        return result
@@ -0,0 +1,56 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import shutil
+import tempfile
+
+from typing import Text
+
+
+def atomic_write(path, data, fsync=True):
+    # type: (Text, bytes, bool) -> None
+    """
+    Replace the content of ``path`` with ``data``.
+
+    ``data`` is written to a temporary file in the same directory, which is
+    renamed to ``path`` afterwards. So readers see the old or the new
+    content, never a partially written file. Permissions of an existing file
+    are kept.
+
+    :param fsync: flush ``data`` to the disk before the rename, so that
+        ``path`` is complete after a system crash, too
+    """
+    dirname, basename = os.path.split(os.path.abspath(path))
+    fd, tmppath = tempfile.mkstemp(
+        dir=dirname, prefix="." + basename + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, tmppath)
+        _replace(tmppath, path)
+    except BaseException:
+        os.remove(tmppath)
+        raise
+
+
+# os.rename does not replace existing files on Windows
+_replace = getattr(os, "replace", os.rename)
@@ -0,0 +1,81 @@
+# -*- coding=utf-8 -*-
+#
+# Copyright 2017 Richard Liebscher
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def cpu_count():
+    # type: () -> int
+    import multiprocessing
+
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+
+def imap(
+        func,              # type: Callable[[T], R]
+        iterable,          # type: Iterable[T]
+        jobs=1,            # type: int
+        initializer=None,  # type: Optional[Callable[[], None]]
+        chunksize=1,       # type: int
+        ordered=True       # type: bool
+):
+    # type: (...) -> Iterator[R]
+    """
+    Lazily map ``func`` over ``iterable`` using ``jobs`` worker processes.
+
+    Results are yielded in input order. ``iterable`` is consumed while the
+    workers are already busy, so it can be a (slow) generator.
+
+    :param func: picklable callable (module level function or instance of a
+        module level class)
+    :param jobs: number of worker processes, ``0`` for one per CPU and ``1``
+        to run in the current process without any pool
+    :param initializer: called once in every worker (and once in the current
+        process when ``jobs`` is ``1``)
+    :param ordered: ``False`` to yield the results as soon as the workers
+        finish them (in any order)
+    """
+    if jobs == 0:
+        jobs = cpu_count()
+
+    if jobs <= 1:
+        if initializer is not None:
+            initializer()
+        for item in iterable:
+            yield func(item)
+        return
+
+    # imported here, it is not needed for the common single process case
+    import multiprocessing
+
+    pool = multiprocessing.Pool(jobs, initializer)
+    try:
+        pool_imap = pool.imap if ordered else pool.imap_unordered
+        for result in pool_imap(func, iterable, chunksize):
+            yield result
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
@@ -14,19 +14,67 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Callable
+
+from importlib import import_module
+
+from typing import Callable, Dict, List, Mapping, Optional, Set, Text, \
+    Tuple
+
+
+def iter_entry_points(group):
+    # type: (Text) -> List[Tuple[Text, Text]]
+    """
+    :return: name and module name of all installed entry points in ``group``
+    """
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        try:
+            import pkg_resources
+        except ImportError:
+            return []
+        return [(ep.name, ep.module_name)
+                for ep in pkg_resources.iter_entry_points(group)]
+
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        eps = eps.select(group=group)
+    else:  # Python < 3.10
+        eps = eps.get(group, [])
+    return [(ep.name, ep.value.split(":")[0].strip()) for ep in eps]
 
 
 class Registry(object):
     """
-    :ivar entries: registered formats
+    Formats, which are imported on first use.
+
+    ``index`` maps format names to the modules implementing them. On first
+    use of a name, its module is imported and its function ``hook`` is called
+    with the registry to register the formats of the module.
+
+    Modules of plugins are looked up in the entry point ``group`` (the entry
+    point name is the format name), but only when a name is not in ``index``
+    or all names are requested, because searching entry points is slow.
+
+    :ivar entries: registered (imported) formats
     """
 
-    def __init__(self):
-        self.entries = {}  # type: dict[unicode, Callable]
+    def __init__(
+            self,
+            hook=None,   # type: Optional[Text]
+            index=None,  # type: Optional[Mapping[Text, Text]]
+            group=None   # type: Optional[Text]
+    ):
+        # type: (...) -> None
+        self.entries = {}  # type: Dict[Text, Callable]
+        self.index = dict(index or {})  # type: Dict[Text, Text]
+        self.hook = hook
+        self.group = group
+        self._imported = set()  # type: Set[Text]
+        self._plugins_loaded = group is None
 
     def register(self, name, func):
-        # type: (unicode, Callable) -> None
+        # type: (Text, Callable) -> None
         """
         register new format
         :param name: format name
@@ -40,3 +88,46 @@ class Registry(object):
             )
 
         self.entries[name] = func
+
+    def _load_plugins(self):
+        # type: () -> None
+        if self._plugins_loaded:
+            return
+        self._plugins_loaded = True
+
+        for name, module in iter_entry_points(self.group):
+            # built-in formats can not be replaced
+            self.index.setdefault(name, module)
+
+    def names(self, plugins=True):
+        # type: (bool) -> List[Text]
+        """
+        :param plugins: include formats of plugins
+        :return: sorted names of all known formats (imported or not)
+        """
+        if plugins:
+            self._load_plugins()
+        return sorted(set(self.entries) | set(self.index))
+
+    def get(self, name):
+        # type: (Text) -> Callable
+        """
+        Get format with ``name`` and import its module when needed
+
+        :raises KeyError: when format with ``name`` does not exit
+        """
+        try:
+            return self.entries[name]
+        except KeyError:
+            pass
+
+        if name not in self.index:
+            self._load_plugins()
+        module_name = self.index[name]
+
+        # a module can register several formats: only register it once (but
+        # again after an error, to raise it again instead of a KeyError)
+        if module_name not in self._imported:
+            getattr(import_module(module_name), self.hook)(self)
+            self._imported.add(module_name)
+        return self.entries[name]
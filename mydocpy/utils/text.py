@@ -19,14 +19,14 @@ from typing import Text, Tuple
 from mydocpy.source import SourceLocation
 
 
-def get_line_no(text, pos):  # type: (Text, int) -> SourceLocation
+def get_line_no(text, pos):  # type: (Text, int) -> Tuple[int, int]
     """
     get line number (starting at 0) and column offset of ``pos`` in ``text``.
 
+    Use ``mydocpy.source.LineIndex`` for more than one position in the same
+    text.
+
     :return: tuple of ``(lineno, col_offset)``
     """
-    last_nl = text.rfind('\n', 0, pos)
-    if last_nl < 0:
-        return SourceLocation(0, pos)
-
-    return SourceLocation(text[:pos].count('\n'), pos - (last_nl + 1))
+    location = SourceLocation.from_text_pos(text, pos)
+    return location.line, location.col